@@ -0,0 +1,114 @@
+#!/usr/bin/env python
+
+"""This is the import engine benchmark module.
+
+This module compares the throughput and the peak memory of the iterparse and target engines of
+:func:`podspy.log.data_io.import_log_table` on generated logs of several sizes. Each import runs in
+a fresh process so that the peak resident set size of one import does not carry over to the next.
+
+Usage: PYTHONPATH=src python benchmarks/bench_import_engines.py --traces 1000 10000 50000
+"""
+
+
+import argparse, multiprocessing, os, random, resource, sys, tempfile, time
+
+
+ENGINES = ['iterparse', 'target']
+ACTIVITIES = ['register', 'check', 'decide', 'notify', 'archive', 'escalate', 'review', 'close']
+RESOURCES = ['r{}'.format(i) for i in range(20)]
+
+
+def write_log(fp, n_traces, events_per_trace, seed=0):
+    """Write a synthetic XES log with a few attributes of every type
+
+    :param fp: file path
+    :param n_traces: number of traces
+    :param events_per_trace: mean number of events per trace
+    :param seed: random seed
+    :return: number of events
+    """
+    rand = random.Random(seed)
+    n_events = 0
+
+    with open(fp, 'w') as f:
+        f.write('<?xml version="1.0" encoding="UTF-8" ?>\n')
+        f.write('<log xes.version="1.0" xmlns="http://www.xes-standard.org/">\n')
+        f.write('<global scope="event"><string key="concept:name" value="UNKNOWN"/></global>\n')
+        f.write('<classifier name="Activity" keys="concept:name"/>\n')
+
+        for i in range(n_traces):
+            f.write('<trace><string key="concept:name" value="case_{}"/>'
+                    '<float key="amount" value="{:.2f}"/>\n'.format(i, rand.random() * 10000))
+
+            for j in range(rand.randint(1, 2 * events_per_trace - 1)):
+                f.write('<event><string key="concept:name" value="{}"/>'
+                        '<string key="org:resource" value="{}"/>'
+                        '<date key="time:timestamp" value="2018-01-01T{:02d}:{:02d}:00.000+01:00"/>'
+                        '<int key="step" value="{}"/>'
+                        '<boolean key="automatic" value="{}"/></event>\n'.format(
+                            rand.choice(ACTIVITIES), rand.choice(RESOURCES), j % 24, i % 60, j,
+                            'true' if rand.random() < 0.5 else 'false'))
+                n_events += 1
+
+            f.write('</trace>\n')
+
+        f.write('</log>\n')
+
+    return n_events
+
+
+def peak_rss_mb():
+    # ru_maxrss is in kilobytes on linux and in bytes on macos
+    maxrss = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    return maxrss / (1 << 20) if sys.platform == 'darwin' else maxrss / (1 << 10)
+
+
+def run_import(fp, engine, queue):
+    from podspy.log import data_io
+
+    baseline = peak_rss_mb()
+    start = time.time()
+    lt = data_io.import_log_table(fp, import_mode=data_io.ImportMode.ALL, engine=engine)
+    seconds = time.time() - start
+
+    queue.put((seconds, lt.event_df.shape[0], baseline, peak_rss_mb()))
+
+
+def measure(fp, engine):
+    ctx = multiprocessing.get_context('spawn')
+    queue = ctx.Queue()
+    process = ctx.Process(target=run_import, args=(fp, engine, queue))
+    process.start()
+    result = queue.get()
+    process.join()
+    return result
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.split('\n\n')[1])
+    parser.add_argument('--traces', type=int, nargs='+', default=[1000, 10000, 50000],
+                        help='number of traces of the generated logs')
+    parser.add_argument('--events-per-trace', type=int, default=20, help='mean number of events per trace')
+    parser.add_argument('--repeat', type=int, default=3, help='number of imports per engine and log size')
+    args = parser.parse_args()
+
+    print('{:>8} {:>9} {:>10} {:>12} {:>14} {:>14}'.format(
+        'traces', 'events', 'engine', 'events/s', 'peak RSS (MB)', 'import (MB)'))
+
+    with tempfile.TemporaryDirectory() as tmp_dir:
+        for n_traces in args.traces:
+            fp = os.path.join(tmp_dir, 'log_{}.xes'.format(n_traces))
+            n_events = write_log(fp, n_traces, args.events_per_trace)
+
+            for engine in ENGINES:
+                results = [measure(fp, engine) for _ in range(args.repeat)]
+                seconds = min(result[0] for result in results)
+                baseline = min(result[2] for result in results)
+                peak = min(result[3] for result in results)
+
+                print('{:>8} {:>9} {:>10} {:>12.0f} {:>14.1f} {:>14.1f}'.format(
+                    n_traces, n_events, engine, n_events / seconds, peak, peak - baseline))
+
+
+if __name__ == '__main__':
+    main()
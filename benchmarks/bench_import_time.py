@@ -0,0 +1,62 @@
+#!/usr/bin/env python
+
+"""This is the import time benchmark module.
+
+This module measures how long importing the podspy packages takes and which heavy dependencies, e.g.,
+opyenxes and pygraphviz, they load. Each import runs in a fresh interpreter so that modules imported by
+one measurement are not cached for the next.
+
+Usage: PYTHONPATH=src python benchmarks/bench_import_time.py --repeat 5
+"""
+
+
+import argparse, os, subprocess, sys
+
+
+MODULES = ['podspy', 'podspy.log', 'podspy.petrinet']
+HEAVY_MODULES = ['pandas', 'numpy', 'opyenxes', 'pygraphviz', 'lxml', 'multiprocessing', 'urllib.request']
+
+
+# run in the fresh interpreter, prints the import time in seconds and the loaded heavy modules
+SCRIPT = '''
+import sys, time
+start = time.perf_counter()
+import {module}
+seconds = time.perf_counter() - start
+loaded = [name for name in {heavy!r} if name in sys.modules]
+print(seconds)
+print(','.join(loaded))
+'''
+
+
+def measure(module):
+    """Import a module in a fresh interpreter
+
+    :param module: module name
+    :return: (seconds, list of loaded heavy modules)
+    """
+    script = SCRIPT.format(module=module, heavy=HEAVY_MODULES)
+    output = subprocess.check_output([sys.executable, '-c', script], env=os.environ, universal_newlines=True)
+    seconds, loaded = output.split('\n')[:2]
+    return float(seconds), [name for name in loaded.split(',') if name]
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.split('\n\n')[1])
+    parser.add_argument('--modules', nargs='+', default=MODULES, help='modules to import')
+    parser.add_argument('--repeat', type=int, default=5, help='number of imports per module')
+    args = parser.parse_args()
+
+    print('{:<20} {:>10} {:>10}  {}'.format('module', 'min (ms)', 'max (ms)', 'loaded'))
+
+    for module in args.modules:
+        results = [measure(module) for _ in range(args.repeat)]
+        seconds = [result[0] for result in results]
+        loaded = results[0][1]
+
+        print('{:<20} {:>10.1f} {:>10.1f}  {}'.format(
+            module, min(seconds) * 1000, max(seconds) * 1000, ', '.join(loaded)))
+
+
+if __name__ == '__main__':
+    main()
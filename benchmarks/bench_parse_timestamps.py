@@ -0,0 +1,74 @@
+#!/usr/bin/env python
+
+"""This is the timestamp parsing benchmark module.
+
+This module measures :func:`podspy.utils.conversion.parse_timestamps` on generated ISO 8601 timestamps
+with millisecond precision and mixed UTC offsets, like the ones of the BPI Challenge logs, and on the
+timestamps of a XES log if one is given.
+
+Usage: PYTHONPATH=src python benchmarks/bench_parse_timestamps.py --n 262200 --repeat 5 [--log log.xes.gz]
+"""
+
+
+import argparse, gzip, random, re, time
+
+from podspy.utils import conversion as cvrn
+
+
+OFFSETS = ['+01:00', '+02:00', 'Z', '-05:00']
+TIMESTAMP_PATTERN = re.compile(rb'<date key="[^"]*" value="([^"]*)"')
+
+
+def make_timestamps(n, seed=0):
+    """Generate ISO 8601 timestamps
+
+    :param n: number of timestamps
+    :param seed: random seed
+    :return: list of timestamp strings
+    """
+    rand = random.Random(seed)
+    return ['2011-{:02d}-{:02d}T{:02d}:{:02d}:{:02d}.{:03d}{}'.format(
+        rand.randint(1, 12), rand.randint(1, 28), rand.randint(0, 23), rand.randint(0, 59),
+        rand.randint(0, 59), rand.randint(0, 999), rand.choice(OFFSETS)) for _ in range(n)]
+
+
+def read_timestamps(fp):
+    """Read the date attribute values of a XES log
+
+    :param fp: file path to the log, which can be gzipped
+    :return: list of timestamp strings
+    """
+    opener = gzip.open if fp.endswith('.gz') else open
+    with opener(fp, 'rb') as f:
+        return [value.decode() for value in TIMESTAMP_PATTERN.findall(f.read())]
+
+
+def measure(timestamps, repeat):
+    seconds = list()
+    for _ in range(repeat):
+        start = time.perf_counter()
+        cvrn.parse_timestamps(timestamps)
+        seconds.append(time.perf_counter() - start)
+    return min(seconds), max(seconds)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.split('\n\n')[1])
+    parser.add_argument('--n', type=int, default=262200, help='number of generated timestamps')
+    parser.add_argument('--repeat', type=int, default=5, help='number of runs')
+    parser.add_argument('--log', default=None, help='XES log to read the timestamps from')
+    args = parser.parse_args()
+
+    inputs = [('generated', make_timestamps(args.n))]
+    if args.log is not None:
+        inputs.append((args.log, read_timestamps(args.log)))
+
+    print('{:<40} {:>10} {:>10} {:>10}'.format('timestamps', 'n', 'min (ms)', 'max (ms)'))
+
+    for name, timestamps in inputs:
+        fastest, slowest = measure(timestamps, args.repeat)
+        print('{:<40} {:>10} {:>10.1f} {:>10.1f}'.format(name, len(timestamps), fastest * 1000, slowest * 1000))
+
+
+if __name__ == '__main__':
+    main()
@@ -25,6 +25,11 @@ requirements = [
 ]
 
 
+extra_requirements = {
+    'parquet': ['pyarrow>=3.0.0']
+}
+
+
 test_requirements = [
     'pytest>=4.0.2'
 ]
@@ -45,6 +50,7 @@ setup(
     author_email='walee@uc.cl',
     include_package_data=True,
     install_requires=requirements,
+    extras_require=extra_requirements,
     tests_require=test_requirements,
     setup_requires=setup_requirements,
     zip_safe=False,
@@ -15,7 +15,7 @@ import itertools as itls
 
 from podspy.petrinet.factory import *
 from podspy.petrinet.semantics import *
-from podspy.structure import FootprintMatrix
+from podspy.structure import FootprintMatrix, CausalMatrix
 
 
 logger = logging.getLogger(__file__)
@@ -34,11 +34,15 @@ def powerset(iterable):
 
 
 def apply(causal_mat):
-    """Applies the alpha mining algorithm to a causal matrix.
+    """Applies the alpha mining algorithm to a causal matrix. A log table or a variant log is first turned
+    into its causal matrix with sorted activities.
 
-    :param causal_mat: causal matrix describing the causal relations between activities
+    :param causal_mat: causal matrix describing the causal relations between activities, log table or
+        :class:`podspy.log.variants.VariantLog`
     :return: the discovered accepting petri net
     """
+    if not isinstance(causal_mat, CausalMatrix):
+        causal_mat = CausalMatrix.build_from_logtable(causal_mat, sort=True)
 
     footprint = FootprintMatrix.build_from_causal_matrix(causal_mat)
     causal_pairs = list()
@@ -0,0 +1,240 @@
+#!/usr/bin/env python
+
+"""This is the cache module.
+
+This module contains the LogTableCache class that stores imported log tables on disk
+so that importing the same log file again does not have to parse it.
+"""
+
+
+__all__ = [
+    'LogTableCache'
+]
+
+
+import os, hashlib, pickle, tempfile, time, logging
+
+from . import table as tble
+
+
+logger = logging.getLogger(__file__)
+
+
+class LogTableCache:
+    # file extension of cache entries
+    EXTENSION = '.ltcache'
+    # bytes read at a time when hashing the log file
+    BLOCK_SIZE = 1 << 20
+
+    def __init__(self, cache_dir, max_bytes=1 << 32):
+        """On disk cache of log tables keyed by the fingerprint of the source log file and the import
+        options. Entries store the trace and event dataframes together with the log metadata in pickle
+        format, which keeps the dataframes as column blocks. When the total size of the entries exceeds
+        max_bytes, the least recently used entries are evicted.
+
+        :param cache_dir: directory to store the cache entries
+        :param max_bytes: maximum total size of the cache entries in bytes
+        """
+        self.cache_dir = cache_dir
+        self.max_bytes = max_bytes
+
+        os.makedirs(cache_dir, exist_ok=True)
+
+    def __repr__(self):
+        return '{}({}, {})'.format(self.__class__.__name__, self.cache_dir, self.max_bytes)
+
+    @staticmethod
+    def hash_file(fp):
+        """Compute the content hash of a file
+
+        :param fp: file path
+        :return: hex digest
+        """
+        digest = hashlib.sha1()
+        with open(fp, 'rb') as f:
+            block = f.read(LogTableCache.BLOCK_SIZE)
+            while block:
+                digest.update(block)
+                block = f.read(LogTableCache.BLOCK_SIZE)
+        return digest.hexdigest()
+
+    @staticmethod
+    def normalize(option):
+        """Turn an import option into a value with a deterministic representation, e.g., sets are
+        sorted, so that it can be part of a cache key.
+
+        :param option: import option
+        :return: normalized option
+        """
+        if isinstance(option, dict):
+            return sorted((key, LogTableCache.normalize(value)) for key, value in option.items())
+        elif isinstance(option, (set, frozenset)):
+            return sorted(LogTableCache.normalize(value) for value in option)
+        elif isinstance(option, (list, tuple)):
+            return [LogTableCache.normalize(value) for value in option]
+        return option
+
+    @staticmethod
+    def make_key(fp, caseid_key, include_attribs=None, **options):
+        """Make the cache key of importing a log file with the given options. The key covers the path,
+        size, modification time and content hash of the file, and the effective attributes to include.
+
+        :param fp: file path to the log file
+        :param caseid_key: trace attribute key that allows identification of a unique trace
+        :param include_attribs: event, trace, and log attribute sets to include, None to include all
+        :param options: other import options that change the resulting log table
+        :return: cache key
+        """
+        stat = os.stat(fp)
+
+        fingerprint = (
+            os.path.abspath(fp),
+            stat.st_size,
+            stat.st_mtime_ns,
+            LogTableCache.hash_file(fp),
+            caseid_key,
+            LogTableCache.normalize(include_attribs),
+            LogTableCache.normalize(options)
+        )
+
+        return hashlib.sha1(repr(fingerprint).encode()).hexdigest()
+
+    def get_entry_path(self, key):
+        return os.path.join(self.cache_dir, key + self.EXTENSION)
+
+    def list_entries(self):
+        """List the cache entries from the least to the most recently used
+
+        :return: list of (entry path, size, last used time)
+        """
+        entries = list()
+
+        for name in os.listdir(self.cache_dir):
+            if not name.endswith(self.EXTENSION):
+                continue
+            path = os.path.join(self.cache_dir, name)
+            try:
+                stat = os.stat(path)
+            except FileNotFoundError:
+                # removed by another process
+                continue
+            entries.append((path, stat.st_size, stat.st_mtime))
+
+        return sorted(entries, key=lambda entry: entry[2])
+
+    def get(self, key):
+        """Load the log table of a cache key
+
+        :param key: cache key
+        :return: LogTable or None if the key is not in the cache
+        """
+        path = self.get_entry_path(key)
+
+        try:
+            with open(path, 'rb') as f:
+                entry = pickle.load(f)
+        except FileNotFoundError:
+            return None
+        except Exception as e:
+            logger.warning('Removing unreadable cache entry {}: {}'.format(path, e))
+            self.remove(key)
+            return None
+
+        # the modification time tracks the last use of the entry
+        os.utime(path, None)
+
+        lt = tble.LogTable(
+            trace_df=entry['trace_df'],
+            event_df=entry['event_df'],
+            attributes=entry['attributes'],
+            global_trace_attributes=entry['global_trace_attributes'],
+            global_event_attributes=entry['global_event_attributes'],
+            classifiers=entry['classifiers'],
+            extensions=entry['extensions'],
+            nested_df=entry.get('nested_df', None)
+        )
+        lt.xes_attributes = entry['xes_attributes']
+
+        return lt
+
+    def put(self, key, lt):
+        """Store the log table of a cache key and evict the least recently used entries if the
+        cache exceeds its size.
+
+        :param key: cache key
+        :param lt: log table
+        """
+        entry = {
+            'trace_df': lt.trace_df,
+            'event_df': lt.event_df,
+            'attributes': lt.attributes,
+            'global_trace_attributes': lt.global_trace_attributes,
+            'global_event_attributes': lt.global_event_attributes,
+            'classifiers': lt.classifiers,
+            'extensions': lt.extensions,
+            'xes_attributes': lt.xes_attributes,
+            'nested_df': lt.nested_df
+        }
+
+        # write to a temporary file first so that readers never see a partial entry
+        fd, temp_path = tempfile.mkstemp(dir=self.cache_dir, suffix='.tmp')
+        try:
+            with os.fdopen(fd, 'wb') as f:
+                pickle.dump(entry, f, protocol=pickle.HIGHEST_PROTOCOL)
+            os.replace(temp_path, self.get_entry_path(key))
+        except Exception:
+            os.remove(temp_path)
+            raise
+
+        self.evict()
+
+    def remove(self, key):
+        try:
+            os.remove(self.get_entry_path(key))
+        except FileNotFoundError:
+            pass
+
+    def evict(self):
+        """Remove the least recently used entries until the cache fits its size.
+
+        """
+        entries = self.list_entries()
+        total = sum(size for _, size, _ in entries)
+
+        for path, size, _ in entries:
+            if total <= self.max_bytes:
+                break
+            logger.info('Evicting cache entry {}'.format(path))
+            try:
+                os.remove(path)
+            except FileNotFoundError:
+                pass
+            total -= size
+
+    def clear(self):
+        for path, _, _ in self.list_entries():
+            os.remove(path)
+
+    def load(self, fp, import_func, caseid_key, include_attribs=None, **options):
+        """Get the log table of a log file from the cache, or import it and cache the result.
+
+        :param fp: file path to the log file
+        :param import_func: function that imports the log table on a cache miss
+        :param caseid_key: trace attribute key that allows identification of a unique trace
+        :param include_attribs: event, trace, and log attribute sets to include
+        :param options: other import options that change the resulting log table
+        :return: LogTable
+        """
+        key = self.make_key(fp, caseid_key, include_attribs, **options)
+
+        start = time.time()
+        lt = self.get(key)
+
+        if lt is not None:
+            logger.info('Loading {} from cache took {:.2f}s'.format(fp, time.time() - start))
+            return lt
+
+        lt = import_func()
+        self.put(key, lt)
+
+        return lt
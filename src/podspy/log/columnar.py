@@ -0,0 +1,368 @@
+#!/usr/bin/env python
+
+"""This is the columnar module.
+
+This module contains the ColumnarBuilder class that accumulates attribute values
+column by column to build dataframes without going through a dict per row.
+"""
+
+
+__all__ = [
+    'ColumnarBuilder'
+]
+
+
+import logging
+import numpy as np
+import pandas as pd
+
+from podspy.utils import conversion as cvrn
+
+
+logger = logging.getLogger(__file__)
+
+
+# xes attribute types that can be stored in numpy arrays
+INT_TYPE = 'int'
+FLOAT_TYPE = 'float'
+BOOLEAN_TYPE = 'boolean'
+# timestamp columns hold strings until the dataframe is built
+TIMESTAMP_TYPE = 'date'
+
+
+# code of missing values in categorical columns
+MISSING_CODE = -1
+
+
+CATEGORY_DTYPE = 'category'
+
+
+class ColumnarBuilder:
+    def __init__(self, fill_value=np.nan, categorical=None, dtypes=None):
+        """Accumulator of rows that stores the values of each attribute key in its own column.
+        Columns that are missing in a row are backfilled with the fill value so that all columns
+        have the same length.
+
+        Values of categorical columns are interned as they are set: the column stores integer codes
+        into a table of the distinct values and is built as a :class:`pandas.Categorical`.
+
+        Columns can be given a dtype up front, e.g., int32, which they are built with instead of the dtype
+        that corresponds to their attribute type, see :meth:`make_typed_column`.
+
+        :param fill_value: value for missing attributes
+        :param categorical: attribute keys to build as categorical columns
+        :param dtypes: dict of attribute key to dtype, where category is the same as listing the key in categorical
+        """
+        self.fill_value = fill_value
+        self.categorical = set(categorical) if categorical is not None else set()
+        self.dtypes = dict()
+        self.columns = dict()
+        self.types = dict()
+        # columns with values of more than one attribute type
+        self.mixed = set()
+        # value to code mapping and distinct values of categorical columns
+        self.code_tables = dict()
+        self.categories = dict()
+        # columns that have been backfilled
+        self.missing = set()
+        # (row, path, key, value, type) of the list and container attributes
+        self.nested = list()
+        self.n_rows = 0
+        # number of values set in the current row
+        self.__n_set = 0
+        # columns added in the current row
+        self.__new_keys = list()
+
+        if dtypes is not None:
+            self.set_dtypes(dtypes)
+
+    def __len__(self):
+        return self.n_rows
+
+    def set(self, key, value, _type=None):
+        """Set the value of an attribute in the current row.
+
+        :param key: attribute key
+        :param value: attribute value
+        :param _type: xes type of the attribute, e.g., int
+        """
+        column = self.columns.get(key, None)
+
+        if column is None:
+            column = self.new_column(key, _type)
+        elif _type != self.types[key]:
+            # values of different attribute types are kept as an object column
+            self.mixed.add(key)
+
+        if key in self.code_tables:
+            value = self.encode(key, value)
+
+        if len(column) > self.n_rows:
+            # repeated key within the same row, last value wins
+            column[-1] = value
+        else:
+            column.append(value)
+            self.__n_set += 1
+
+    def encode(self, key, value):
+        """Intern the value of a categorical column.
+
+        :param key: attribute key of a categorical column
+        :param value: attribute value
+        :return: code of the value
+        """
+        if pd.isnull(value):
+            return MISSING_CODE
+
+        code_table = self.code_tables[key]
+        code = code_table.get(value, None)
+
+        if code is None:
+            code = len(code_table)
+            code_table[value] = code
+            self.categories[key].append(value)
+
+        return code
+
+    def add_nested(self, path, key, value, _type):
+        """Add a list or container attribute, or an attribute within one, to the current row. Nested attributes
+        are kept as rows of a side table instead of columns.
+
+        :param path: position of the attribute, e.g., items/0 for the first attribute in the items list
+        :param key: attribute key
+        :param value: attribute value as a string, None for lists and containers
+        :param _type: xes type of the attribute, e.g., list
+        """
+        self.nested.append((self.n_rows, path, key, value, _type))
+
+    def set_dtypes(self, dtypes):
+        """Set the dtypes to build columns with. Only columns that are added after this are interned as
+        categorical columns, existing columns with a category dtype are converted when they are built.
+
+        :param dtypes: dict of attribute key to dtype
+        """
+        for key, dtype in dtypes.items():
+            if isinstance(dtype, str) and dtype == CATEGORY_DTYPE:
+                self.categorical.add(key)
+            else:
+                self.dtypes[key] = dtype
+
+    def new_column(self, key, _type=None):
+        """Add a column that is backfilled for the rows so far.
+
+        :param key: attribute key
+        :param _type: xes type of the attribute
+        :return: the new column
+        """
+        # timestamps are converted in bulk so they are not interned
+        if key in self.categorical and _type != TIMESTAMP_TYPE:
+            self.code_tables[key] = dict()
+            self.categories[key] = list()
+            column = [MISSING_CODE] * self.n_rows
+        else:
+            column = [self.fill_value] * self.n_rows
+
+        self.columns[key] = column
+        self.types[key] = _type
+
+        if self.n_rows > 0:
+            self.missing.add(key)
+
+        self.__new_keys.append(key)
+
+        return column
+
+    def get(self, key, default=None):
+        """Get the value of an attribute in the current row.
+
+        :param key: attribute key
+        :param default: value to return if the attribute is not set in the current row
+        :return: attribute value
+        """
+        column = self.columns.get(key, None)
+
+        if column is None or len(column) == self.n_rows:
+            return default
+
+        if key in self.code_tables:
+            return self.categories[key][column[-1]]
+
+        return column[-1]
+
+    def end_row(self):
+        """Close the current row, backfilling the columns that were not set.
+
+        """
+        self.n_rows += 1
+
+        if self.__n_set < len(self.columns):
+            for key, column in self.columns.items():
+                if len(column) < self.n_rows:
+                    column.append(MISSING_CODE if key in self.code_tables else self.fill_value)
+                    self.missing.add(key)
+
+        self.__n_set = 0
+        self.__new_keys = list()
+
+    def fill(self, key, start, value):
+        """Overwrite the values of a column from row start up to and including the current row.
+
+        :param key: attribute key
+        :param start: first row to overwrite
+        :param value: attribute value
+        """
+        column = self.columns[key]
+
+        if key in self.code_tables:
+            value = self.encode(key, value)
+
+        for i in range(start, len(column)):
+            column[i] = value
+
+    def discard_row(self):
+        """Drop the values set in the current row, including the columns and nested attributes that were added by it.
+
+        """
+        for key in self.__new_keys:
+            del self.columns[key]
+            del self.types[key]
+            self.code_tables.pop(key, None)
+            self.categories.pop(key, None)
+            self.missing.discard(key)
+            self.mixed.discard(key)
+
+        for column in self.columns.values():
+            if len(column) > self.n_rows:
+                column.pop()
+
+        while self.nested and self.nested[-1][0] == self.n_rows:
+            self.nested.pop()
+
+        self.__n_set = 0
+        self.__new_keys = list()
+
+    def add_row(self, row):
+        """Add a row given as a dict of attribute key to value.
+
+        :param row: dict of attribute key to value
+        """
+        for key, value in row.items():
+            self.set(key, value)
+        self.end_row()
+
+    def make_column(self, key):
+        """Convert the accumulated values of a column to an array with a dtype that
+        corresponds to the attribute type. Columns with values of more than one attribute type are
+        kept as objects.
+
+        :param key: column name
+        :return: array or list of values
+        """
+        column = self.columns[key]
+        _type = self.types.get(key, None)
+        has_missing = key in self.missing
+
+        if key in self.code_tables:
+            codes = np.array(column, dtype=np.int32)
+            categorical = pd.Categorical.from_codes(codes, categories=self.categories[key])
+            # values of discarded rows stay interned
+            n_used = np.bincount(codes[codes >= 0], minlength=len(self.categories[key]))
+            if (n_used == 0).any():
+                categorical = categorical.remove_unused_categories()
+            return categorical
+        elif key in self.categorical and _type != TIMESTAMP_TYPE:
+            # added before the column was declared categorical
+            return pd.Categorical(column)
+        elif key in self.mixed:
+            logger.debug('Keeping column {} as objects since it has values of different types'.format(key))
+            return column
+
+        dtype = self.dtypes.get(key, None)
+        if dtype is not None and _type != TIMESTAMP_TYPE:
+            typed = self.make_typed_column(key, column, dtype, has_missing)
+            if typed is not None:
+                return typed
+
+        if _type == FLOAT_TYPE:
+            return np.array(column, dtype=np.float64)
+        elif _type == INT_TYPE:
+            # missing values turn integers to floats like pandas does
+            return np.array(column, dtype=np.float64 if has_missing else np.int64)
+        elif _type == BOOLEAN_TYPE and not has_missing:
+            return np.array(column, dtype=np.bool_)
+        elif _type == TIMESTAMP_TYPE:
+            return cvrn.parse_timestamps(column)
+
+        return column
+
+    def make_typed_column(self, key, column, dtype, has_missing):
+        """Convert the accumulated values of a column to the given dtype. Narrow dtypes are only used if they
+        hold the values exactly: integers that do not fit stay int64 and floats that lose precision stay float64.
+
+        :param key: column name
+        :param column: accumulated values
+        :param dtype: numpy dtype, e.g., int32
+        :param has_missing: whether the column has been backfilled
+        :return: array, or None if the column is left to its attribute type, e.g., integers with missing values
+        """
+        try:
+            dtype = np.dtype(dtype)
+        except TypeError as e:
+            logger.warning('Cannot convert column {} to {}: {}'.format(key, dtype, e))
+            return None
+
+        if dtype.kind in 'iufb':
+            values = np.array(column)
+            # numeric values have to be of a numeric type, and missing values make integers floats
+            kinds = 'iub' if dtype.kind == 'b' else 'iubf'
+            if values.dtype.kind not in kinds:
+                logger.warning('Cannot convert column {} of {} values to {}'.format(key, values.dtype, dtype))
+                return None
+
+        if dtype.kind in 'iu':
+            # integer dtypes cannot hold missing values
+            if has_missing or values.dtype.kind == 'f':
+                return None
+            info = np.iinfo(dtype)
+            if values.shape[0] > 0 and (values.min() < info.min or values.max() > info.max):
+                logger.debug('Keeping column {} as int64 since it does not fit {}'.format(key, dtype))
+                return values.astype(np.int64)
+            return values.astype(dtype)
+
+        elif dtype.kind == 'f':
+            values = values.astype(np.float64)
+            typed = values.astype(dtype)
+            if not ((typed == values) | np.isnan(values)).all():
+                logger.debug('Keeping column {} as float64 since it loses precision as {}'.format(key, dtype))
+                return values
+            return typed
+
+        elif dtype.kind == 'b':
+            return None if has_missing else values
+
+        try:
+            return np.array(column, dtype=dtype)
+        except (TypeError, ValueError) as e:
+            logger.warning('Cannot convert column {} to {}: {}'.format(key, dtype, e))
+            return None
+
+    def to_frame(self, index=None):
+        """Build a dataframe from the accumulated columns.
+
+        :param index: optional index of the dataframe, e.g., a range index
+        :return: dataframe
+        """
+        if index is None:
+            index = pd.RangeIndex(0, self.n_rows)
+
+        data = dict()
+        for key in self.columns.keys():
+            data[key] = pd.Series(self.make_column(key), index=index, copy=False)
+
+        # passing the columns makes pandas convert tz-aware timestamp columns to objects and back
+        columns = list(self.columns.keys())
+        df = pd.DataFrame(data, index=index)
+        if list(df.columns) != columns:
+            df = df[columns]
+
+        return df
@@ -22,3 +22,12 @@ COST_TOTAL = 'cost:total'
 LIFECYCLE_TRANS = 'lifecycle:transition'
 ORG_GROUP = 'org:group'
 TIME_TIMESTAMP = 'time:timestamp'
+
+# columns of the nested attribute table
+SCOPE = 'scope'
+ROW = 'row'
+PATH = 'path'
+KEY = 'key'
+VALUE = 'value'
+TYPE = 'type'
+NESTED_COLUMNS = [SCOPE, ROW, PATH, KEY, VALUE, TYPE]
@@ -2,17 +2,20 @@
 
 """This is the io module.
 
-This module reads log files.
+This module reads and writes log files.
 """
 
-import logging, uuid, time, os, ciso8601, enum
+import logging, uuid, time, os, ciso8601, enum, re, io, mmap, datetime, gzip, bz2, lzma, hashlib
 from lxml import etree
 from . import constants as const
 from . import table as tble
-from podspy.utils import conversion as cvrn
+from . import columnar as clmr
+from . import cache as log_cache
 from . import utils as log_utils
-from urllib.request import urlparse
+from urllib.parse import urlparse
+from pandas.api.types import union_categoricals, CategoricalDtype
 import pandas as pd
+import numpy as np
 
 
 logger = logging.getLogger(__file__)
@@ -20,7 +23,12 @@ logger = logging.getLogger(__file__)
 
 __all__ = [
     'ImportMode',
-    'import_log_table'
+    'import_log_table',
+    'iter_log_table',
+    'iter_log_tables',
+    'import_log_tables',
+    'import_log_table_tail',
+    'export_log_table'
 ]
 
 
@@ -40,6 +48,28 @@ LITERAL = 'string'
 TIMESTAMP = 'date'
 CONTAINER = 'container'
 LIST = 'list'
+# wrapper of the items of a list
+VALUES = 'values'
+COLLECTIONS = (LIST, CONTAINER)
+# types of nested attributes
+NESTED_TYPES = [LITERAL, TIMESTAMP, DISCRETE, CONTINUOUS, BOOLEAN, ID, LIST, CONTAINER]
+
+
+# parser engines
+ITERPARSE_ENGINE = 'iterparse'
+TARGET_ENGINE = 'target'
+ENGINES = (ITERPARSE_ENGINE, TARGET_ENGINE)
+
+
+# schema option to type the columns of the declared global attributes
+GLOBAL_SCHEMA = 'globals'
+# dtypes of the columns of global attributes, narrow dtypes are only used if they hold the values exactly
+GLOBAL_DTYPES = {
+    DISCRETE: 'int32',
+    CONTINUOUS: 'float32',
+    BOOLEAN: 'bool',
+    LITERAL: 'category'
+}
 
 
 class ImportMode(enum.Enum):
@@ -59,31 +89,121 @@ class ImportMode(enum.Enum):
             return None
 
 
-def import_log_table(fp, caseid_key='concept:name', import_mode=ImportMode.BASIC, include_attribs=None):
+def get_include_attribs(import_mode=ImportMode.BASIC, include_attribs=None):
+    """Combine the attributes to include by import mode with the user specified ones
+
+    :param import_mode: import mode
+    :param include_attribs: event, trace, and log attribute sets to include
+    :return: dict that maps strings to sets or None if all attributes are to be included
+    """
+    import_mode_attribs = import_mode.get_include_attribs()
+
+    if include_attribs is not None:
+        if import_mode_attribs is not None:
+            include_attribs[EVENT] = include_attribs.get(EVENT, set()).union(import_mode_attribs[EVENT])
+            include_attribs[TRACE] = include_attribs.get(TRACE, set()).union(import_mode_attribs[TRACE])
+            include_attribs[LOG] = include_attribs.get(LOG, set()).union(import_mode_attribs[LOG])
+    else:
+        include_attribs = import_mode_attribs
+
+    return include_attribs
+
+
+def import_log_table(fp, caseid_key='concept:name', import_mode=ImportMode.BASIC, include_attribs=None,
+                     workers=None, cache=None, categorical=None, trace_filter=None, event_filter=None,
+                     sampler=None, engine=ITERPARSE_ENGINE, schema=None, optimize=False):
     """Import a xes file as log table
 
-    :param fp: file path to the XES file
+    :param fp: file path to the XES file, which can be compressed with gzip, bz2, xz or zip
     :param caseid_key: trace attribute key that allows identification of a unique trace
     :param import_mode: import mode, quick way to limit the event, trace, and log attributes to import for memory reason
     :param include_attribs: event, trace, and log attribute sets to include, require all three if this is not None. For
     example, d = { 'event': { 'e_a0', 'e_a1' }, 'trace': { 't_a0', 't_a1' }, 'log': { 'l_a0', 'l_a1' }}
     :type include_attribs: dict that maps strings to sets or None
+    :param workers: number of processes to parse the log with, see :func:`import_log_table_parallel`. Parse in the
+    current process if None or 1, use all the cpus if 0 or negative.
+    :param cache: :class:`podspy.log.cache.LogTableCache` or cache directory to reuse the log table of
+    a previous import of the same file with the same options
+    :param categorical: event and trace attribute sets to intern as categorical columns while parsing. For
+    example, d = { 'event': { 'concept:name', 'org:resource' }, 'trace': { 't_a0' }}
+    :type categorical: dict that maps strings to sets or None
+    :param trace_filter: function that takes the dict of all the attributes of a trace and returns whether to
+    import the trace. Rejected traces and their events are skipped before any row is created.
+    :param event_filter: function that takes the dict of all the attributes of an event and returns whether
+    to import the event. Filters have to be picklable functions for parallel imports, and imports with
+    filters are not cached.
+    :param sampler: trace sampler from :mod:`podspy.log.sampling` to import a subset of the traces that
+    pass the trace filter, e.g., ``HeadSampler(1000)`` stops parsing after the first 1000 traces. Samplers that
+    depend on the order of the whole log are parsed in the current process.
+    :param engine: parser engine, 'iterparse' parses the log trace by trace with :func:`lxml.etree.iterparse` and
+    supports all the options, 'target' feeds the log to a :class:`LogTableTarget` without building any XML tree
+    and supports neither parallel parsing, filters, samplers nor schemas.
+    :param schema: dtypes to build the event and trace columns with instead of inferring them after parsing. 'globals'
+    types the columns of the global attributes declared by the log according to :data:`GLOBAL_DTYPES`, e.g.,
+    int attributes as int32 and string attributes as categorical. A dict of user dtypes is applied on top of the
+    globals, for example, d = { 'event': { 'cost': 'float64', 'org:resource': 'category' }}
+    :type schema: str, dict that maps strings to dicts of attribute key to dtype, or None
+    :param optimize: reduce the memory of the imported columns with :func:`podspy.log.utils.optimize_log_table`,
+    e.g., downcast numbers and categorize strings with few distinct values. The per column savings are logged.
     :return: LogTable
     """
 
     start = time.time()
 
-    import_mode_attribs = import_mode.get_include_attribs()
+    if engine not in ENGINES:
+        raise ValueError('Unknown engine {}, use one of {}'.format(engine, ENGINES))
+
+    if engine == TARGET_ENGINE:
+        has_workers = workers is not None and workers != 1
+        if has_workers or trace_filter is not None or event_filter is not None or sampler is not None \
+                or schema is not None:
+            raise ValueError('Parallel parsing, filters, samplers and schemas require the {} engine'.format(
+                ITERPARSE_ENGINE))
+
+    include_attribs = get_include_attribs(import_mode, include_attribs)
+
+    # options that change the resulting log table
+    options = {
+        'categorical': categorical,
+        'trace_filter': trace_filter,
+        'event_filter': event_filter,
+        'sampler': sampler,
+        'schema': schema
+    }
+
+    if cache is not None and (trace_filter is not None or event_filter is not None):
+        logger.warning('Not caching import with trace or event filters')
+        cache = None
+
+    if workers is not None and workers != 1 and sampler is not None and not sampler.PARALLEL:
+        logger.warning('Parsing in the current process since {} cannot sample in parallel'.format(sampler))
+        workers = None
+
+    def do_import():
+        if engine == TARGET_ENGINE:
+            lt = import_log_table_target(fp, caseid_key, include_attribs, categorical)
+        elif workers is None or workers == 1:
+            lt = import_log_table_iterparse(fp, caseid_key, include_attribs, **options)
+        else:
+            lt = import_log_table_parallel(fp, caseid_key, include_attribs, workers, **options)
 
-    if include_attribs is not None:
-        if import_mode_attribs is not None:
-            include_attribs[EVENT] = include_attribs.get(EVENT, set()).union(import_mode_attribs[EVENT])
-            include_attribs[TRACE] = include_attribs.get(TRACE, set()).union(import_mode_attribs[TRACE])
-            include_attribs[LOG] = include_attribs.get(LOG, set()).union(import_mode_attribs[LOG])
-    else:
-        include_attribs = import_mode_attribs
+        if optimize:
+            report = log_utils.optimize_log_table(lt)
+            logger.info('Optimized columns from {} to {} bytes:\n{}'.format(
+                report['bytes_before'].sum(), report['bytes_after'].sum(), report))
 
-    lt = import_log_table_iterparse(fp, caseid_key, include_attribs)
+        return lt
+
+    if cache is None:
+        lt = do_import()
+    else:
+        if isinstance(cache, str):
+            cache = log_cache.LogTableCache(cache)
+        cache_options = dict(options)
+        # only part of the key if set so that existing entries stay valid
+        if optimize:
+            cache_options['optimize'] = optimize
+        lt = cache.load(fp, do_import, caseid_key, include_attribs, **cache_options)
 
     diff = time.time() - start
     logger.info('Parsing log to log table took {} seconds'.format(diff))
@@ -91,18 +211,239 @@ def import_log_table(fp, caseid_key='concept:name', import_mode=ImportMode.BASIC
     return lt
 
 
+def iter_log_table(fp, caseid_key='concept:name', import_mode=ImportMode.BASIC, include_attribs=None,
+                   chunk_traces=10000, categorical=None, trace_filter=None, event_filter=None, sampler=None,
+                   schema=None):
+    """Import a xes file as a stream of log tables, each containing at most chunk_traces traces. Chunks are
+    cut at trace boundaries so that all the events of a trace are in the same log table.
+
+    Trace and event dataframes of each chunk are indexed by their position in the whole log, so concatenating
+    the chunks gives the same dataframes as :func:`import_log_table`. The log attributes, globals, classifiers
+    and extensions are repeated in every chunk.
+
+    :param fp: file path to the XES file
+    :param caseid_key: trace attribute key that allows identification of a unique trace
+    :param import_mode: import mode, quick way to limit the event, trace, and log attributes to import for memory reason
+    :param include_attribs: event, trace, and log attribute sets to include, see :func:`import_log_table`
+    :param chunk_traces: maximum number of traces per log table
+    :param categorical: event and trace attribute sets to intern as categorical columns, categories can
+    differ between chunks
+    :param trace_filter: function that takes the dict of attributes of a trace and returns whether to keep it
+    :param event_filter: function that takes the dict of attributes of an event and returns whether to keep it
+    :param sampler: trace sampler from :mod:`podspy.log.sampling`, see :func:`import_log_table`
+    :param schema: dtypes of the event and trace columns, see :func:`import_log_table`
+    :return: generator of LogTable
+    """
+    if chunk_traces is None or chunk_traces < 1:
+        raise ValueError('Number of traces per chunk has to be positive: {}'.format(chunk_traces))
+
+    include_attribs = get_include_attribs(import_mode, include_attribs)
+
+    return iter_log_table_iterparse(fp, caseid_key, include_attribs, chunk_traces, categorical=categorical,
+                                    trace_filter=trace_filter, event_filter=event_filter, sampler=sampler,
+                                    schema=schema)
+
+
+# file name endings of logs in a directory
+LOG_FILE_EXTENSIONS = ('.xes', '.xes.gz', '.xes.bz2', '.xes.xz', '.xes.zip')
+# column of merged log tables that identifies the source log file
+SOURCE = 'source'
+
+
+def list_log_files(dirpath):
+    """List the log files in a directory
+
+    :param dirpath: directory path
+    :return: sorted list of file paths
+    """
+    names = sorted(name for name in os.listdir(dirpath) if name.lower().endswith(LOG_FILE_EXTENSIONS))
+    return [os.path.join(dirpath, name) for name in names]
+
+
+def import_log_table_task(args):
+    """Import a log file and time it without raising. This is the work unit of :func:`import_log_tables`.
+
+    :param args: tuple of (file path, dict of keyword arguments of :func:`import_log_table`)
+    :return: (LogTable or None, dict of the file path, seconds, number of traces, number of events and error)
+    """
+    fp, kwargs = args
+    start = time.time()
+    lt, error = None, None
+
+    try:
+        lt = import_log_table(fp, **kwargs)
+    except Exception as e:
+        logger.error('Cannot import {}: {!r}'.format(fp, e))
+        error = repr(e)
+
+    report = {
+        'path': fp,
+        'seconds': time.time() - start,
+        'traces': lt.trace_df.shape[0] if lt is not None else 0,
+        'events': lt.event_df.shape[0] if lt is not None else 0,
+        'error': error
+    }
+
+    return lt, report
+
+
+def merge_log_tables(lts, sources, positions=None):
+    """Merge log tables of different log files into one. Caseids are prefixed with the position of their
+    source so that they are unique across sources, and the trace and event dataframes get a categorical
+    source column. The log level information of the first log table is kept. The dataframes are concatenated
+    eagerly into new dataframes, see :func:`import_log_tables`.
+
+    :param lts: list of log tables
+    :param sources: list of source names, e.g., file paths
+    :param positions: list of the positions of the sources in the batch, e.g., with the files that failed
+    to import, None if the sources are the whole batch
+    :return: LogTable
+    """
+    sources = list(sources)
+    if positions is None:
+        positions = range(len(sources))
+
+    source_dtype = CategoricalDtype(pd.unique(sources))
+    trace_dfs, event_dfs = list(), list()
+
+    for i, lt, source in zip(positions, lts, sources):
+        for df, dfs in ((lt.trace_df, trace_dfs), (lt.event_df, event_dfs)):
+            df = df.copy(deep=False)
+            if const.CASEID in df.columns:
+                df[const.CASEID] = ['{}:{}'.format(i, caseid) for caseid in df[const.CASEID].tolist()]
+            df[SOURCE] = pd.Categorical([source] * df.shape[0], dtype=source_dtype)
+            dfs.append(df)
+
+    first = lts[0] if lts else tble.LogTable()
+
+    lt = tble.LogTable(
+        trace_df=concat_frames(trace_dfs) if trace_dfs else None,
+        event_df=concat_frames(event_dfs) if event_dfs else None,
+        attributes=dict(first.attributes),
+        global_trace_attributes=dict(first.global_trace_attributes),
+        global_event_attributes=dict(first.global_event_attributes),
+        classifiers=dict(first.classifiers),
+        extensions=dict(first.extensions),
+        nested_df=concat_nested_frames(lts) if lts else None
+    )
+    lt.xes_attributes = dict(first.xes_attributes)
+
+    return lt
+
+
+def iter_log_tables(paths, workers=None, **kwargs):
+    """Import a batch of xes files with a pool of processes, one file per task, and yield the log tables
+    one at a time in the order of the paths. Unlike :func:`import_log_tables`, the caller can process and
+    drop each log table before the next one is taken, so that only the tables that are still being parsed
+    or waiting to be taken are held in memory. A file that cannot be imported is reported and does not
+    abort the batch.
+
+    :param paths: list of file paths, or a directory path to import all the log files in it
+    :param workers: number of processes, import in the current process if None or 1, use all the cpus if 0
+    or negative
+    :param kwargs: keyword arguments of :func:`import_log_table`
+    :return: generator of (LogTable or None if the file failed, dict of the path, seconds, number of traces,
+    number of events and error of the file)
+    """
+    if isinstance(paths, str):
+        paths = list_log_files(paths)
+
+    paths = list(paths)
+    tasks = [(fp, kwargs) for fp in paths]
+
+    if workers is None or workers == 1:
+        for task in tasks:
+            yield import_log_table_task(task)
+        return
+
+    if workers < 1:
+        workers = os.cpu_count()
+
+    # imported on first use since it loads multiprocessing
+    from concurrent.futures import ProcessPoolExecutor
+
+    with ProcessPoolExecutor(max_workers=workers) as executor:
+        futures = [executor.submit(import_log_table_task, task) for task in tasks]
+
+        for i, (fp, future) in enumerate(zip(paths, futures)):
+            try:
+                result = future.result()
+            except Exception as e:
+                # the worker died or the result could not be sent back
+                logger.error('Cannot import {}: {!r}'.format(fp, e))
+                report = { 'path': fp, 'seconds': np.nan, 'traces': 0, 'events': 0, 'error': repr(e) }
+                result = (None, report)
+
+            # drop the reference of the executor so that the table is freed once the caller drops it
+            futures[i] = None
+            yield result
+
+
+def import_log_tables(paths, workers=None, merge=False, **kwargs):
+    """Import a batch of xes files with a pool of processes, one file per task. A file that cannot be
+    imported is reported and does not abort the batch.
+
+    The merge is eager: a LogTable is backed by in memory dataframes, so the merged table is built by
+    concatenating the dataframes of all the imported tables once they are parsed, which takes about twice
+    their memory at its peak. Use :func:`iter_log_tables` to process the tables one at a time instead.
+
+    :param paths: list of file paths, or a directory path to import all the log files in it
+    :param workers: number of processes, import in the current process if None or 1, use all the cpus if 0
+    or negative
+    :param merge: whether to merge the imported log tables into one, see :func:`merge_log_tables`
+    :param kwargs: keyword arguments of :func:`import_log_table`
+    :return: list of LogTable or None for the files that failed, or the merged LogTable, and a report
+    dataframe with the path, seconds, number of traces, number of events and error of each file
+    """
+    if isinstance(paths, str):
+        paths = list_log_files(paths)
+
+    paths = list(paths)
+    start = time.time()
+
+    results = list(iter_log_tables(paths, workers=workers, **kwargs))
+
+    lts = [lt for lt, _ in results]
+    report = pd.DataFrame([report for _, report in results], columns=['path', 'seconds', 'traces', 'events', 'error'])
+
+    n_failed = report['error'].notnull().sum()
+    logger.info('Importing {} log files took {:.2f}s, {} failed'.format(len(paths), time.time() - start, n_failed))
+
+    if merge:
+        imported = [i for i, lt in enumerate(lts) if lt is not None]
+        merged = merge_log_tables([lts[i] for i in imported], [paths[i] for i in imported], imported)
+        return merged, report
+
+    return lts, report
+
+
 class LogTableTarget:
     """Parser target class to pass to the :class:`lxml.etree.XMLParser` to build a
     :class:`podspy.log.table.LogTable`.
 
     """
-    def __init__(self):
-        self.__trace = None
-        self.__event = None
-        self.__attribute_stack = list()   # stack
-        self.__attributable_stack = list()    # stack
-        self.__extension = set()
-        self.__globals = None
+    def __init__(self, caseid_key='concept:name', include_attribs=None, categorical=None):
+        """Parser target that builds the trace and event dataframes column by column as the start and end
+        events of the XML elements come in, without building the XML tree. Element tags are dispatched to
+        their handlers through a table that is resolved once per tag.
+
+        :param caseid_key: attribute key for trace caseid
+        :param include_attribs: dict of string to string set mapping of attributes to include, None to include all
+        :param categorical: dict of string to string set mapping of attributes to intern as categorical columns
+        """
+        self.caseid_key = caseid_key
+
+        self.__to_include_event = include_attribs.get(EVENT, None) if include_attribs is not None else None
+        self.__to_include_trace = include_attribs.get(TRACE, None) if include_attribs is not None else None
+        self.__to_include_log = include_attribs.get(LOG, None) if include_attribs is not None else None
+
+        self.__use_caseid_key = self.__to_include_trace is None or caseid_key in self.__to_include_trace
+
+        categorical_event = categorical.get(EVENT, None) if categorical is not None else None
+        categorical_trace = categorical.get(TRACE, None) if categorical is not None else None
+
+        self.__event_builder = clmr.ColumnarBuilder(categorical=categorical_event)
+        self.__trace_builder = clmr.ColumnarBuilder(categorical=categorical_trace)
 
         self.__global_trace_attribs = dict()
         self.__global_event_attribs = dict()
@@ -110,205 +451,219 @@ class LogTableTarget:
         self.__classifiers = dict()
         self.__log_attribs = dict()
         self.__xes_attribs = dict()
-        self.__trace_df_dict = dict()
-        self.__event_df_dict = dict()
-        self.__caseid = None
-        self.__trace_ind = 0
-        self.__event_ind = 0
 
-    @staticmethod
-    def __get_localname(tag):
-        qname = etree.QName(tag)
-        return qname.localname
+        # attributes go to a columnar builder or a dict depending on the enclosing element
+        self.__builder = None
+        self.__attrib_dict = None
+        self.__to_include = None
+        # depth of nested attribute elements, only the outermost attributes are imported as columns
+        self.__attribute_depth = 0
+        # [path, depth, number of items] of the enclosing lists and containers, and the number of
+        # nested attributes of the current trace and event
+        self.__nested_stack = list()
+        self.__n_nested_trace = 0
+        self.__n_nested_event = 0
+        # first event row of the current trace and the caseid given to its events
+        self.__trace_event_start = 0
+        self.__event_caseid = None
+        self.__trace_ind = 0
 
-    def parse_extension_elem(self, attrib):
-        name = attrib['name']
-        prefix = attrib['prefix']
-        uri = urlparse(attrib['uri'])
+        self.__start_handlers = {
+            LOG: self.start_log,
+            TRACE: self.start_trace,
+            EVENT: self.start_event,
+            EXTENSION: self.start_extension,
+            GLOBAL: self.start_global,
+            CLASSIFIER: self.start_classifier
+        }
+        self.__end_handlers = {
+            LOG: self.end_attributable,
+            TRACE: self.end_trace,
+            EVENT: self.end_event,
+            GLOBAL: self.end_attributable
+        }
+        for localname in ATTRIBUTE_PARSERS.keys():
+            self.__start_handlers[localname] = self.start_attribute
+            self.__end_handlers[localname] = self.end_attribute
+        for localname in COLLECTIONS:
+            self.__start_handlers[localname] = self.start_collection
+            self.__end_handlers[localname] = self.end_collection
+
+        # maps element tag to (localname, start handler, end handler)
+        self.__tag_handlers = dict()
+
+    def get_handlers(self, tag):
+        handlers = self.__tag_handlers.get(tag, None)
+
+        if handlers is None:
+            localname = get_localname(tag)
+            handlers = (localname, self.__start_handlers.get(localname, None), self.__end_handlers.get(localname, None))
+            self.__tag_handlers[tag] = handlers
+
+        return handlers
+
+    def start_log(self, localname, attrib_dict):
+        # make the xes attributes
+        self.__xes_attribs = dict(attrib_dict)
+        self.__builder = None
+        self.__attrib_dict = self.__log_attribs
+        self.__to_include = self.__to_include_log
+
+    def start_trace(self, localname, attrib_dict):
+        self.__builder = self.__trace_builder
+        self.__to_include = self.__to_include_trace
+        self.__trace_event_start = len(self.__event_builder)
+        self.__event_caseid = None
+        self.__n_nested_trace = 0
+
+    def start_event(self, localname, attrib_dict):
+        if len(self.__event_builder) == self.__trace_event_start and self.__use_caseid_key:
+            # events of a trace get the caseid known at its first event, which is None if the trace attributes
+            # come after the events
+            self.__event_caseid = self.__trace_builder.get(self.caseid_key, None)
+        self.__builder = self.__event_builder
+        self.__to_include = self.__to_include_event
+        self.__n_nested_event = 0
+
+    def start_extension(self, localname, attrib_dict):
+        name = attrib_dict['name']
+        prefix = attrib_dict['prefix']
+        uri = urlparse(attrib_dict['uri'])
 
         self.__extensions[name] = (name, prefix, uri)
 
-    def parse_classifier_elem(self, attrib):
-        name = attrib['name']
-        keys = attrib['keys']
+    def start_global(self, localname, attrib_dict):
+        scope = attrib_dict.get('scope', EVENT).lower()
+        self.__builder = None
+        self.__attrib_dict = self.__global_trace_attribs if scope == TRACE else self.__global_event_attribs
+        self.__to_include = None
 
-        def get_keylist(key_str, keys):
-            """Problem: key_str contains keys separated by space, but we don't know which
-            space is a separator between two keys and which are simply spaces of a single
-            key.
+    def start_classifier(self, localname, attrib_dict):
+        known_keys = self.__global_event_attribs.keys()
+        self.__classifiers[attrib_dict['name']] = parse_classifier_keys(attrib_dict['keys'], known_keys)
 
-            Solution: given a set of known keys, replace parts of the key_str with '' if
-            it correspond to a known key. The rest should be a new key.
+    def start_attribute(self, localname, attrib_dict):
+        self.__attribute_depth += 1
 
-            :param key_str: string containing keys
-            :param keys: known keys
-            :return: list of keys
-            """
-            if ' ' not in key_str:
-                return [key_str]
+        if self.__attribute_depth > 1:
+            self.start_nested(localname, attrib_dict)
+            return
 
-            # add a space padding to the front and back of the key_str to facilitate replace in forloop
-            key_str = ' {} '.format(key_str)
-            key_str_1 = str(key_str)
-            keylist = []
+        key = attrib_dict.get('key', 'UNKNOWN')
+        to_include = self.__to_include
 
-            for key in keys:
-                if ' {} '.format(key) in key_str_1:
-                    # find out the location of the key in the string so we can order the keys later on
-                    start_ind = key_str.find(' {} '.format(key))
-                    keylist.append((key, start_ind))
-                    key_str_1 = key_str_1.replace(key, '')
+        if to_include is not None and key not in to_include:
+            return
 
-            # add the remaining key_str as a new key
-            key_str_1 = key_str_1.strip()
+        value = attrib_dict.get('value', '')
+        builder = self.__builder
 
-            if key_str_1 != '':
-                start_ind = key_str.find(key_str_1)
-                keylist.append((key_str_1, start_ind))
+        if builder is not None:
+            builder.set(key, COLUMNAR_ATTRIBUTE_PARSERS[localname](key, value), localname)
+        elif self.__attrib_dict is not None:
+            self.__attrib_dict[key] = ATTRIBUTE_PARSERS[localname](key, value)
 
-            # sort the keys
-            keylist = sorted(keylist, key=lambda item: item[1])
-            keylist, _ = zip(*keylist)
+    def start_collection(self, localname, attrib_dict):
+        self.__attribute_depth += 1
+        self.start_nested(localname, attrib_dict)
 
-            return list(keylist)
+    def start_nested(self, localname, attrib_dict):
+        """Add a list or container attribute of a trace or event, or an attribute within one, to the nested
+        attributes. See :func:`iter_nested_attributes` for the paths.
 
-        known_keys = set(self.__global_event_attribs.keys())
-        # logger.debug('Known classifier keys: {}'.format(known_keys))
+        """
+        key = attrib_dict.get('key', 'UNKNOWN')
+        depth = self.__attribute_depth
+        builder = self.__builder
+        stack = self.__nested_stack
 
-        keylist = get_keylist(keys, known_keys)
-        self.__classifiers[name] = keylist
+        if depth == 1:
+            if builder is None:
+                logger.warning('Not supporting {} attribute: {}'.format(localname, key))
+                return
+            if self.__to_include is not None and key not in self.__to_include:
+                return
+            if builder is self.__trace_builder:
+                path = str(self.__n_nested_trace)
+                self.__n_nested_trace += 1
+            else:
+                path = str(self.__n_nested_event)
+                self.__n_nested_event += 1
+        elif stack and stack[-1][1] == depth - 1:
+            frame = stack[-1]
+            path = '{}/{}'.format(frame[0], frame[2])
+            frame[2] += 1
+        else:
+            # attribute within an elementary attribute
+            return
 
-    def start(self, tag, attrib_dict):
-        localname = self.__get_localname(tag).lower()
-        logger.debug('start {} {}'.format(localname, attrib_dict))
-        if localname not in [LITERAL, TIMESTAMP, DISCRETE, BOOLEAN, CONTINUOUS, ID, LIST, CONTAINER]:
-            if localname == EVENT:
-                self.__event = dict()
-                self.__attributable_stack.append(self.__event)
-            elif localname == TRACE:
-                self.__trace = dict()
-                self.__attributable_stack.append(self.__trace)
-            elif localname == LOG:
-                # make the xes attributes
-                self.__xes_attribs = dict(attrib_dict)
-                self.__attributable_stack.append(self.__log_attribs)
-            elif localname == EXTENSION:
-                self.parse_extension_elem(attrib_dict)
-            elif localname == GLOBAL:
-                scope = attrib_dict['scope']
+        is_collection = localname in COLLECTIONS
+        builder.add_nested(path, key, None if is_collection else attrib_dict.get('value', ''), localname)
 
-                if scope.lower() == TRACE:
-                    self.__globals = self.__global_trace_attribs
-                elif scope.lower() == EVENT:
-                    self.__globals = self.__global_event_attribs
+        if is_collection:
+            stack.append([path, depth, 0])
 
-            elif localname == CLASSIFIER:
-                self.parse_classifier_elem(attrib_dict)
-        else:
-            # it's an attribute
-            key = attrib_dict.get('key', 'UNKNOWN')
-            value = attrib_dict.get('value', '')
-
-            attrib = None
-
-            if localname == LITERAL:
-                attrib = (key, value)
-                if self.__trace is not None and key == 'concept:name' and self.__event is None:
-                    # record caseid
-                    self.__caseid = value
-
-            elif localname == TIMESTAMP:
-                time = cvrn.parse_timestamp(value)
-                attrib = (key, time)
-
-            elif localname == DISCRETE:
-                try:
-                    int_value = int(value)
-                except ValueError as e:
-                    logger.error('Cannot convert {} as int: {}'.format(value, e))
-                    int_value = 0
-                attrib = (key, int_value)
-
-            elif localname == CONTINUOUS:
-                try:
-                    float_value = float(value)
-                except ValueError as e:
-                    logger.error('Cannot convert {} as float: {}'.format(value, e))
-                    float_value = 0.
-                attrib = (key, float_value)
-
-            elif localname == BOOLEAN:
-                bool_value = True if value.lower() == 'true' else False
-                attrib = (key, bool_value)
-
-            elif localname == ID:
-                try:
-                    id_value = uuid.UUID(value)
-                except ValueError as e:
-                    logger.error('Cannot convert {} as id: {}'.format(value, e))
-                    id_value = value
-                attrib = (key, id_value)
-
-            elif localname == LIST:
-                logger.warning('Not supporting list attributes')
-                attrib = (None, None)
-
-            elif localname == CONTAINER:
-                logger.warning('Not supporting container attributes')
-                attrib = (None, None)
-
-            if attrib is not None:
-                self.__attribute_stack.append(attrib)
+    def end_attribute(self, localname):
+        self.__attribute_depth -= 1
 
-    def end(self, tag):
-        localname = self.__get_localname(tag).lower()
-        logger.debug('end {}'.format(localname))
+    def end_collection(self, localname):
+        stack = self.__nested_stack
+        if stack and stack[-1][1] == self.__attribute_depth:
+            stack.pop()
+        self.__attribute_depth -= 1
 
-        if localname == GLOBAL:
-            self.__globals = None
+    def end_attributable(self, localname):
+        # attributes that follow belong to the log
+        self.__builder = None
+        self.__attrib_dict = self.__log_attribs if localname != LOG else None
+        self.__to_include = self.__to_include_log
 
-        elif localname not in [LITERAL, TIMESTAMP, DISCRETE, CONTINUOUS, BOOLEAN, ID, LIST, CONTAINER]:
-            if localname == EVENT:
-                self.__event[const.CASEID] = self.__caseid
-                self.__event_df_dict[self.__event_ind] = self.__event
-                self.__event_ind += 1
-                self.__event = None
-                self.__attributable_stack.pop()
+    def end_event(self, localname):
+        self.__event_builder.set(const.CASEID, self.__event_caseid)
+        self.__event_builder.end_row()
+        self.__builder = self.__trace_builder
+        self.__to_include = self.__to_include_trace
 
-            elif localname == TRACE:
-                self.__trace_df_dict[self.__trace_ind] = self.__trace
-                self.__trace_ind += 1
-                self.__trace = None
-                self.__attributable_stack.pop()
+    def end_trace(self, localname):
+        caseid = self.get_caseid()
+        self.__trace_builder.set(const.CASEID, caseid)
+        self.__trace_builder.end_row()
 
-            elif localname == LOG:
-                self.__attributable_stack.pop()
+        if self.__trace_event_start < len(self.__event_builder) and self.__event_caseid != caseid:
+            # trace attributes that come after the events set the caseid
+            self.__event_builder.fill(const.CASEID, self.__trace_event_start, caseid)
 
-        else:
-            key, value = self.__attribute_stack.pop()
+        self.__trace_ind += 1
+        self.end_attributable(localname)
 
-            if key is None and value is None:
-                return
+    def get_caseid(self):
+        caseid = self.__trace_builder.get(self.caseid_key, None) if self.__use_caseid_key else None
+        return self.__trace_ind if caseid is None else caseid
 
-            if self.__globals is not None:
-                self.__globals[key] = value
+    def start(self, tag, attrib_dict):
+        handlers = self.__tag_handlers.get(tag, None)
+        localname, handler, _ = self.get_handlers(tag) if handlers is None else handlers
 
-            else:
-                self.__attributable_stack[-1][key] = value
+        if handler is not None:
+            handler(localname, attrib_dict)
+
+    def end(self, tag):
+        handlers = self.__tag_handlers.get(tag, None)
+        localname, _, handler = self.get_handlers(tag) if handlers is None else handlers
+
+        if handler is not None:
+            handler(localname)
 
     def data(self, data):
-        # logger.debug('data {}'.format(data))
         pass
 
     def comment(self, text):
-        # logger.debug('comment {}'.format(text))
         pass
 
     def close(self):
-        # logger.debug('close')
-
-        event_df = pd.DataFrame.from_dict(self.__event_df_dict, 'index')
-        trace_df = pd.DataFrame.from_dict(self.__trace_df_dict, 'index')
+        trace_df = self.__trace_builder.to_frame()
+        event_df = self.__event_builder.to_frame()
+        nested_df = make_nested_frame(self.__trace_builder, trace_df.index, self.__event_builder, event_df.index)
 
         lt = tble.LogTable(
             trace_df=trace_df,
@@ -317,70 +672,354 @@ class LogTableTarget:
             global_trace_attributes=self.__global_trace_attribs,
             global_event_attributes=self.__global_event_attribs,
             classifiers=self.__classifiers,
-            extensions=self.__extensions
+            extensions=self.__extensions,
+            nested_df=nested_df
         )
 
-        lt.xes_attributes = self.__xes_attribs
+        if self.__xes_attribs:
+            lt.xes_attributes = self.__xes_attribs
 
         return lt
 
 
-def is_attrib(tag):
-    return tag.endswith((
-        LITERAL, TIMESTAMP, DISCRETE, BOOLEAN, CONTINUOUS, ID, LIST, CONTAINER
-    ))
+def import_log_table_target(fp, caseid_key, include_attribs=None, categorical=None, block_size=1 << 20):
+    """Parse a XES log file by feeding it to a parser with a :class:`LogTableTarget` block by block.
 
+    :param fp: file path to XES log file, which can be compressed, or a file object
+    :param caseid_key: attribute key for trace caseid
+    :param include_attribs: dict of string to string set mapping of attributes to include
+    :param categorical: dict of string to string set mapping of attributes to intern as categorical columns
+    :param block_size: number of bytes to feed to the parser at a time
+    :return: LogTable
+    """
+    target = LogTableTarget(caseid_key, include_attribs, categorical)
+    parser = etree.XMLParser(target=target, huge_tree=True)
 
-def process_attributable(elem, to_include=None):
-    result = dict()
+    is_path = isinstance(fp, str)
+    source = log_utils.open_log_file(fp) if is_path else fp
+
+    try:
+        start = time.time()
+
+        block = source.read(block_size)
+        while block:
+            parser.feed(block)
+            block = source.read(block_size)
+
+        lt = parser.close()
+
+        logger.info('Parsing log took {:.2f}s'.format(time.time() - start))
+    finally:
+        if is_path:
+            source.close()
+
+    return lt
+
+
+def get_localname(tag):
+    """Get the lower case local name of a tag ignoring its namespace
+
+    :param tag: element tag, e.g., {http://www.xes-standard.org/}string
+    :return: local name, e.g., string
+    """
+    return tag[tag.rfind('}') + 1:].lower()
+
+
+def parse_literal(key, value):
+    return value
+
+
+def parse_timestamp(key, value):
+    return ciso8601.parse_datetime(value)
+
+
+def parse_discrete(key, value):
+    try:
+        int_value = int(value)
+    except ValueError as e:
+        logger.error('Cannot convert {} with discrete value {}: {}'.format(key, value, e))
+        int_value = 0
+    return int_value
+
+
+def parse_continuous(key, value):
+    try:
+        float_value = float(value)
+    except ValueError as e:
+        logger.error('Cannot convert {} with continuous value {}: {}'.format(key, value, e))
+        float_value = 0.
+    return float_value
+
+
+def parse_boolean(key, value):
+    return True if value.lower() == 'true' else False
+
+
+def parse_id(key, value):
+    try:
+        id_value = uuid.UUID(value)
+    except ValueError as e:
+        logger.error('Cannot convert {} with ID value {}: {}'.format(key, value, e))
+        id_value = value
+    return id_value
+
+
+# maps attribute tag to value parser
+ATTRIBUTE_PARSERS = {
+    LITERAL: parse_literal,
+    TIMESTAMP: parse_timestamp,
+    DISCRETE: parse_discrete,
+    CONTINUOUS: parse_continuous,
+    BOOLEAN: parse_boolean,
+    ID: parse_id
+}
+
+
+# timestamps are kept as strings in columns and converted in bulk by the columnar builder
+COLUMNAR_ATTRIBUTE_PARSERS = dict(ATTRIBUTE_PARSERS)
+COLUMNAR_ATTRIBUTE_PARSERS[TIMESTAMP] = parse_literal
+
+
+# maps element tag to (localname, parser, columnar parser) so that namespaces are only resolved once per tag
+ATTRIBUTE_TAG_CACHE = dict()
+
+
+def get_attribute_info(tag):
+    """Get the local name and value parsers of an attribute element tag
+
+    :param tag: element tag
+    :return: (localname, parser, columnar parser), parsers are None if it is not an elementary attribute
+    """
+    info = ATTRIBUTE_TAG_CACHE.get(tag, None)
+
+    if info is None:
+        # comments and processing instructions do not have string tags
+        localname = get_localname(tag) if isinstance(tag, str) else None
+        info = (localname, ATTRIBUTE_PARSERS.get(localname, None), COLUMNAR_ATTRIBUTE_PARSERS.get(localname, None))
+        ATTRIBUTE_TAG_CACHE[tag] = info
+
+    return info
+
+
+def iter_attributes(elem, to_include=None):
+    """Iterate over the elementary attributes of an attributable element
+
+    :param elem: attributable element, e.g., event
+    :param to_include: attribute keys to include, all if None
+    :return: generator of (key, localname, value)
+    """
     for child in elem:
-        tag = child.tag.lower()
+        localname, parser, _ = get_attribute_info(child.tag)
 
-        if not is_attrib(tag):
+        if parser is None:
+            if localname == LIST or localname == CONTAINER:
+                logger.warning('Not supporting {} attribute: {}'.format(localname, child.get('key')))
             continue
 
         key = child.get('key', 'UNKNOWN')
-        value = child.get('value', '')
 
         if to_include is not None and key not in to_include:
             continue
 
-        if tag.endswith(LITERAL):
-            result[key] = value
-        elif tag == TIMESTAMP:
-            time_value = ciso8601.parse_datetime(value)
-            result[key] = time_value
-        elif tag.endswith(DISCRETE):
-            try:
-                int_value = int(value)
-            except ValueError as e:
-                logger.error('Cannot convert {} with discrete value {}: {}'.format(key, value, e))
-                int_value = 0
-            result[key] = int_value
-        elif tag.endswith(CONTINUOUS):
-            try:
-                float_value = float(value)
-            except ValueError as e:
-                logger.error('Cannot convert {} with continuous value {}: {}'.format(key, value, e))
-                float_value = 0.
-            result[key] = float_value
-        elif tag.endswith(BOOLEAN):
-            bool_value = True if value.lower() == 'true' else False
-            result[key] = bool_value
-        elif tag.endswith(ID):
-            try:
-                id_value = uuid.UUID(value)
-            except ValueError as e:
-                logger.error('Cannot convert {} with ID value {}: {}'.format(key, value, e))
-                id_value = value
-            result[key] = id_value
-        elif tag.endswith(LIST):
-            logger.warning('Not supporting list attribute: {}'.format(key))
-        elif tag.endswith(CONTAINER):
-            logger.warning('Not supporting container attribute: {}'.format(key))
+        yield key, localname, parser(key, child.get('value', ''))
+
+
+def process_attributable(elem, to_include=None):
+    result = dict()
+    for key, _, value in iter_attributes(elem, to_include):
+        result[key] = value
     return result
 
 
+def process_attributable_columnar(elem, builder, to_include=None):
+    """Add the attributes of an attributable element as a row of a columnar builder
+
+    :param elem: attributable element, e.g., event
+    :param builder: columnar builder
+    :param to_include: attribute keys to include, all if None
+    """
+    n_nested = 0
+
+    # inlined version of iter_attributes since this is called for every event
+    for child in elem:
+        info = ATTRIBUTE_TAG_CACHE.get(child.tag, None)
+        localname, _, parser = get_attribute_info(child.tag) if info is None else info
+
+        if parser is None:
+            if localname == LIST or localname == CONTAINER:
+                key = child.get('key', 'UNKNOWN')
+                if to_include is None or key in to_include:
+                    for nested in iter_nested_attributes(child, str(n_nested)):
+                        builder.add_nested(*nested)
+                    n_nested += 1
+            continue
+
+        key = child.get('key', 'UNKNOWN')
+
+        if to_include is not None and key not in to_include:
+            continue
+
+        builder.set(key, parser(key, child.get('value', '')), localname)
+
+
+def process_attributable_filtered(elem, builder, predicate, to_include=None):
+    """Add the attributes of an attributable element to the current row of a columnar builder if the
+    attributes satisfy a predicate. The predicate gets all the attributes, including those that are not
+    to be included.
+
+    :param elem: attributable element, e.g., event
+    :param builder: columnar builder
+    :param predicate: function that takes the dict of attribute key to value and returns whether to keep it
+    :param to_include: attribute keys to include, all if None
+    :return: whether the attributes were added
+    """
+    attribs = dict()
+    values = list()
+    nested = list()
+
+    for child in elem:
+        localname, parser, columnar_parser = get_attribute_info(child.tag)
+
+        if parser is None:
+            if localname == LIST or localname == CONTAINER:
+                key = child.get('key', 'UNKNOWN')
+                if to_include is None or key in to_include:
+                    nested.append(child)
+            continue
+
+        key = child.get('key', 'UNKNOWN')
+        value = child.get('value', '')
+        parsed = parser(key, value)
+        attribs[key] = parsed
+
+        if to_include is None or key in to_include:
+            columnar_value = parsed if parser is columnar_parser else columnar_parser(key, value)
+            values.append((key, localname, columnar_value))
+
+    if not predicate(attribs):
+        return False
+
+    for key, localname, value in values:
+        builder.set(key, value, localname)
+
+    for n_nested, child in enumerate(nested):
+        for attribute in iter_nested_attributes(child, str(n_nested)):
+            builder.add_nested(*attribute)
+
+    return True
+
+
+def iter_collection_items(elem):
+    """Iterate over the attributes within a list or container attribute. The values element that wraps
+    the items of a list is skipped over.
+
+    :param elem: list or container element
+    :return: generator of attribute elements
+    """
+    for child in elem:
+        localname, parser, _ = get_attribute_info(child.tag)
+
+        if localname == VALUES:
+            for item in iter_collection_items(child):
+                yield item
+        elif parser is not None or localname in COLLECTIONS:
+            yield child
+
+
+def iter_nested_attributes(elem, path):
+    """Iterate over a list or container attribute and the attributes within it in document order. The path
+    of an attribute is the path of the enclosing attribute followed by its position within it, e.g., 0/2
+    is the third item of the first nested attribute of a trace or event.
+
+    :param elem: attribute element
+    :param path: path of the attribute
+    :return: generator of (path, key, value, type), where the value is None for lists and containers
+    """
+    localname = get_attribute_info(elem.tag)[0]
+    is_collection = localname in COLLECTIONS
+
+    yield path, elem.get('key', 'UNKNOWN'), None if is_collection else elem.get('value', ''), localname
+
+    if is_collection:
+        for position, child in enumerate(iter_collection_items(elem)):
+            for attribute in iter_nested_attributes(child, '{}/{}'.format(path, position)):
+                yield attribute
+
+
+def make_nested_frame(trace_builder, trace_index, event_builder, event_index):
+    """Make the nested attribute table of the trace and event builders
+
+    :param trace_builder: columnar builder of the traces
+    :param trace_index: index of the trace dataframe
+    :param event_builder: columnar builder of the events
+    :param event_index: index of the event dataframe
+    :return: dataframe with the columns in :data:`podspy.log.constants.NESTED_COLUMNS`
+    """
+    scopes, rows, paths, keys, values, types = list(), list(), list(), list(), list(), list()
+
+    for scope, builder, index in ((TRACE, trace_builder, trace_index), (EVENT, event_builder, event_index)):
+        index = np.asarray(index)
+        for row, path, key, value, _type in builder.nested:
+            scopes.append(scope)
+            rows.append(index[row])
+            paths.append(path)
+            keys.append(key)
+            values.append(value)
+            types.append(_type)
+
+    data = {
+        const.SCOPE: pd.Categorical(scopes, categories=[TRACE, EVENT]),
+        const.ROW: np.array(rows, dtype=np.int64),
+        const.PATH: pd.Series(paths, dtype=object),
+        const.KEY: pd.Series(keys, dtype=object),
+        const.VALUE: pd.Series(values, dtype=object),
+        const.TYPE: pd.Categorical(types, categories=NESTED_TYPES)
+    }
+
+    return pd.DataFrame(data, columns=const.NESTED_COLUMNS)
+
+
+def process_global_types(elem):
+    """Get the types of the attributes declared by a global element
+
+    :param elem: global element
+    :return: dict of attribute key to attribute tag, e.g., int
+    """
+    types = dict()
+    for child in elem:
+        localname = get_attribute_info(child.tag)[0]
+        types[child.get('key', 'UNKNOWN')] = localname
+    return types
+
+
+def get_schema_dtypes(schema, scope, global_types=None, exclude=()):
+    """Get the dtypes of the columns of a scope from a schema option
+
+    :param schema: 'globals', dict of scope to dict of attribute key to dtype, or None
+    :param scope: trace or event
+    :param global_types: dict of attribute key to attribute tag of the global attributes of the scope
+    :param exclude: global attribute keys to leave untyped unless the user schema types them
+    :return: dict of attribute key to dtype
+    """
+    if schema is None:
+        return dict()
+
+    if schema != GLOBAL_SCHEMA and not isinstance(schema, dict):
+        raise ValueError('Schema has to be {} or a dict: {}'.format(GLOBAL_SCHEMA, schema))
+
+    dtypes = dict()
+
+    if global_types is not None:
+        for key, _type in global_types.items():
+            if _type in GLOBAL_DTYPES and key not in exclude:
+                dtypes[key] = GLOBAL_DTYPES[_type]
+
+    if isinstance(schema, dict):
+        dtypes.update(schema.get(scope, dict()))
+
+    return dtypes
+
+
 def process_extension(elem):
     name = elem.get('name')
     prefix = elem.get('prefix')
@@ -388,28 +1027,80 @@ def process_extension(elem):
     return name, prefix, uri
 
 
-def process_classifier(elem, global_event_attrib_keys):
-    name = elem.get('name')
-    keys = elem.get('keys')
-    key_list = list()
+def parse_classifier_keys(key_str, known_keys):
+    """Split the keys of a classifier. Keys are separated by spaces, but keys can also contain spaces. Keys
+    with spaces are either quoted, or recognized as one of the known keys. The rest of the string is split
+    at the spaces.
+
+    :param key_str: string containing keys
+    :param known_keys: known keys, e.g., the global event attribute keys
+    :return: list of keys in the order of the string
+    """
+    if "'" in key_str:
+        return [quoted or plain for quoted, plain in re.findall(r"'([^']*)'|(\S+)", key_str)]
+
+    if ' ' not in key_str:
+        return [key_str] if key_str else []
+
+    # add a space padding to the front and back of the key_str to facilitate replace in forloop
+    key_str = ' {} '.format(key_str)
+    remaining = str(key_str)
+    keylist = []
+
+    for key in known_keys:
+        if ' {} '.format(key) in remaining:
+            # find out the location of the key in the string so we can order the keys later on
+            keylist.append((key, key_str.find(' {} '.format(key))))
+            remaining = remaining.replace(' {} '.format(key), ' ')
 
-    for key in global_event_attrib_keys:
-        if key in keys:
-            keys = keys.replace(key, '')
-            key_list.append(key)
+    # add the remaining keys as new keys
+    for key in remaining.split():
+        keylist.append((key, key_str.find(' {} '.format(key))))
 
-    return name, key_list
+    # sort the keys
+    keylist = sorted(keylist, key=lambda item: item[1])
 
+    return [key for key, _ in keylist]
 
-def import_log_table_iterparse(fp, caseid_key, include_attribs=None):
+
+def process_classifier(elem, global_event_attrib_keys):
+    name = elem.get('name')
+    keys = elem.get('keys', '')
+    return name, parse_classifier_keys(keys, global_event_attrib_keys)
+
+
+def import_log_table_iterparse(fp, caseid_key, include_attribs=None, **options):
     """
     https://www.ibm.com/developerworks/xml/library/x-hiperfparse/
 
     :param fp: file path to XES log file
     :param caseid_key: attribute key for trace caseid
     :param include_attribs: dict of string to string set mapping of attributes to include
+    :param options: other keyword arguments of :func:`iter_log_table_iterparse`
     :return: LogTable
     """
+    # a single chunk holding all the traces
+    chunks = iter_log_table_iterparse(fp, caseid_key, include_attribs, **options)
+    return next(chunks)
+
+
+def iter_log_table_iterparse(fp, caseid_key, include_attribs=None, chunk_traces=None, trace_offset=0,
+                             categorical=None, trace_filter=None, event_filter=None, sampler=None, schema=None):
+    """Parse a XES log file incrementally and yield log tables of at most chunk_traces traces. Parsed
+    traces are removed from the XML tree so that memory is bounded by the size of a chunk.
+
+    :param fp: file path to XES log file or a file object
+    :param caseid_key: attribute key for trace caseid
+    :param include_attribs: dict of string to string set mapping of attributes to include
+    :param chunk_traces: maximum number of traces per log table, None to yield a single log table
+    :param trace_offset: index of the first parsed trace in the log, used as trace index and default caseid
+    :param categorical: dict of string to string set mapping of attributes to intern as categorical columns
+    :param trace_filter: function that takes the dict of attributes of a trace and returns whether to keep it
+    :param event_filter: function that takes the dict of attributes of an event and returns whether to keep it
+    :param sampler: trace sampler from :mod:`podspy.log.sampling` applied to the traces that pass the trace filter
+    :param schema: 'globals' or dict of string to dict mapping of attribute key to dtype, see :func:`import_log_table`
+    :return: generator of LogTable
+    """
 
     log_attrib_dict = dict()
     global_trace_attrib_dict = dict()
@@ -418,103 +1109,871 @@ def import_log_table_iterparse(fp, caseid_key, include_attribs=None):
     classifier_dict = dict()
     extension_dict = dict()
 
-    # decompress compressed file if necessary
-    fp_final = log_utils.temp_decompress(fp) if fp.endswith('.gz') else fp
-
     to_include_event = include_attribs.get(EVENT, None) if include_attribs is not None else None
     to_include_trace = include_attribs.get(TRACE, None) if include_attribs is not None else None
     to_include_log = include_attribs.get(LOG, None) if include_attribs is not None else None
 
     use_caseid_key = to_include_trace is None or caseid_key in to_include_trace
 
-    tag = [ EVENT, TRACE, LOG, CLASSIFIER, EXTENSION, GLOBAL ]
+    categorical_event = categorical.get(EVENT, None) if categorical is not None else None
+    categorical_trace = categorical.get(TRACE, None) if categorical is not None else None
+
+    # events are processed together with their trace
+    tag = [ TRACE, LOG, CLASSIFIER, EXTENSION, GLOBAL ]
     # ignore namespace
     tag = list(map(lambda t: '{*}' + t, tag))
-    context = etree.iterparse(fp_final, events=('end',), tag=tag)
+    event_tag = '{*}' + EVENT
 
     # temporary variables
-    trace_ind, trace_start_ind, trace_end_ind = 0, 0, 0
-    trace_events = list()
-    traces = list()
+    # trace_ind counts all the traces in the log, trace_row_ind only the kept ones
+    trace_ind, trace_row_ind, event_ind = trace_offset, trace_offset, 0
+    trace_start_ind, event_start_ind = trace_offset, 0
+    # dtypes of the columns, which are known once the globals have been parsed
+    event_dtypes = get_schema_dtypes(schema, EVENT)
+    trace_dtypes = get_schema_dtypes(schema, TRACE)
+    event_builder = clmr.ColumnarBuilder(categorical=categorical_event, dtypes=event_dtypes)
+    trace_builder = clmr.ColumnarBuilder(categorical=categorical_trace, dtypes=trace_dtypes)
+    n_chunks = 0
+
+    def make_chunk():
+        trace_index = pd.RangeIndex(trace_start_ind, trace_row_ind)
+        event_index = pd.RangeIndex(event_start_ind, event_ind)
+        trace_df = trace_builder.to_frame(index=trace_index)
+        event_df = event_builder.to_frame(index=event_index)
+        nested_df = make_nested_frame(trace_builder, trace_index, event_builder, event_index)
 
-    start = time.time()
-    for event, elem in context:
-        tag = elem.tag.lower()
-
-        if tag.endswith(EVENT):
-            # event row is a dict
-            event_row = process_attributable(elem, to_include_event)
-            trace_events.append(event_row)
-            trace_end_ind += 1
-
-        elif tag.endswith(TRACE):
-            # trace row is a dict
-            trace_row = process_attributable(elem, to_include_trace)
-            caseid = trace_row.get(caseid_key, None) if use_caseid_key else trace_ind
-            caseid = trace_ind if caseid is None else caseid
-            trace_row[const.CASEID] = caseid
-            traces.append(trace_row)
-
-            # add back the caseids to the corresponding events
-            for i in range(trace_start_ind, trace_end_ind):
-                trace_events[i][const.CASEID] = caseid
-
-            # increment trace index
-            trace_ind += 1
-            trace_start_ind = trace_end_ind
-
-        elif tag.endswith(LOG):
-            for key, value in elem.items():
-                xes_attrib_dict[key] = value
-            log_attrib_dict = process_attributable(elem, to_include_log)
-
-        elif tag.endswith(EXTENSION):
-            extension = process_extension(elem)
-            extension_dict[extension[0]] = extension
-
-        elif tag.endswith(CLASSIFIER):
-            classifier_name, classifier_keys = process_classifier(elem, global_event_attrib_dict)
-            classifier_dict[classifier_name] = classifier_keys
-
-        elif tag.endswith(GLOBAL):
-            scope = elem.get('scope')
-            if scope.lower() == TRACE:
-                global_trace_attrib_dict = process_attributable(elem)
-            else: # scope == event
-                global_event_attrib_dict = process_attributable(elem)
-
-        # It's safe to call clear() here because no descendants will be
-        # accessed
-        elem.clear()
-
-        # # Also eliminate now-empty references from the root node to elem
-        if tag.endswith(TRACE):
-            while elem.getprevious() is True:
-                prev_sibling = elem.getprevious()
-                if not is_attrib(prev_sibling.tag.lower()):
-                    elem.getparent().remove(prev_sibling)
-                else:
+        lt = tble.LogTable(
+            trace_df=trace_df,
+            event_df=event_df,
+            attributes=dict(log_attrib_dict),
+            global_event_attributes=dict(global_event_attrib_dict),
+            global_trace_attributes=dict(global_trace_attrib_dict),
+            classifiers=dict(classifier_dict),
+            extensions=dict(extension_dict),
+            nested_df=nested_df
+        )
+
+        if xes_attrib_dict:
+            lt.xes_attributes = dict(xes_attrib_dict)
+
+        return lt
+
+    def add_trace_row(elem, ind):
+        """Set the attributes of a trace in the current trace row
+
+        :return: caseid or None if the trace is filtered out
+        """
+        if trace_filter is None:
+            process_attributable_columnar(elem, trace_builder, to_include_trace)
+        elif not process_attributable_filtered(elem, trace_builder, trace_filter, to_include_trace):
+            return None
+
+        caseid = trace_builder.get(caseid_key, None) if use_caseid_key else ind
+        caseid = ind if caseid is None else caseid
+        trace_builder.set(const.CASEID, caseid)
+
+        return caseid
+
+    def add_events(elem, caseid):
+        """Add the events of a trace as event rows
+
+        :return: number of added events
+        """
+        n_events = 0
+
+        for event_elem in elem.iterchildren(event_tag):
+            if event_filter is None:
+                process_attributable_columnar(event_elem, event_builder, to_include_event)
+            elif not process_attributable_filtered(event_elem, event_builder, event_filter, to_include_event):
+                continue
+            event_builder.set(const.CASEID, caseid)
+            event_builder.end_row()
+            n_events += 1
+
+        return n_events
+
+    if sampler is not None:
+        sampler.reset()
+
+    # compressed files are decompressed as they are parsed
+    is_path = isinstance(fp, str)
+    is_compressed = is_path and log_utils.sniff_compression(fp) is not None
+    source = log_utils.open_log_file(fp) if is_compressed else fp
+
+    try:
+        context = etree.iterparse(source, events=('end',), tag=tag)
+
+        start = time.time()
+        for event, elem in context:
+            tag = elem.tag.lower()
+
+            if tag.endswith(TRACE):
+                if trace_ind == trace_offset:
+                    # log attributes and xes attributes precede the traces
+                    log_elem = elem.getparent()
+                    xes_attrib_dict.update(log_elem.items())
+                    log_attrib_dict = process_attributable(log_elem, to_include_log)
+
+                caseid = add_trace_row(elem, trace_ind)
+                parent = elem.getparent()
+
+                if caseid is not None and sampler is not None:
+                    if sampler.DEFERRED:
+                        # keep the trace element until the sample is known at the end of the log
+                        trace_builder.discard_row()
+                        parent.remove(elem)
+                        sampler.offer(trace_ind, elem)
+                        caseid = None
+                    elif not sampler.select(trace_ind, caseid):
+                        trace_builder.discard_row()
+                        caseid = None
+
+                if caseid is not None:
+                    trace_builder.end_row()
+                    trace_row_ind += 1
+                    event_ind += add_events(elem, caseid)
+
+                # increment trace index
+                trace_ind += 1
+
+                if elem.getparent() is not None:
+                    # It's safe to call clear() here because no descendants will be
+                    # accessed
+                    elem.clear()
+
+                    # Also eliminate now-empty references from the root node to elem
+                    while elem.getprevious() is not None:
+                        del parent[0]
+
+                if sampler is not None and sampler.is_done():
+                    logger.info('Stop parsing after sampling {} traces'.format(trace_ind - trace_offset))
                     break
 
-    end = time.time()
-    logger.info('Parsing log took {:.2f}s'.format(end - start))
+                if chunk_traces is not None and len(trace_builder) >= chunk_traces:
+                    yield make_chunk()
+                    n_chunks += 1
+                    event_builder = clmr.ColumnarBuilder(categorical=categorical_event, dtypes=event_dtypes)
+                    trace_builder = clmr.ColumnarBuilder(categorical=categorical_trace, dtypes=trace_dtypes)
+                    trace_start_ind, event_start_ind = trace_row_ind, event_ind
+
+                continue
+
+            elif tag.endswith(LOG):
+                xes_attrib_dict.update(elem.items())
+                # log attributes that come after the traces
+                log_attrib_dict.update(process_attributable(elem, to_include_log))
+
+            elif tag.endswith(EXTENSION):
+                extension = process_extension(elem)
+                extension_dict[extension[0]] = extension
+
+            elif tag.endswith(CLASSIFIER):
+                classifier_name, classifier_keys = process_classifier(elem, global_event_attrib_dict)
+                classifier_dict[classifier_name] = classifier_keys
+
+            elif tag.endswith(GLOBAL):
+                scope = elem.get('scope')
+                if scope.lower() == TRACE:
+                    global_trace_attrib_dict = process_attributable(elem)
+                    if schema is not None:
+                        # caseids are distinct so they are not worth interning
+                        trace_dtypes = get_schema_dtypes(schema, TRACE, process_global_types(elem), (caseid_key,))
+                        trace_builder.set_dtypes(trace_dtypes)
+                else: # scope == event
+                    global_event_attrib_dict = process_attributable(elem)
+                    if schema is not None:
+                        event_dtypes = get_schema_dtypes(schema, EVENT, process_global_types(elem))
+                        event_builder.set_dtypes(event_dtypes)
+
+            elem.clear()
+
+        if sampler is not None and sampler.DEFERRED:
+            for ind, elem in sampler.get_selected():
+                caseid = add_trace_row(elem, ind)
+                trace_builder.end_row()
+                trace_row_ind += 1
+                event_ind += add_events(elem, caseid)
+
+                if chunk_traces is not None and len(trace_builder) >= chunk_traces:
+                    yield make_chunk()
+                    n_chunks += 1
+                    event_builder = clmr.ColumnarBuilder(categorical=categorical_event, dtypes=event_dtypes)
+                    trace_builder = clmr.ColumnarBuilder(categorical=categorical_trace, dtypes=trace_dtypes)
+                    trace_start_ind, event_start_ind = trace_row_ind, event_ind
+
+        end = time.time()
+        logger.info('Parsing log took {:.2f}s'.format(end - start))
+
+        del context
+
+    finally:
+        if is_compressed:
+            source.close()
+
+    if len(trace_builder) > 0 or n_chunks == 0:
+        yield make_chunk()
+
+
+# start tag of a trace element, possibly with a namespace prefix
+TRACE_START_PATTERN = re.compile(br'<(?:[\w.-]+:)?trace[\s>/]')
+LOG_START_PATTERN = re.compile(br'<((?:[\w.-]+:)?log)[\s>/]')
+
+
+def scan_trace_offsets(fp, start=0):
+    """Scan an uncompressed XES log file for the byte offsets of the trace elements. This is a byte
+    level scan so trace tags within comments or CDATA sections are also picked up.
+
+    :param fp: file path to an uncompressed XES log file
+    :param start: byte offset to start scanning from
+    :return: list of trace start offsets, byte offset where the last trace range ends
+    """
+    with open(fp, 'rb') as f:
+        if os.fstat(f.fileno()).st_size == 0:
+            return [], 0
+
+        with mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as mm:
+            offsets = [match.start() for match in TRACE_START_PATTERN.finditer(mm, start)]
+            end = mm.rfind(b'</')
+
+    return offsets, end
+
+
+def partition_trace_offsets(offsets, end, n_parts):
+    """Split the traces into contiguous partitions of roughly the same number of bytes
+
+    :param offsets: trace start offsets
+    :param end: byte offset where the last partition ends
+    :param n_parts: number of partitions
+    :return: list of (first trace index, start offset, end offset)
+    """
+    n_parts = max(1, min(n_parts, len(offsets)))
+    size = end - offsets[0]
+    bounds = [0]
+
+    for i in range(1, n_parts):
+        target = offsets[0] + size * i // n_parts
+        # first trace that starts at or after the target offset
+        lo, hi = bounds[-1] + 1, len(offsets)
+        while lo < hi:
+            mid = (lo + hi) // 2
+            if offsets[mid] < target:
+                lo = mid + 1
+            else:
+                hi = mid
+        if lo < len(offsets):
+            bounds.append(lo)
+
+    ranges = list()
+    for i, first in enumerate(bounds):
+        stop = offsets[bounds[i + 1]] if i + 1 < len(bounds) else end
+        ranges.append((first, offsets[first], stop))
+
+    return ranges
+
+
+def parse_trace_range(args):
+    """Parse a byte range of traces of a XES log file with the log header prepended. This is the work unit
+    of :func:`import_log_table_parallel` and runs in a worker process.
+
+    :param args: tuple of (file path, header bytes, footer bytes, first trace index, start offset,
+    end offset, caseid key, include_attribs, dict of other keyword arguments of :func:`iter_log_table_iterparse`)
+    :return: LogTable of the traces in the range
+    """
+    fp, header, footer, first_trace, start, end, caseid_key, include_attribs, options = args
+
+    with open(fp, 'rb') as f:
+        f.seek(start)
+        body = f.read(end - start)
+
+    source = io.BytesIO(b''.join((header, body, footer)))
+    chunks = iter_log_table_iterparse(source, caseid_key, include_attribs, trace_offset=first_trace, **options)
+
+    return next(chunks)
+
+
+def concat_frames(dfs):
+    """Concatenate dataframes row-wise into a dataframe with a new range index. Categorical columns
+    are given the union of their categories so that they stay categorical.
+
+    :param dfs: list of dataframes
+    :return: concatenated dataframe
+    """
+    dfs = list(dfs)
+    categorical_cols = list()
+
+    for df in dfs:
+        for col in df.columns:
+            if isinstance(df[col].dtype, CategoricalDtype) and col not in categorical_cols:
+                categorical_cols.append(col)
+
+    if categorical_cols:
+        dfs = [df.copy(deep=False) for df in dfs]
+
+        for col in categorical_cols:
+            cats = union_categoricals([df[col] for df in dfs if col in df.columns
+                                       and isinstance(df[col].dtype, CategoricalDtype)]).categories
+            dtype = CategoricalDtype(cats)
+            for df in dfs:
+                # columns missing in a dataframe are all missing values of the same categories
+                if col in df.columns:
+                    df[col] = df[col].astype(dtype)
+                else:
+                    df[col] = pd.Categorical([np.nan] * df.shape[0], dtype=dtype)
+
+    return pd.concat(dfs, ignore_index=True, sort=False)
+
+
+def concat_nested_frames(lts):
+    """Concatenate the nested attribute tables of log tables whose trace and event dataframes are
+    concatenated with :func:`concat_frames`, so that the rows refer to the concatenated dataframes.
+
+    :param lts: list of log tables
+    :return: concatenated nested attribute table
+    """
+    nested_dfs = list()
+    n_traces, n_events = 0, 0
+
+    for lt in lts:
+        nested_df = lt.nested_df.copy()
+        rows = nested_df[const.ROW].values.copy()
+
+        for scope, df, offset in ((TRACE, lt.trace_df, n_traces), (EVENT, lt.event_df, n_events)):
+            in_scope = (nested_df[const.SCOPE] == scope).values
+            # row labels to positions in the concatenated dataframe
+            rows[in_scope] = df.index.get_indexer(rows[in_scope]) + offset
+
+        nested_df[const.ROW] = rows
+        nested_dfs.append(nested_df)
+        n_traces += lt.trace_df.shape[0]
+        n_events += lt.event_df.shape[0]
+
+    return concat_frames(nested_dfs)
+
+
+def read_header(fp, header_end):
+    """Read the part of a XES log file that precedes the traces and make the matching closing log tag
+
+    :param fp: file path to an uncompressed XES log file
+    :param header_end: byte offset of the first trace
+    :return: header bytes, footer bytes
+    """
+    with open(fp, 'rb') as f:
+        header = f.read(header_end)
+
+    log_match = LOG_START_PATTERN.search(header)
+    if log_match is None:
+        raise ValueError('Cannot find log element in {}'.format(fp))
+    footer = '</{}>'.format(log_match.group(1).decode()).encode()
+
+    return header, footer
+
+
+def import_log_table_parallel(fp, caseid_key, include_attribs=None, workers=0, **options):
+    """Parse a XES log file with a pool of processes. The file is scanned for the byte offsets of its traces
+    and split at trace boundaries into byte ranges. Each range is parsed by a worker as a log with the header
+    of the original log, i.e., its extensions, globals, classifiers and log attributes. The partial tables are
+    concatenated in order so that the result is the same as :func:`import_log_table_iterparse`.
+
+    Compressed logs are decompressed to a temporary file first since workers need random access.
+
+    :param fp: file path to XES log file
+    :param caseid_key: attribute key for trace caseid
+    :param include_attribs: dict of string to string set mapping of attributes to include
+    :param workers: number of worker processes, use all the cpus if 0 or negative
+    :param options: other keyword arguments of :func:`iter_log_table_iterparse`
+    :return: LogTable
+    """
+    if workers is None or workers < 1:
+        workers = os.cpu_count()
+
+    is_compressed = log_utils.sniff_compression(fp) is not None
+    fp_final = log_utils.temp_decompress(fp) if is_compressed else fp
+
+    try:
+        start = time.time()
+        offsets, end = scan_trace_offsets(fp_final)
+        logger.info('Scanning {} traces took {:.2f}s'.format(len(offsets), time.time() - start))
+
+        if len(offsets) < 2:
+            return import_log_table_iterparse(fp_final, caseid_key, include_attribs, **options)
+
+        header, footer = read_header(fp_final, offsets[0])
+
+        # more partitions than workers to balance the load
+        ranges = partition_trace_offsets(offsets, end, workers * 4)
+        tasks = [(fp_final, header, footer, first, range_start, range_end, caseid_key, include_attribs, options)
+                 for first, range_start, range_end in ranges]
+
+        # imported on first use since it loads multiprocessing
+        from concurrent.futures import ProcessPoolExecutor
 
-    del context
+        with ProcessPoolExecutor(max_workers=workers) as executor:
+            parts = list(executor.map(parse_trace_range, tasks))
 
-    if fp.endswith('.gz'):
-        os.remove(fp_final)
+    finally:
+        if is_compressed:
+            os.remove(fp_final)
 
-    event_df = pd.DataFrame(trace_events)
-    trace_df = pd.DataFrame(traces)
+    trace_df = concat_frames([part.trace_df for part in parts])
+    event_df = concat_frames([part.event_df for part in parts])
+    nested_df = concat_nested_frames(parts)
+
+    first, last = parts[0], parts[-1]
+    # the last partition also has the log attributes after the traces
+    attributes = dict(first.attributes)
+    attributes.update(last.attributes)
 
     lt = tble.LogTable(
         trace_df=trace_df,
         event_df=event_df,
-        attributes=log_attrib_dict,
-        global_event_attributes=global_event_attrib_dict,
-        global_trace_attributes=global_trace_attrib_dict,
-        classifiers=classifier_dict,
-        extensions=extension_dict
+        attributes=attributes,
+        global_event_attributes=first.global_event_attributes,
+        global_trace_attributes=first.global_trace_attributes,
+        classifiers=first.classifiers,
+        extensions=first.extensions,
+        nested_df=nested_df
     )
+    lt.xes_attributes = first.xes_attributes
 
     return lt
+
+
+class TailState:
+    def __init__(self, header_end, offset, n_traces, digest):
+        """Position up to which a growing XES log file has been imported by :func:`import_log_table_tail`.
+
+        :param header_end: byte offset of the first trace
+        :param offset: byte offset where the imported traces end
+        :param n_traces: number of imported traces, including the filtered ones
+        :param digest: hash of the file content up to offset
+        """
+        self.header_end = header_end
+        self.offset = offset
+        self.n_traces = n_traces
+        self.digest = digest
+
+    def __repr__(self):
+        return '{}({}, {}, {}, {})'.format(self.__class__.__name__, self.header_end, self.offset,
+                                           self.n_traces, self.digest)
+
+
+def hash_file_prefixes(fp, ends):
+    """Compute the hashes of the prefixes of a file in one pass
+
+    :param fp: file path
+    :param ends: increasing prefix lengths in bytes
+    :return: list of hex digests, one per prefix length
+    """
+    digest = hashlib.sha1()
+    digests = list()
+    position = 0
+
+    with open(fp, 'rb') as f:
+        for end in ends:
+            while position < end:
+                block = f.read(min(end - position, log_cache.LogTableCache.BLOCK_SIZE))
+                if not block:
+                    break
+                digest.update(block)
+                position += len(block)
+            digests.append(digest.hexdigest())
+
+    return digests
+
+
+def import_log_table_tail(fp, lt=None, state=None, caseid_key='concept:name', import_mode=ImportMode.BASIC,
+                          include_attribs=None, **options):
+    """Import the traces that were appended to a XES log file since the last import and append them to
+    the log table of the previous imports. The first call, without log table and state, imports the whole
+    file as far as it is scanned. Each call returns the state to pass to the next call, which records the
+    byte offset and the number of the imported traces. Trace and event indices continue from the previous
+    log table, and log attributes after the traces are updated.
+
+    The file has to be uncompressed, and the content up to the last imported trace must not change,
+    otherwise a ValueError is raised and the file has to be imported again.
+
+    :param fp: file path to an uncompressed XES log file
+    :param lt: log table of the previous imports, None to import the whole file
+    :param state: :class:`TailState` returned by the previous call, None to import the whole file
+    :param caseid_key: trace attribute key that allows identification of a unique trace
+    :param import_mode: import mode, see :func:`import_log_table`
+    :param include_attribs: event, trace, and log attribute sets to include, see :func:`import_log_table`
+    :param options: other keyword arguments of :func:`iter_log_table_iterparse`, e.g., categorical, which have
+    to be the same in every call
+    :return: LogTable, TailState
+    """
+    if log_utils.sniff_compression(fp) is not None:
+        raise ValueError('Cannot import the tail of compressed log file {}'.format(fp))
+
+    if (lt is None) != (state is None):
+        raise ValueError('Log table and state have to be given together')
+
+    include_attribs = get_include_attribs(import_mode, include_attribs)
+    start = time.time()
+
+    if state is None:
+        offsets, end = scan_trace_offsets(fp)
+        header_end = offsets[0] if offsets else end
+        # only parse the scanned range so that traces appended after the scan are left to the next call
+        header, footer = read_header(fp, header_end)
+        args = (fp, header, footer, 0, header_end, end, caseid_key, include_attribs, options)
+        new_lt = parse_trace_range(args)
+        new_state = TailState(header_end, end, len(offsets), hash_file_prefixes(fp, [end])[0])
+
+        logger.info('Importing {} traces of {} took {:.2f}s'.format(len(offsets), fp, time.time() - start))
+
+        return new_lt, new_state
+
+    offsets, end = scan_trace_offsets(fp, state.offset)
+    digests = hash_file_prefixes(fp, [state.offset, max(state.offset, end)])
+
+    if os.path.getsize(fp) < state.offset or digests[0] != state.digest:
+        raise ValueError('Log file {} changed before the last imported trace, import it again'.format(fp))
+
+    if not offsets:
+        return lt, state
+
+    header, footer = read_header(fp, state.header_end)
+    args = (fp, header, footer, state.n_traces, state.offset, end, caseid_key, include_attribs, options)
+    tail = parse_trace_range(args)
+
+    attributes = dict(lt.attributes)
+    attributes.update(tail.attributes)
+
+    new_lt = tble.LogTable(
+        trace_df=concat_frames([lt.trace_df, tail.trace_df]),
+        event_df=concat_frames([lt.event_df, tail.event_df]),
+        attributes=attributes,
+        global_trace_attributes=lt.global_trace_attributes,
+        global_event_attributes=lt.global_event_attributes,
+        classifiers=lt.classifiers,
+        extensions=lt.extensions,
+        nested_df=concat_nested_frames([lt, tail])
+    )
+    new_lt.xes_attributes = lt.xes_attributes
+    new_state = TailState(state.header_end, end, state.n_traces + len(offsets), digests[1])
+
+    logger.info('Importing {} appended traces of {} took {:.2f}s'.format(len(offsets), fp, time.time() - start))
+
+    return new_lt, new_state
+
+
+XES_NAMESPACE = 'http://www.xes-standard.org/'
+
+
+# writers of compressed files
+COMPRESSION_OPENERS = {
+    'gzip': gzip.open,
+    'bz2': bz2.open,
+    'xz': lzma.open
+}
+
+
+def get_xes_type(value):
+    """Get the XES attribute type of a python value
+
+    :param value: attribute value
+    :return: attribute tag, e.g., int
+    """
+    # bool is a subclass of int
+    if isinstance(value, (bool, np.bool_)):
+        return BOOLEAN
+    elif isinstance(value, (int, np.integer)):
+        return DISCRETE
+    elif isinstance(value, (float, np.floating)):
+        return CONTINUOUS
+    elif isinstance(value, (datetime.datetime, np.datetime64)):
+        return TIMESTAMP
+    elif isinstance(value, uuid.UUID):
+        return ID
+    return LITERAL
+
+
+def format_timestamp(value):
+    """Format a timestamp as a XES date with millisecond precision
+
+    :param value: datetime or numpy datetime64
+    :return: string, e.g., 2011-10-01T08:10:30.287+02:00
+    """
+    value = pd.Timestamp(value)
+    formatted = '{}.{:03d}'.format(value.strftime('%Y-%m-%dT%H:%M:%S'), value.microsecond // 1000)
+    offset = value.utcoffset()
+
+    if offset is not None:
+        minutes = int(offset.total_seconds()) // 60
+        sign = '-' if minutes < 0 else '+'
+        formatted += '{}{:02d}:{:02d}'.format(sign, abs(minutes) // 60, abs(minutes) % 60)
+
+    return formatted
+
+
+def format_value(value, _type):
+    """Format an attribute value as the value of a XES attribute
+
+    :param value: attribute value
+    :param _type: attribute tag
+    :return: string
+    """
+    if _type == BOOLEAN:
+        return 'true' if value else 'false'
+    elif _type == DISCRETE:
+        return str(int(value))
+    elif _type == CONTINUOUS:
+        return repr(float(value))
+    elif _type == TIMESTAMP:
+        return format_timestamp(value)
+    return str(value)
+
+
+def format_column(series):
+    """Format a column as XES attributes. Typed columns are converted in bulk and object columns value by value.
+
+    :param series: column
+    :return: list of (attribute tag, string value), None for missing values
+    """
+    dtype = series.dtype
+
+    if isinstance(dtype, CategoricalDtype):
+        series = series.astype(object)
+        dtype = series.dtype
+
+    # nullable extension dtypes, e.g., Int64 and boolean, have missing values in typed columns too
+    missing = series.isnull().tolist()
+
+    if pd.api.types.is_bool_dtype(dtype):
+        return [None if is_missing else (BOOLEAN, 'true' if value else 'false')
+                for value, is_missing in zip(series.tolist(), missing)]
+
+    elif pd.api.types.is_integer_dtype(dtype):
+        return [None if is_missing else (DISCRETE, value)
+                for value, is_missing in zip(series.astype(str).tolist(), missing)]
+
+    elif pd.api.types.is_float_dtype(dtype):
+        return [None if is_missing else (CONTINUOUS, repr(float(value)))
+                for value, is_missing in zip(series.tolist(), missing)]
+
+    elif pd.api.types.is_datetime64_any_dtype(dtype):
+        if getattr(dtype, 'tz', None) is not None:
+            values = series.dt.tz_convert('UTC').values
+            suffix = '+00:00'
+        else:
+            values = series.values
+            suffix = ''
+        formatted = np.datetime_as_string(values, unit='ms').tolist()
+        return [None if is_missing else (TIMESTAMP, value + suffix)
+                for value, is_missing in zip(formatted, missing)]
+
+    formatted = list()
+    for value in series.tolist():
+        # fast path for literal columns
+        if type(value) is str:
+            formatted.append((LITERAL, value))
+        elif value is None or value is pd.NaT or (isinstance(value, float) and value != value):
+            formatted.append(None)
+        else:
+            _type = get_xes_type(value)
+            formatted.append((_type, format_value(value, _type)))
+
+    return formatted
+
+
+def make_attribute_elems(parent, attributes):
+    """Add the attributes of a dict as attribute elements
+
+    :param parent: attributable element
+    :param attributes: dict of attribute key to value
+    """
+    for key, value in attributes.items():
+        if value is None or (isinstance(value, float) and value != value):
+            continue
+        _type = get_xes_type(value)
+        etree.SubElement(parent, _type, key=key, value=format_value(value, _type))
+
+
+def group_nested_attributes(nested_df, scope):
+    """Group the nested attributes of a scope by the trace or event row they belong to
+
+    :param nested_df: nested attribute table
+    :param scope: trace or event
+    :return: dict of row to list of (path, key, value, type) in document order
+    """
+    grouped = dict()
+
+    if nested_df.shape[0] == 0:
+        return grouped
+
+    in_scope = nested_df[nested_df[const.SCOPE] == scope]
+    columns = [in_scope[col].tolist() for col in (const.ROW, const.PATH, const.KEY, const.VALUE, const.TYPE)]
+
+    for row, path, key, value, _type in zip(*columns):
+        grouped.setdefault(row, list()).append((path, key, value, _type))
+
+    return grouped
+
+
+def make_nested_elems(parent, nested):
+    """Add nested attributes as list and container elements
+
+    :param parent: attributable element
+    :param nested: list of (path, key, value, type) in document order
+    """
+    # maps path to the element that holds the items of a list or container
+    holders = dict()
+
+    for path, key, value, _type in nested:
+        split = path.rfind('/')
+        holder = parent if split < 0 else holders[path[:split]]
+
+        if _type in COLLECTIONS:
+            elem = etree.SubElement(holder, _type, key=key)
+            holders[path] = etree.SubElement(elem, VALUES) if _type == LIST else elem
+        else:
+            etree.SubElement(holder, _type, key=key, value=value)
+
+
+def quote_classifier_key(key):
+    return "'{}'".format(key) if ' ' in key else key
+
+
+def get_case_ranges(trace_caseids, event_caseids):
+    """Group the events by the trace they belong to
+
+    :param trace_caseids: caseids of the traces
+    :param event_caseids: caseids of the events
+    :return: event positions sorted by trace and the offsets of each trace in them
+    """
+    codes = pd.Categorical(event_caseids, categories=pd.unique(trace_caseids)).codes
+    n_orphans = int((codes < 0).sum())
+
+    if n_orphans > 0:
+        logger.warning('Not exporting {} events with caseids that are not in the trace dataframe'.format(n_orphans))
+
+    # stable sort keeps the order of events within a trace
+    order = np.argsort(codes, kind='mergesort')[n_orphans:]
+    counts = np.bincount(codes[codes >= 0], minlength=len(trace_caseids))
+    offsets = np.zeros(len(trace_caseids) + 1, dtype=np.int64)
+    np.cumsum(counts, out=offsets[1:])
+
+    return order, offsets
+
+
+def export_log_table(lt, fp, compress=None, caseid_key='concept:name', chunk_traces=10000):
+    """Export a log table as a xes file. The file is written incrementally, chunk_traces traces at a time,
+    so that only the formatted attributes of a chunk are held in memory besides the log table.
+
+    Events are grouped into traces by their caseid. Attribute types follow the column dtypes, e.g., int64 columns
+    are written as int attributes and datetime columns as date attributes, and missing values are not written.
+    Nested attributes are written as list and container attributes after the attributes of their trace or event.
+
+    :param lt: log table
+    :param fp: file path or binary file object to write to
+    :param compress: compress the file with gzip, bz2 or xz while it is written, None for no compression
+    :param caseid_key: trace attribute key to write the caseid to if the trace dataframe does not have it
+    :param chunk_traces: number of traces to format at a time
+    """
+    if compress is not None and compress not in COMPRESSION_OPENERS:
+        raise ValueError('Unsupported compression {}, use one of {}'.format(compress, list(COMPRESSION_OPENERS)))
+
+    start = time.time()
+
+    trace_df, event_df = lt.trace_df, lt.event_df
+
+    if const.CASEID not in trace_df.columns:
+        # traces without attributes
+        caseids = event_df[const.CASEID].unique() if const.CASEID in event_df.columns else []
+        trace_df = pd.DataFrame({const.CASEID: caseids})
+
+    trace_caseids = trace_df[const.CASEID].values
+    event_caseids = event_df[const.CASEID].values if const.CASEID in event_df.columns else []
+    order, offsets = get_case_ranges(trace_caseids, event_caseids)
+
+    trace_keys = [key for key in trace_df.columns if key != const.CASEID]
+    event_keys = [key for key in event_df.columns if key != const.CASEID]
+    write_caseid = caseid_key not in trace_keys
+
+    nested_traces = group_nested_attributes(lt.nested_df, TRACE)
+    nested_events = group_nested_attributes(lt.nested_df, EVENT)
+
+    xes_attribs = dict()
+    for key, value in lt.xes_attributes.items():
+        # log table defaults are not prefixed
+        key = key if key.startswith('xes.') or key.startswith('openxes.') else 'xes.' + key
+        xes_attribs[key] = ' '.join(value) if isinstance(value, (list, tuple)) else str(value)
+
+    is_path = isinstance(fp, str)
+    if compress is not None:
+        sink = COMPRESSION_OPENERS[compress](fp, 'wb')
+    else:
+        sink = open(fp, 'wb') if is_path else fp
+
+    try:
+        with etree.xmlfile(sink, encoding='utf-8') as xf:
+            xf.write_declaration()
+
+            with xf.element(LOG, xes_attribs, nsmap={None: XES_NAMESPACE}):
+                xf.write('\n')
+
+                for name, prefix, uri in lt.extensions.values():
+                    uri = uri.geturl() if hasattr(uri, 'geturl') else str(uri)
+                    xf.write(etree.Element(EXTENSION, name=name, prefix=prefix, uri=uri), '\n')
+
+                for scope, attributes in ((TRACE, lt.global_trace_attributes), (EVENT, lt.global_event_attributes)):
+                    if attributes:
+                        elem = etree.Element(GLOBAL, scope=scope)
+                        make_attribute_elems(elem, attributes)
+                        xf.write(elem, '\n')
+
+                for name, keys in lt.classifiers.items():
+                    keys = ' '.join(map(quote_classifier_key, keys))
+                    xf.write(etree.Element(CLASSIFIER, name=name, keys=keys), '\n')
+
+                log_elem = etree.Element(LOG)
+                make_attribute_elems(log_elem, lt.attributes)
+                for attrib_elem in log_elem:
+                    xf.write(attrib_elem, '\n')
+
+                for chunk_start in range(0, trace_df.shape[0], chunk_traces):
+                    chunk_end = min(chunk_start + chunk_traces, trace_df.shape[0])
+                    trace_chunk = trace_df.iloc[chunk_start:chunk_end]
+                    event_pos = order[offsets[chunk_start]:offsets[chunk_end]]
+                    event_chunk = event_df.iloc[event_pos]
+
+                    trace_columns = [format_column(trace_chunk[key]) for key in trace_keys]
+                    event_columns = [format_column(event_chunk[key]) for key in event_keys]
+                    caseids = trace_chunk[const.CASEID].tolist()
+                    trace_labels = trace_chunk.index.tolist() if nested_traces else None
+                    event_labels = event_chunk.index.tolist() if nested_events else None
+                    event_row = 0
+
+                    for trace_row in range(chunk_end - chunk_start):
+                        trace_elem = etree.Element(TRACE)
+
+                        if write_caseid:
+                            etree.SubElement(trace_elem, LITERAL, key=caseid_key, value=str(caseids[trace_row]))
+
+                        for key, column in zip(trace_keys, trace_columns):
+                            attribute = column[trace_row]
+                            if attribute is not None:
+                                etree.SubElement(trace_elem, attribute[0], key=key, value=attribute[1])
+
+                        if nested_traces and trace_labels[trace_row] in nested_traces:
+                            make_nested_elems(trace_elem, nested_traces[trace_labels[trace_row]])
+
+                        n_events = offsets[chunk_start + trace_row + 1] - offsets[chunk_start + trace_row]
+
+                        for _ in range(n_events):
+                            event_elem = etree.SubElement(trace_elem, EVENT)
+                            for key, column in zip(event_keys, event_columns):
+                                attribute = column[event_row]
+                                if attribute is not None:
+                                    etree.SubElement(event_elem, attribute[0], key=key, value=attribute[1])
+                            if nested_events and event_labels[event_row] in nested_events:
+                                make_nested_elems(event_elem, nested_events[event_labels[event_row]])
+                            event_row += 1
+
+                        xf.write(trace_elem, '\n')
+    finally:
+        if compress is not None or is_path:
+            sink.close()
+
+    logger.info('Exporting log table took {:.2f}s'.format(time.time() - start))
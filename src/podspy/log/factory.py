@@ -2,24 +2,15 @@
 
 """This is the factory module for the log package
 
+opyenxes is imported when a conversion is first made so that importing the log package does not load it.
 """
-from opyenxes.model.XLog import XLog
-from opyenxes.model.XEvent import XEvent
-from opyenxes.utils.XAttributeUtils import XAttributeType as atype
-from opyenxes.utils.XAttributeUtils import XAttributeUtils as autils
-from opyenxes.model.XAttributeDiscrete import XAttributeDiscrete
-from opyenxes.model.XAttributeLiteral import XAttributeLiteral
-from opyenxes.model.XAttributeContinuous import XAttributeContinuous
-from opyenxes.model.XAttributeBoolean import XAttributeBoolean
-from opyenxes.model.XAttributeID import XAttributeID
-from opyenxes.model.XAttributeList import XAttributeList
-from opyenxes.model.XAttributeContainer import XAttributeContainer
-from opyenxes.model.XAttributeTimestamp import XAttributeTimestamp
-from opyenxes.classification.XEventAndClassifier import XEventAndClassifier
 from . import constants as cst
 from . import table as tb
+from . import columnar as clmr
+from . import data_io
 
-import logging
+import logging, uuid
+import itertools as its
 import pandas as pd
 import numpy as np
 
@@ -32,20 +23,134 @@ __all__ = [
 ]
 
 
+# maps attribute class to xes attribute tag
+XATTRIBUTE_TAGS = dict()
+# maps xes attribute tag to attribute constructor
+XATTRIBUTE_FACTORIES = dict()
+
+
+def load_xattribute_types():
+    """Fill the mappings between the attribute classes of opyenxes and xes attribute tags on first use
+
+    """
+    if XATTRIBUTE_TAGS:
+        return
+
+    from opyenxes.model.XAttributeDiscrete import XAttributeDiscrete
+    from opyenxes.model.XAttributeLiteral import XAttributeLiteral
+    from opyenxes.model.XAttributeContinuous import XAttributeContinuous
+    from opyenxes.model.XAttributeBoolean import XAttributeBoolean
+    from opyenxes.model.XAttributeID import XAttributeID
+    from opyenxes.model.XAttributeList import XAttributeList
+    from opyenxes.model.XAttributeContainer import XAttributeContainer
+    from opyenxes.model.XAttributeTimestamp import XAttributeTimestamp
+    from opyenxes.factory.XFactory import XFactory
+
+    XATTRIBUTE_FACTORIES.update({
+        data_io.DISCRETE: XFactory.create_attribute_discrete,
+        data_io.LITERAL: XFactory.create_attribute_literal,
+        data_io.CONTINUOUS: XFactory.create_attribute_continuous,
+        data_io.BOOLEAN: XFactory.create_attribute_boolean,
+        data_io.ID: XFactory.create_attribute_id,
+        data_io.LIST: XFactory.create_attribute_list,
+        data_io.CONTAINER: XFactory.create_attribute_container,
+        data_io.TIMESTAMP: XFactory.create_attribute_timestamp
+    })
+
+    # filled last since it marks the mappings as loaded
+    XATTRIBUTE_TAGS.update({
+        XAttributeDiscrete: data_io.DISCRETE,
+        XAttributeLiteral: data_io.LITERAL,
+        XAttributeContinuous: data_io.CONTINUOUS,
+        XAttributeBoolean: data_io.BOOLEAN,
+        XAttributeID: data_io.ID,
+        XAttributeList: data_io.LIST,
+        XAttributeContainer: data_io.CONTAINER,
+        XAttributeTimestamp: data_io.TIMESTAMP
+    })
+
+
+def get_xattribute_type(attrib):
+    """Get the XES attribute tag of an attribute
+
+    :param attrib: XAttribute
+    :return: attribute tag, e.g., int
+    """
+    load_xattribute_types()
+    _type = XATTRIBUTE_TAGS.get(type(attrib), None)
+
+    if _type is None:
+        # subclasses of the attribute classes
+        from opyenxes.utils.XAttributeUtils import XAttributeUtils
+        _type = XATTRIBUTE_TAGS[XAttributeUtils.get_type(attrib)]
+
+    return _type
+
+
+def get_xattribute_value(attrib, _type):
+    """Get the plain value of an elementary attribute, IDs are converted to UUIDs like when importing
+    a log file.
+
+    :param attrib: XAttribute
+    :param _type: attribute tag
+    :return: attribute value
+    """
+    value = attrib.get_value()
+    if _type == data_io.ID and hasattr(value, 'get_uuid'):
+        # XID
+        value = value.get_uuid()
+    return value
+
+
+def iter_nested_xattributes(attrib, path):
+    """Iterate over a list or container attribute and the attributes within it, see
+    :func:`podspy.log.data_io.iter_nested_attributes`.
+
+    :param attrib: XAttribute
+    :param path: path of the attribute
+    :return: generator of (path, key, value, type), where the value is None for lists and containers
+    """
+    _type = get_xattribute_type(attrib)
+
+    if _type in data_io.COLLECTIONS:
+        yield path, attrib.get_key(), None, _type
+        for position, child in enumerate(attrib.get_collection()):
+            for nested in iter_nested_xattributes(child, '{}/{}'.format(path, position)):
+                yield nested
+    else:
+        value = get_xattribute_value(attrib, _type)
+        yield path, attrib.get_key(), data_io.format_value(value, _type), _type
+
+
 class LogTableFactory:
     @staticmethod
-    def new_log_table(xlog):
-        return XLog2LogTable().xlog2table(xlog)
+    def new_log_table(xlog, caseid_key=cst.CONCEPT_NAME, categorical=None):
+        return XLog2LogTable(caseid_key, categorical).xlog2table(xlog)
+
+    @staticmethod
+    def new_xlog(lt, caseid_key=cst.CONCEPT_NAME):
+        return LogTable2XLog(caseid_key).logtable2xlog(lt)
 
 
 class XLog2LogTable:
-    def __init__(self):
-        self.__event_ind = 0
-        self.__trace_ind = 0
-        self.__event_df_dict = dict()
-        self.__trace_df_dict = dict()
+    def __init__(self, caseid_key=cst.CONCEPT_NAME, categorical=None):
+        """Converter of XLog to LogTable. Attribute values are collected column by column per attribute
+        key as plain typed values, and the trace and event dataframes are built in one step at the end.
+        List and container attributes go to the nested attribute table.
+
+        :param caseid_key: trace attribute key of the caseid, the position of the trace is used if it is missing
+        :param categorical: dict of trace and event to attribute keys to build as categorical columns
+        """
+        self.caseid_key = caseid_key
+        self.categorical = categorical if categorical is not None else dict()
+
+        load_xattribute_types()
 
     def parse_xattribute(self, attrib):
+        from opyenxes.utils.XAttributeUtils import XAttributeUtils as autils
+        from opyenxes.model.XAttributeList import XAttributeList
+        from opyenxes.model.XAttributeContainer import XAttributeContainer
+
         _type = autils.get_type(attrib)
         if _type == XAttributeContainer or _type == XAttributeList:
             logger.warning('LogTable do not support XAttributeList or XAttributeContainer')
@@ -53,20 +158,27 @@ class XLog2LogTable:
         else:
             return attrib.get_key(), attrib.get_value(), attrib.get_extension()
 
-    def parse_xattribute_list(self, attribs):
-        parsed = [self.parse_xattribute(attrib) for attrib in attribs]
-        parsed = filter(lambda item: item != (None, None, None), parsed)
-        return {attrib[0]:attrib for attrib in parsed}
+    def parse_xattribute_values(self, attribs):
+        """Get the plain values of elementary attributes
 
-    def parse_xattribute_dict(self, attribs):
-        return {key: self.parse_xattribute(val) for key, val in attribs.items()}
+        :param attribs: iterable of XAttribute
+        :return: dict of attribute key to value
+        """
+        parsed = dict()
+        for attrib in attribs:
+            _type = get_xattribute_type(attrib)
+            if _type in data_io.COLLECTIONS:
+                logger.warning('Not supporting {} attribute: {}'.format(_type, attrib.get_key()))
+                continue
+            parsed[attrib.get_key()] = get_xattribute_value(attrib, _type)
+        return parsed
 
     def parse_classifier(self, clf):
-        return clf.name(), clf.get_defining_attribute_keys()
+        return clf.name(), list(clf.get_defining_attribute_keys())
 
     def parse_classifier_list(self, clfs):
         parsed = [self.parse_classifier(clf) for clf in clfs]
-        return {clf[0]: clf for clf in parsed}
+        return {name: keys for name, keys in parsed}
 
     def parse_extension(self, ext):
         return ext.get_name(), ext.get_prefix(), ext.get_uri()
@@ -75,49 +187,63 @@ class XLog2LogTable:
         parsed = [self.parse_extension(ext) for ext in exts]
         return {e[0]: e for e in parsed}
 
-    def xtraces2df(self, traces):
-        trace_df_dict = dict()
-
-        for trace in traces:
-            attrib_dict = dict(trace.get_attributes())
-            trace_df_dict[self.__trace_ind] = attrib_dict
-            self.__trace_ind += 1
+    def add_xattributes(self, attribs, builder):
+        """Set the attributes of a trace or event in the current row of a columnar builder
 
-        return trace_df_dict
+        :param attribs: XAttributeMap
+        :param builder: columnar builder
+        """
+        n_nested = 0
 
-    def xevents2df(self, events, caseid):
-        event_df_dict = dict()
+        # inlined version of get_xattribute_type and get_xattribute_value since this is called for every event
+        for key, attrib in attribs.items():
+            _type = XATTRIBUTE_TAGS.get(type(attrib), None)
 
-        for event in events:
-            assert isinstance(event, XEvent)
-            attrib_dict = self.parse_xattribute_dict(event.get_attributes())
-            # add caseid
-            attrib_dict[cst.CASEID] = caseid
-            event_df_dict[self.__event_ind] = attrib_dict
-            self.__event_ind += 1
+            if _type is None:
+                _type = get_xattribute_type(attrib)
 
-        return event_df_dict
+            if _type in data_io.COLLECTIONS:
+                for path, nested_key, value, nested_type in iter_nested_xattributes(attrib, str(n_nested)):
+                    builder.add_nested(path, nested_key, value, nested_type)
+                n_nested += 1
+            elif _type == data_io.ID:
+                builder.set(key, get_xattribute_value(attrib, _type), _type)
+            else:
+                builder.set(key, attrib.get_value(), _type)
 
     def xlog2table(self, xlog):
+        from opyenxes.model.XLog import XLog
+
         assert isinstance(xlog, XLog)
-        trace_df_dict = self.xtraces2df(xlog)
-        event_df_dict = dict()
 
-        for trace in xlog:
-            caseid = trace.get_attributes()['concept:name'].get_value()
-            event_df_dict_i = self.xevents2df(trace, caseid)
-            event_df_dict.update(event_df_dict_i)
+        trace_builder = clmr.ColumnarBuilder(categorical=self.categorical.get(data_io.TRACE, None))
+        event_builder = clmr.ColumnarBuilder(categorical=self.categorical.get(data_io.EVENT, None))
+
+        for trace_ind, trace in enumerate(xlog):
+            self.add_xattributes(trace.get_attributes(), trace_builder)
+            caseid = trace_builder.get(self.caseid_key, None)
+            caseid = trace_ind if caseid is None else caseid
+            trace_builder.set(cst.CASEID, caseid)
+            trace_builder.end_row()
 
-        global_trace_attribs = self.parse_xattribute_list(xlog.get_global_trace_attributes())
-        global_event_attribs = self.parse_xattribute_list(xlog.get_global_event_attributes())
-        log_attribs = self.parse_xattribute_dict(xlog.get_attributes())
+            for event in trace:
+                self.add_xattributes(event.get_attributes(), event_builder)
+                event_builder.set(cst.CASEID, caseid)
+                event_builder.end_row()
+
+        trace_index = pd.RangeIndex(0, len(trace_builder))
+        event_index = pd.RangeIndex(0, len(event_builder))
+        trace_df = trace_builder.to_frame(index=trace_index)
+        event_df = event_builder.to_frame(index=event_index)
+        nested_df = data_io.make_nested_frame(trace_builder, trace_index, event_builder, event_index)
+
+        global_trace_attribs = self.parse_xattribute_values(xlog.get_global_trace_attributes())
+        global_event_attribs = self.parse_xattribute_values(xlog.get_global_event_attributes())
+        log_attribs = self.parse_xattribute_values(xlog.get_attributes().values())
 
         clfs = self.parse_classifier_list(xlog.get_classifiers())
         exts = self.parse_extension_set(xlog.get_extensions())
 
-        trace_df = pd.DataFrame.from_dict(trace_df_dict, 'index')
-        event_df = pd.DataFrame.from_dict(event_df_dict, 'index')
-
         lt = tb.LogTable(
             trace_df=trace_df,
             event_df=event_df,
@@ -125,7 +251,193 @@ class XLog2LogTable:
             global_trace_attributes=global_trace_attribs,
             global_event_attributes=global_event_attribs,
             classifiers=clfs,
-            extensions=exts
+            extensions=exts,
+            nested_df=nested_df
         )
 
         return lt
+
+
+class LogTable2XLog:
+    def __init__(self, caseid_key=cst.CONCEPT_NAME):
+        """Converter of LogTable to XLog. Attribute objects are created once per distinct value of a column
+        and shared by all the traces or events with that value, so they should be treated as immutable.
+
+        :param caseid_key: trace attribute key to write the caseid to if the trace dataframe does not have it
+        """
+        from opyenxes.extension.XExtensionManager import XExtensionManager
+
+        self.caseid_key = caseid_key
+        self.manager = XExtensionManager()
+        # maps attribute key prefix to extension
+        self.__extensions = dict()
+
+        load_xattribute_types()
+
+    def get_extension(self, key):
+        """Get the standard extension of an attribute key by its prefix, e.g., concept for concept:name
+
+        :param key: attribute key
+        :return: XExtension or None
+        """
+        if ':' not in key:
+            return None
+
+        prefix = key[:key.index(':')]
+        if prefix not in self.__extensions:
+            self.__extensions[prefix] = self.manager.get_by_prefix(prefix)
+
+        return self.__extensions[prefix]
+
+    def make_xattribute(self, key, value, _type=None):
+        """Make an attribute from a plain value
+
+        :param key: attribute key
+        :param value: attribute value, None for lists and containers
+        :param _type: attribute tag, inferred from the value if None
+        :return: XAttribute
+        """
+        _type = data_io.get_xes_type(value) if _type is None else _type
+        extension = self.get_extension(key)
+
+        if _type in data_io.COLLECTIONS:
+            return XATTRIBUTE_FACTORIES[_type](key, extension)
+        elif _type == data_io.TIMESTAMP:
+            value = pd.Timestamp(value).to_pydatetime()
+        elif _type == data_io.ID:
+            from opyenxes.id.XID import XID
+            value = XID(value) if isinstance(value, uuid.UUID) else XID.parse(str(value))
+        elif _type == data_io.DISCRETE:
+            value = int(value)
+        elif _type == data_io.CONTINUOUS:
+            value = float(value)
+        elif _type == data_io.BOOLEAN:
+            value = bool(value)
+
+        return XATTRIBUTE_FACTORIES[_type](key, value, extension)
+
+    def make_xattribute_list(self, attributes):
+        return [self.make_xattribute(key, value) for key, value in attributes.items()
+                if not pd.isnull(value)]
+
+    def make_xattribute_column(self, series):
+        """Make the attributes of a column. Each distinct value gets one attribute object.
+
+        :param series: column
+        :return: object array of XAttribute with None for missing values
+        """
+        key = series.name
+        dtype = series.dtype
+
+        if pd.api.types.is_bool_dtype(dtype):
+            _type = data_io.BOOLEAN
+        elif pd.api.types.is_integer_dtype(dtype):
+            _type = data_io.DISCRETE
+        elif pd.api.types.is_float_dtype(dtype):
+            _type = data_io.CONTINUOUS
+        elif pd.api.types.is_datetime64_any_dtype(dtype):
+            _type = data_io.TIMESTAMP
+        else:
+            # inferred per value for object and categorical columns
+            _type = None
+
+        codes, uniques = pd.factorize(series)
+        uniques = pd.Index(uniques).tolist()
+
+        # the last slot is picked by the code of missing values
+        attributes = np.empty(len(uniques) + 1, dtype=object)
+        for i, value in enumerate(uniques):
+            attributes[i] = self.make_xattribute(key, value, _type)
+
+        return attributes[codes]
+
+    def make_nested_xattributes(self, attribs, nested):
+        """Add nested attributes as list and container attributes
+
+        :param attribs: XAttributeMap of the trace or event
+        :param nested: list of (path, key, value, type) in document order
+        """
+        # maps path to list or container attribute
+        holders = dict()
+
+        for path, key, value, _type in nested:
+            if _type in data_io.COLLECTIONS:
+                attrib = self.make_xattribute(key, None, _type)
+                holders[path] = attrib
+            else:
+                parsed = data_io.ATTRIBUTE_PARSERS[_type](key, value)
+                attrib = self.make_xattribute(key, parsed, _type)
+
+            split = path.rfind('/')
+            if split < 0:
+                attribs[key] = attrib
+            else:
+                holder = holders[path[:split]]
+                # same as the xes parser of opyenxes
+                holder.get_attributes()[key] = attrib
+                holder.add_to_collection(attrib)
+
+    def logtable2xlog(self, lt):
+        from opyenxes.model.XAttributeMap import XAttributeMap
+        from opyenxes.factory.XFactory import XFactory
+        from opyenxes.classification.XEventAttributeClassifier import XEventAttributeClassifier
+
+        trace_df, event_df = lt.trace_df, lt.event_df
+
+        if cst.CASEID not in trace_df.columns:
+            # traces without attributes
+            caseids = event_df[cst.CASEID].unique() if cst.CASEID in event_df.columns else []
+            trace_df = pd.DataFrame({cst.CASEID: caseids})
+
+        trace_caseids = trace_df[cst.CASEID].values
+        event_caseids = event_df[cst.CASEID].values if cst.CASEID in event_df.columns else []
+        order, offsets = data_io.get_case_ranges(trace_caseids, event_caseids)
+
+        trace_keys = [key for key in trace_df.columns if key != cst.CASEID]
+        event_keys = [key for key in event_df.columns if key != cst.CASEID]
+        write_caseid = self.caseid_key not in trace_keys
+
+        trace_columns = [self.make_xattribute_column(trace_df[key]) for key in trace_keys]
+        # events in trace order
+        event_columns = [self.make_xattribute_column(event_df[key])[order] for key in event_keys]
+        trace_rows = zip(*trace_columns) if trace_columns else its.repeat(())
+        event_rows = zip(*event_columns) if event_columns else its.repeat(())
+        event_labels = event_df.index.values[order].tolist()
+
+        nested_traces = data_io.group_nested_attributes(lt.nested_df, data_io.TRACE)
+        nested_events = data_io.group_nested_attributes(lt.nested_df, data_io.EVENT)
+
+        log_attribs = XAttributeMap({attrib.get_key(): attrib for attrib in self.make_xattribute_list(lt.attributes)})
+        xlog = XFactory.create_log(log_attribs)
+
+        for name, _, _ in lt.extensions.values():
+            extension = self.manager.get_by_name(name)
+            if extension is None:
+                logger.warning('Unknown extension {}'.format(name))
+                continue
+            xlog.get_extensions().add(extension)
+
+        for name, keys in lt.classifiers.items():
+            xlog.get_classifiers().append(XEventAttributeClassifier(name, list(keys)))
+
+        xlog.get_global_trace_attributes().extend(self.make_xattribute_list(lt.global_trace_attributes))
+        xlog.get_global_event_attributes().extend(self.make_xattribute_list(lt.global_event_attributes))
+
+        for trace_ind, (trace_label, caseid, row) in enumerate(zip(trace_df.index.tolist(), trace_caseids, trace_rows)):
+            attribs = XAttributeMap({key: attrib for key, attrib in zip(trace_keys, row) if attrib is not None})
+
+            if write_caseid:
+                attribs[self.caseid_key] = self.make_xattribute(self.caseid_key, str(caseid), data_io.LITERAL)
+
+            self.make_nested_xattributes(attribs, nested_traces.get(trace_label, ()))
+            xtrace = XFactory.create_trace(attribs)
+
+            for event_pos in range(offsets[trace_ind], offsets[trace_ind + 1]):
+                row = next(event_rows)
+                attribs = XAttributeMap({key: attrib for key, attrib in zip(event_keys, row) if attrib is not None})
+                self.make_nested_xattributes(attribs, nested_events.get(event_labels[event_pos], ()))
+                xtrace.append(XFactory.create_event(attribs))
+
+            xlog.append(xtrace)
+
+        return xlog
@@ -0,0 +1,418 @@
+#!/usr/bin/env python
+
+"""This is the index module.
+
+This module contains the LogIndex class that encodes the cases and activities of an event dataframe
+as integers and groups the events by case, so that trace-wise algorithms can slice contiguous arrays
+instead of grouping the dataframe, the TimestampIndex class that sorts the events by time for range
+queries, and the TraceVariants class that groups the cases of a LogIndex by their sequence of activities.
+"""
+
+
+__all__ = [
+    'LogIndex',
+    'TimestampIndex',
+    'TraceVariants'
+]
+
+
+import logging
+import numpy as np
+import pandas as pd
+
+from . import constants as const
+
+
+logger = logging.getLogger(__file__)
+
+
+# multiplier of the rolling trace hash, the 64-bit FNV prime
+HASH_PRIME = np.uint64(0x100000001b3)
+
+
+def encode_column(series):
+    """Encode the values of a column as integer codes in the order of their first occurrence
+
+    :param series: column
+    :return: (int32 codes with -1 for missing values, array of distinct values)
+    """
+    codes, uniques = pd.factorize(series)
+    return codes.astype(np.int32), np.asarray(uniques)
+
+
+def encode_columns(df, keys):
+    """Encode the distinct value combinations of several columns as integer codes in the order of their
+    first occurrence
+
+    :param df: dataframe
+    :param keys: list of columns
+    :return: (int32 codes with -1 for rows with a missing value, positions of the first row of each code)
+    """
+    codes = np.zeros(df.shape[0], dtype=np.int64)
+
+    for key in keys:
+        key_codes, uniques = pd.factorize(df[key])
+        is_missing = (codes < 0) | (key_codes < 0)
+        is_known = ~is_missing
+        # combine with the codes of the previous columns and renumber to keep the codes small
+        codes = codes * len(uniques) + key_codes
+        codes[is_known] = pd.factorize(codes[is_known])[0]
+        codes[is_missing] = -1
+
+    codes = codes.astype(np.int32)
+    uniques, first_rows = np.unique(codes, return_index=True)
+
+    return codes, first_rows[uniques >= 0]
+
+
+def encode_timestamps(timestamps):
+    """Encode a timestamp column as int64 nanoseconds since the epoch in UTC. Object columns, e.g., of
+    timestamps with different utc offsets or of python datetimes, are converted first and naive timestamps
+    are taken as UTC.
+
+    :param timestamps: timestamp column
+    :return: (int64 array, bool array of the missing timestamps)
+    """
+    timestamps = pd.to_datetime(pd.Series(timestamps), utc=True)
+    is_missing = timestamps.isnull().values
+    values = timestamps.values.astype(np.int64)
+    return values, is_missing
+
+
+class LogIndex:
+    def __init__(self, event_df, activity_key=const.ACTIVITY, timestamp_key=None):
+        """Integer encoding of the cases and activities of an event dataframe in compressed sparse row form.
+        Cases and activities are numbered in the order of their first event. The events of case i are at the
+        positions order[trace_offsets[i]:trace_offsets[i + 1]] of the event dataframe, sorted by timestamp if
+        a timestamp key is given and in the order of the dataframe otherwise. Events without caseid are left out.
+
+        :param event_df: event dataframe with a caseid column
+        :param activity_key: column of the activities, None to only encode the cases
+        :param timestamp_key: column to sort the events of a case by, None to keep the order of the dataframe
+        """
+        if const.CASEID not in event_df.columns:
+            raise ValueError('Caseid column not defined in event df!')
+        if activity_key is not None and activity_key not in event_df.columns:
+            raise ValueError('Activity column {} not defined in event df!'.format(activity_key))
+
+        self.activity_key = activity_key
+        self.timestamp_key = timestamp_key
+
+        # codes per event in the order of the dataframe
+        self.case_codes, self.cases = encode_column(event_df[const.CASEID])
+
+        if activity_key is not None:
+            self.activity_codes, self.activities = encode_column(event_df[activity_key])
+        else:
+            self.activity_codes, self.activities = None, None
+
+        keys = [self.case_codes]
+        if timestamp_key is not None and timestamp_key in event_df.columns:
+            values, is_missing = encode_timestamps(event_df[timestamp_key])
+            # missing timestamps go last within a case
+            values[is_missing] = np.iinfo(np.int64).max
+            keys.insert(0, values)
+
+        # lexsort is stable and sorts by the last key first
+        order = np.lexsort(keys) if len(keys) > 1 else np.argsort(self.case_codes, kind='mergesort')
+        n_missing = int((self.case_codes < 0).sum())
+
+        if n_missing > 0:
+            logger.warning('Leaving out {} events without caseid'.format(n_missing))
+
+        self.order = order[n_missing:]
+
+        counts = np.bincount(self.case_codes[self.case_codes >= 0], minlength=len(self.cases))
+        self.trace_offsets = np.zeros(len(self.cases) + 1, dtype=np.int64)
+        np.cumsum(counts, out=self.trace_offsets[1:])
+
+        # positions of the events of each activity, built on first use
+        self.activity_postings = None
+
+    def __repr__(self):
+        n_activities = len(self.activities) if self.activities is not None else 0
+        return '{}({} cases, {} activities, {} events)'.format(
+            self.__class__.__name__, self.n_cases, n_activities, self.n_events)
+
+    @property
+    def n_cases(self):
+        return len(self.cases)
+
+    @property
+    def n_events(self):
+        return self.order.shape[0]
+
+    def get_trace_lengths(self):
+        return np.diff(self.trace_offsets)
+
+    def get_sorted_case_codes(self):
+        """Get the case code of each event in the order of the index
+
+        :return: int32 array
+        """
+        return np.repeat(np.arange(self.n_cases, dtype=np.int32), self.get_trace_lengths())
+
+    def get_sorted_activity_codes(self):
+        """Get the activity code of each event in the order of the index so that the activities of case i are
+        the slice trace_offsets[i]:trace_offsets[i + 1]
+
+        :return: int32 array
+        """
+        if self.activity_codes is None:
+            raise ValueError('Index does not encode the activities')
+        return self.activity_codes[self.order]
+
+    def get_trace(self, case_code):
+        """Get the activity codes of a case
+
+        :param case_code: code of the case
+        :return: int32 array
+        """
+        start, end = self.trace_offsets[case_code], self.trace_offsets[case_code + 1]
+        return self.activity_codes[self.order[start:end]]
+
+    def get_activity_postings(self):
+        """Get the positions of the events of each activity in compressed sparse row form, so that the events
+        of activity a are at the positions postings[offsets[a]:offsets[a + 1]] in increasing order
+
+        :return: (postings, offsets)
+        """
+        if self.activity_codes is None:
+            raise ValueError('Index does not encode the activities')
+
+        if self.activity_postings is None:
+            codes = self.activity_codes
+            n_missing = int((codes < 0).sum())
+            postings = np.argsort(codes, kind='mergesort')[n_missing:]
+
+            counts = np.bincount(codes[codes >= 0], minlength=len(self.activities))
+            offsets = np.zeros(len(self.activities) + 1, dtype=np.int64)
+            np.cumsum(counts, out=offsets[1:])
+
+            self.activity_postings = (postings, offsets)
+
+        return self.activity_postings
+
+    def get_activity_positions(self, activities):
+        """Get the positions of the events of a set of activities
+
+        :param activities: iterable of activities
+        :return: sorted int64 array of event positions
+        """
+        codes = pd.Index(self.activities).get_indexer(list(activities))
+        postings, offsets = self.get_activity_postings()
+        # repeated activities would repeat their positions
+        positions, _ = slice_traces(postings, offsets, np.unique(codes[codes >= 0]))
+        return np.sort(positions)
+
+    def get_case_codes(self, caseids):
+        """Get the codes of a set of cases
+
+        :param caseids: iterable of caseids
+        :return: sorted int array of distinct case codes, cases that are not in the index are left out
+        """
+        codes = pd.Index(self.cases).get_indexer(list(caseids))
+        return np.unique(codes[codes >= 0])
+
+    def get_case_positions(self, case_codes):
+        """Get the positions of the events of a set of cases
+
+        :param case_codes: codes of the cases
+        :return: sorted int64 array of event positions
+        """
+        positions, _ = slice_traces(self.order, self.trace_offsets, case_codes)
+        return np.sort(positions)
+
+    def get_directly_follows_counts(self):
+        """Count how often an activity directly follows another one within a case
+
+        :return: square int64 array where entry (a, b) is the number of times b directly follows a
+        """
+        codes = self.get_sorted_activity_codes()
+        return count_directly_follows(codes, self.trace_offsets, len(self.activities))
+
+
+class TimestampIndex:
+    def __init__(self, timestamps):
+        """Positions of the events sorted by their timestamp. Events without timestamp are left out.
+
+        :param timestamps: timestamp column
+        """
+        values, is_missing = encode_timestamps(timestamps)
+        positions = np.flatnonzero(~is_missing)
+
+        # mergesort keeps events with the same timestamp in the order of the dataframe
+        order = np.argsort(values[positions], kind='mergesort')
+        self.positions = positions[order]
+        self.values = values[self.positions]
+
+    def __repr__(self):
+        return '{}({} events)'.format(self.__class__.__name__, len(self.positions))
+
+    def get_positions(self, start=None, end=None):
+        """Get the positions of the events with start <= timestamp <= end
+
+        :param start: start of the time range, None for no lower bound
+        :param end: end of the time range, None for no upper bound
+        :return: sorted int64 array of event positions
+        """
+        lower = 0 if start is None else np.searchsorted(self.values, pd.Timestamp(start).value, side='left')
+        upper = len(self.values) if end is None else np.searchsorted(self.values, pd.Timestamp(end).value,
+                                                                     side='right')
+        return np.sort(self.positions[lower:upper])
+
+
+def count_directly_follows(codes, offsets, n_activities, weights=None):
+    """Count how often an activity directly follows another one within a trace
+
+    :param codes: activity codes of the events, -1 for missing activities
+    :param offsets: trace offsets in compressed sparse row form
+    :param n_activities: number of activities
+    :param weights: number of times each trace occurs, None if each trace occurs once
+    :return: square int64 array where entry (a, b) is the number of times b directly follows a
+    """
+    traces = np.repeat(np.arange(len(offsets) - 1), np.diff(offsets))
+
+    # consecutive events of the same trace with known activities
+    sources, targets = codes[:-1], codes[1:]
+    is_pair = (traces[1:] == traces[:-1]) & (sources >= 0) & (targets >= 0)
+
+    pairs = sources[is_pair].astype(np.int64) * n_activities + targets[is_pair]
+    if weights is not None:
+        weights = weights[traces[:-1][is_pair]]
+    counts = np.bincount(pairs, weights=weights, minlength=n_activities * n_activities)
+
+    return counts.astype(np.int64).reshape((n_activities, n_activities))
+
+
+def get_event_positions(offsets):
+    """Get the position of each event within its trace
+
+    :param offsets: trace offsets in compressed sparse row form
+    :return: int64 array
+    """
+    lengths = np.diff(offsets)
+    return np.arange(offsets[-1], dtype=np.int64) - np.repeat(offsets[:-1], lengths)
+
+
+def slice_traces(codes, offsets, traces):
+    """Concatenate the codes of a selection of traces
+
+    :param codes: codes of the events
+    :param offsets: trace offsets in compressed sparse row form
+    :param traces: indices of the traces to select
+    :return: (concatenated codes, offsets of the selected traces)
+    """
+    lengths = np.diff(offsets)[traces]
+    new_offsets = np.zeros(len(traces) + 1, dtype=np.int64)
+    np.cumsum(lengths, out=new_offsets[1:])
+    positions = get_event_positions(new_offsets)
+    return codes[np.repeat(offsets[:-1][traces], lengths) + positions], new_offsets
+
+
+def hash_traces(codes, offsets):
+    """Compute the rolling 64-bit hash of each trace, i.e., the sum of (code + 1) * HASH_PRIME ** k over the
+    events of the trace with k the number of events after the event, followed by the length of the trace.
+    Arithmetic wraps around at 2 ** 64.
+
+    :param codes: codes of the events
+    :param offsets: trace offsets in compressed sparse row form, traces are not empty
+    :return: uint64 array
+    """
+    lengths = np.diff(offsets)
+    max_length = int(lengths.max()) if len(lengths) > 0 else 0
+
+    powers = np.ones(max_length + 1, dtype=np.uint64)
+    np.cumprod(np.full(max_length, HASH_PRIME, dtype=np.uint64), out=powers[1:])
+
+    # number of events after each event of its trace
+    n_after = np.repeat(lengths, lengths) - 1 - get_event_positions(offsets)
+    terms = (codes.astype(np.int64) + 1).astype(np.uint64) * powers[n_after]
+
+    if len(lengths) == 0:
+        return np.zeros(0, dtype=np.uint64)
+
+    hashes = np.add.reduceat(terms, offsets[:-1])
+    return hashes * HASH_PRIME + lengths.astype(np.uint64)
+
+
+class TraceVariants:
+    def __init__(self, log_index):
+        """Trace variants of the cases of a log index, i.e., the distinct sequences of activity codes. Variants
+        are numbered in the order of their first case. Cases are grouped by the hash of their traces and each
+        case is checked against the first case of its group, so that a hash collision falls back to grouping
+        the traces by their codes.
+
+        :param log_index: LogIndex with encoded activities
+        """
+        self.activities = log_index.activities
+
+        codes = log_index.get_sorted_activity_codes()
+        offsets = log_index.trace_offsets
+
+        hashes = hash_traces(codes, offsets)
+        case_variants, _ = pd.factorize(hashes)
+
+        if self.has_collision(codes, offsets, case_variants):
+            logger.warning('Trace hash collision, grouping traces by their codes')
+            traces = [tuple(codes[offsets[i]:offsets[i + 1]]) for i in range(len(offsets) - 1)]
+            case_variants, _ = pd.factorize(pd.Series(traces, dtype=object))
+
+        # variant of each case
+        self.case_variants = case_variants.astype(np.int32)
+        # first case of each variant
+        _, self.variant_cases = np.unique(self.case_variants, return_index=True)
+        self.frequencies = np.bincount(self.case_variants, minlength=len(self.variant_cases))
+        # activity codes of the variants in compressed sparse row form
+        self.codes, self.offsets = slice_traces(codes, offsets, self.variant_cases)
+
+    @staticmethod
+    def has_collision(codes, offsets, case_variants):
+        """Check whether each trace has the same codes as the first trace of its variant
+
+        :param codes: codes of the events
+        :param offsets: trace offsets
+        :param case_variants: variant of each trace
+        :return: True if a trace differs from the first trace of its variant
+        """
+        _, first_cases = np.unique(case_variants, return_index=True)
+        first_cases = first_cases[case_variants]
+        lengths = np.diff(offsets)
+
+        if (lengths[first_cases] != lengths).any():
+            return True
+
+        first_positions = np.repeat(offsets[:-1][first_cases], lengths) + get_event_positions(offsets)
+        return bool((codes[first_positions] != codes).any())
+
+    def __repr__(self):
+        return '{}({} variants, {} cases)'.format(self.__class__.__name__, self.n_variants, self.n_cases)
+
+    @property
+    def n_variants(self):
+        return len(self.variant_cases)
+
+    @property
+    def n_cases(self):
+        return len(self.case_variants)
+
+    def get_variant(self, variant):
+        """Get the activity codes of a variant
+
+        :param variant: variant number
+        :return: int32 array
+        """
+        return self.codes[self.offsets[variant]:self.offsets[variant + 1]]
+
+    def to_frame(self):
+        """Make the variants table with a row per variant with its number, frequency and activity codes
+
+        :return: dataframe with variant, frequency and trace columns
+        """
+        traces = [tuple(self.get_variant(variant)) for variant in range(self.n_variants)]
+
+        return pd.DataFrame({
+            const.VARIANT: np.arange(self.n_variants),
+            'frequency': self.frequencies,
+            'trace': traces
+        }, columns=[const.VARIANT, 'frequency', 'trace'])
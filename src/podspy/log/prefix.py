@@ -0,0 +1,289 @@
+#!/usr/bin/env python
+
+"""This is the prefix module.
+
+This module contains the PrefixTree class, an array backed prefix tree over the activity sequences of
+the cases of a log table, for prefix queries such as the cases that start with a sequence of activities
+or the distribution of the next activity after a prefix.
+"""
+
+
+__all__ = [
+    'PrefixTree'
+]
+
+
+import logging
+import numpy as np
+import pandas as pd
+
+from . import constants as const
+from . import index as log_index
+
+
+logger = logging.getLogger(__file__)
+
+
+class PrefixTree:
+    # arrays of the compact form, see to_dict
+    ARRAYS = ['parents', 'node_activities', 'depths', 'case_starts', 'case_ends', 'end_counts',
+              'activities', 'cases', 'case_order']
+
+    def __init__(self, parents, node_activities, depths, case_starts, case_ends, end_counts,
+                 activities, cases, case_order):
+        """Prefix tree with nodes 0 to n - 1 where node 0 is the root, i.e., the empty prefix. Node i is
+        reached from node parents[i] by activity code node_activities[i]. Cases are sorted by their trace, so
+        that the cases with the prefix of node i are cases[case_order[case_starts[i]:case_ends[i]]].
+
+        :param parents: parent of each node, -1 for the root
+        :param node_activities: activity code of the edge into each node, -1 for the root
+        :param depths: length of the prefix of each node
+        :param case_starts: start of the case range of each node
+        :param case_ends: end of the case range of each node
+        :param end_counts: number of cases whose trace ends at each node
+        :param activities: array of activity labels indexed by activity code
+        :param cases: array of caseids indexed by case code
+        :param case_order: case codes sorted by their trace
+        """
+        self.parents = parents
+        self.node_activities = node_activities
+        self.depths = depths
+        self.case_starts = case_starts
+        self.case_ends = case_ends
+        self.end_counts = end_counts
+        self.activities = activities
+        self.cases = cases
+        self.case_order = case_order
+
+        # children of each node in compressed sparse row form, nodes are created in depth first order
+        # with the children of a node in increasing activity code
+        self.children = np.argsort(parents[1:], kind='mergesort').astype(np.int32) + 1
+        n_children = np.bincount(parents[1:], minlength=self.n_nodes)
+        self.child_offsets = np.zeros(self.n_nodes + 1, dtype=np.int64)
+        np.cumsum(n_children, out=self.child_offsets[1:])
+
+        self.activity_codes = {activity: code for code, activity in enumerate(activities)}
+
+    def __repr__(self):
+        return '{}({} nodes, {} cases)'.format(self.__class__.__name__, self.n_nodes, self.n_cases)
+
+    @staticmethod
+    def build_from_index(index):
+        """Factory method to build a prefix tree from the traces of a log index. Variants are inserted in
+        lexicographic order of their activity codes so that the cases of each node form a range.
+
+        :param index: LogIndex with encoded activities
+        :return: built prefix tree
+        """
+        variants = log_index.TraceVariants(index)
+        traces = [tuple(variants.get_variant(variant)) for variant in range(variants.n_variants)]
+        variant_order = sorted(range(variants.n_variants), key=traces.__getitem__)
+
+        # rank of the variant of each case, cases are sorted by rank and then by case code
+        variant_ranks = np.zeros(variants.n_variants, dtype=np.int64)
+        variant_ranks[variant_order] = np.arange(variants.n_variants)
+        case_order = np.argsort(variant_ranks[variants.case_variants], kind='mergesort').astype(np.int32)
+
+        # case range of each variant in rank order
+        variant_ends = np.cumsum(variants.frequencies[variant_order])
+
+        parents, node_activities, depths = [-1], [-1], [0]
+        case_starts, case_ends, end_counts = [0], [variants.n_cases], [0]
+
+        path, previous = [0], ()
+        for rank, variant in enumerate(variant_order):
+            trace = traces[variant]
+            start = int(variant_ends[rank - 1]) if rank > 0 else 0
+            end = int(variant_ends[rank])
+
+            # length of the common prefix with the previous variant
+            common = 0
+            while common < min(len(trace), len(previous)) and trace[common] == previous[common]:
+                common += 1
+
+            del path[common + 1:]
+            for code in trace[common:]:
+                path.append(len(parents))
+                parents.append(path[-2])
+                node_activities.append(code)
+                depths.append(len(path) - 1)
+                case_starts.append(start)
+                case_ends.append(end)
+                end_counts.append(0)
+
+            for node in path[:common + 1]:
+                case_ends[node] = end
+            end_counts[path[-1]] += end - start
+
+            previous = trace
+
+        return PrefixTree(
+            parents=np.asarray(parents, dtype=np.int32),
+            node_activities=np.asarray(node_activities, dtype=np.int32),
+            depths=np.asarray(depths, dtype=np.int32),
+            case_starts=np.asarray(case_starts, dtype=np.int64),
+            case_ends=np.asarray(case_ends, dtype=np.int64),
+            end_counts=np.asarray(end_counts, dtype=np.int64),
+            activities=variants.activities,
+            cases=index.cases,
+            case_order=case_order
+        )
+
+    @staticmethod
+    def build_from_logtable(logtable, activity_key=None, timestamp_key=const.TIME_TIMESTAMP):
+        """Factory method to build a prefix tree from a log table. See
+        :meth:`podspy.log.table.LogTable.get_prefix_tree` for the cached version.
+
+        :param logtable: log table
+        :param activity_key: activity column, see :meth:`podspy.log.table.LogTable.get_default_activity_key`
+        :param timestamp_key: column to sort the events of a case by, None to keep the order of the event df
+        :return: built prefix tree
+        """
+        index = logtable.get_log_index(activity_key, timestamp_key=timestamp_key)
+        return PrefixTree.build_from_index(index)
+
+    def to_dict(self):
+        """Get the compact form of the prefix tree, a dict of arrays that can be stored with
+        :func:`numpy.savez` and read back with :meth:`from_dict`. Activities and caseids that are all
+        strings are stored as fixed width strings so that :func:`numpy.load` reads them without pickle.
+        Other object labels, e.g., with missing values, need ``np.load(fp, allow_pickle=True)``.
+
+        :return: dict of array name to array
+        """
+        arrays = {name: np.asarray(getattr(self, name)) for name in self.ARRAYS}
+
+        for name in ('activities', 'cases'):
+            labels = arrays[name]
+            if labels.dtype == object and all(isinstance(label, str) for label in labels):
+                arrays[name] = labels.astype(str) if len(labels) > 0 else labels.astype('U1')
+
+        return arrays
+
+    @staticmethod
+    def from_dict(arrays):
+        """Factory method to build a prefix tree from its compact form
+
+        :param arrays: dict of array name to array, see :meth:`to_dict`
+        :return: built prefix tree
+        """
+        arrays = {name: np.asarray(arrays[name]) for name in PrefixTree.ARRAYS}
+
+        for name in ('activities', 'cases'):
+            # labels are object arrays as in the built prefix tree
+            if arrays[name].dtype.kind == 'U':
+                arrays[name] = arrays[name].astype(object)
+
+        return PrefixTree(**arrays)
+
+    @property
+    def n_nodes(self):
+        return len(self.parents)
+
+    @property
+    def n_cases(self):
+        return len(self.case_order)
+
+    @property
+    def counts(self):
+        """Number of cases with the prefix of each node
+
+        """
+        return self.case_ends - self.case_starts
+
+    def get_children(self, node):
+        """Get the children of a node
+
+        :param node: node
+        :return: int32 array of nodes in increasing activity code
+        """
+        return self.children[self.child_offsets[node]:self.child_offsets[node + 1]]
+
+    def get_child(self, node, code):
+        """Get the child of a node by activity code
+
+        :param node: node
+        :param code: activity code
+        :return: child node or -1 if there is none
+        """
+        children = self.get_children(node)
+        position = np.searchsorted(self.node_activities[children], code)
+
+        if position < len(children) and self.node_activities[children[position]] == code:
+            return int(children[position])
+        return -1
+
+    def find(self, prefix):
+        """Find the node of a prefix in O(prefix length)
+
+        :param prefix: sequence of activities
+        :return: node or -1 if no case starts with the prefix
+        """
+        node = 0
+        for activity in prefix:
+            code = self.activity_codes.get(activity, -1)
+            if code < 0:
+                return -1
+            node = self.get_child(node, code)
+            if node < 0:
+                return -1
+        return node
+
+    def get_prefix(self, node):
+        """Get the prefix of a node
+
+        :param node: node
+        :return: list of activities
+        """
+        codes = list()
+        while node > 0:
+            codes.append(self.node_activities[node])
+            node = self.parents[node]
+        return list(self.activities[codes[::-1]])
+
+    def count(self, prefix):
+        """Count the cases that start with a prefix
+
+        :param prefix: sequence of activities
+        :return: number of cases
+        """
+        node = self.find(prefix)
+        return int(self.counts[node]) if node >= 0 else 0
+
+    def get_case_codes(self, prefix):
+        """Get the case codes of the cases that start with a prefix
+
+        :param prefix: sequence of activities
+        :return: int32 array of case codes
+        """
+        node = self.find(prefix)
+        if node < 0:
+            return self.case_order[:0]
+        return self.case_order[self.case_starts[node]:self.case_ends[node]]
+
+    def get_cases(self, prefix):
+        """Get the caseids of the cases that start with a prefix
+
+        :param prefix: sequence of activities
+        :return: array of caseids
+        """
+        return self.cases[self.get_case_codes(prefix)]
+
+    def get_next_activities(self, prefix):
+        """Get the distribution of the next activity after a prefix over the cases that start with it
+
+        :param prefix: sequence of activities
+        :return: series of the number of cases per next activity, None for the cases that end with the prefix
+        """
+        node = self.find(prefix)
+        if node < 0:
+            return pd.Series([], dtype=np.int64)
+
+        children = self.get_children(node)
+        labels = list(self.activities[self.node_activities[children]])
+        counts = list(self.counts[children])
+
+        if self.end_counts[node] > 0:
+            labels.append(None)
+            counts.append(self.end_counts[node])
+
+        return pd.Series(counts, index=labels, dtype=np.int64)
@@ -0,0 +1,174 @@
+#!/usr/bin/env python
+
+"""This is the sampling module.
+
+This module contains trace samplers that select the traces to import while a log is parsed,
+so that the full log table is never built.
+"""
+
+
+__all__ = [
+    'HeadSampler',
+    'StrideSampler',
+    'ReservoirSampler',
+    'HashSampler'
+]
+
+
+import random, zlib
+from abc import ABC, abstractmethod
+
+
+class TraceSampler(ABC):
+    # whether the selection of a trace is only known at the end of the log
+    DEFERRED = False
+    # whether disjoint parts of the log can be sampled independently
+    PARALLEL = False
+
+    def reset(self):
+        """Reset the sampler before a log is parsed.
+
+        """
+        pass
+
+    @abstractmethod
+    def select(self, index, caseid):
+        """Decide whether to keep a trace.
+
+        :param index: position of the trace in the log
+        :param caseid: caseid of the trace
+        :return: whether the trace is selected
+        """
+        pass
+
+    def is_done(self):
+        """Whether no further traces can be selected so that parsing can stop.
+
+        :return: bool
+        """
+        return False
+
+
+class HeadSampler(TraceSampler):
+    def __init__(self, n):
+        """Sampler of the first n traces of a log. Parsing stops after the n-th trace.
+
+        :param n: number of traces
+        """
+        if n < 0:
+            raise ValueError('Number of traces has to be non-negative: {}'.format(n))
+        self.n = n
+        self.n_selected = 0
+
+    def __repr__(self):
+        return '{}({})'.format(self.__class__.__name__, self.n)
+
+    def reset(self):
+        self.n_selected = 0
+
+    def select(self, index, caseid):
+        if self.n_selected >= self.n:
+            return False
+        self.n_selected += 1
+        return True
+
+    def is_done(self):
+        return self.n_selected >= self.n
+
+
+class StrideSampler(TraceSampler):
+    PARALLEL = True
+
+    def __init__(self, k, start=0):
+        """Sampler of every k-th trace of a log starting from the trace at position start.
+
+        :param k: step between selected traces
+        :param start: position of the first selected trace
+        """
+        if k < 1:
+            raise ValueError('Step has to be positive: {}'.format(k))
+        if start < 0:
+            raise ValueError('Start has to be non-negative: {}'.format(start))
+        self.k = k
+        self.start = start
+
+    def __repr__(self):
+        return '{}({}, {})'.format(self.__class__.__name__, self.k, self.start)
+
+    def select(self, index, caseid):
+        return index >= self.start and (index - self.start) % self.k == 0
+
+
+class ReservoirSampler(TraceSampler):
+    DEFERRED = True
+
+    def __init__(self, k, seed=0):
+        """Uniform random sampler of k traces using reservoir sampling. The selected traces are only
+        known once the whole log has been seen, so the sampler holds on to k traces at a time.
+
+        :param k: number of traces
+        :param seed: random seed
+        """
+        if k < 0:
+            raise ValueError('Number of traces has to be non-negative: {}'.format(k))
+        self.k = k
+        self.seed = seed
+        self.reset()
+
+    def __repr__(self):
+        return '{}({}, {})'.format(self.__class__.__name__, self.k, self.seed)
+
+    def reset(self):
+        self.random = random.Random(self.seed)
+        self.reservoir = list()
+        self.n_seen = 0
+
+    def select(self, index, caseid):
+        raise ValueError('{} cannot decide on a single trace, offer the traces and get the selected ones '
+                         'at the end of the log'.format(self.__class__.__name__))
+
+    def offer(self, index, item):
+        """Offer a trace to the reservoir.
+
+        :param index: position of the trace in the log
+        :param item: trace to keep if it is selected
+        """
+        if len(self.reservoir) < self.k:
+            self.reservoir.append((index, item))
+        else:
+            slot = self.random.randint(0, self.n_seen)
+            if slot < self.k:
+                self.reservoir[slot] = (index, item)
+        self.n_seen += 1
+
+    def get_selected(self):
+        """Get the selected traces in the order of the log.
+
+        :return: list of (index, item)
+        """
+        return sorted(self.reservoir, key=lambda selected: selected[0])
+
+
+class HashSampler(TraceSampler):
+    PARALLEL = True
+
+    def __init__(self, fraction, seed=0):
+        """Deterministic sampler that keeps a trace if the hash of its caseid falls within the given
+        fraction of the hash range. The same caseid is always selected with the same seed, across
+        imports and across logs.
+
+        :param fraction: fraction of traces to keep between 0 and 1
+        :param seed: seed of the hash
+        """
+        if not 0 <= fraction <= 1:
+            raise ValueError('Fraction has to be between 0 and 1: {}'.format(fraction))
+        self.fraction = fraction
+        self.seed = seed
+        self.threshold = int(fraction * (1 << 32))
+
+    def __repr__(self):
+        return '{}({}, {})'.format(self.__class__.__name__, self.fraction, self.seed)
+
+    def select(self, index, caseid):
+        key = '{}:{}'.format(self.seed, caseid).encode()
+        return zlib.crc32(key) & 0xffffffff < self.threshold
@@ -14,32 +14,11 @@ import warnings, logging
 import pandas as pd
 import numpy as np
 import functools as fts
-import itertools as its
 
 from . import constants as const
-
-from opyenxes.model.XLog import XLog
-from opyenxes.model.XTrace import XTrace
-from opyenxes.model.XEvent import XEvent
-
-from opyenxes.model.XAttributeTimestamp import XAttributeTimestamp
-from opyenxes.model.XAttributeID import XAttributeID
-from opyenxes.model.XAttributeBoolean import XAttributeBoolean
-from opyenxes.model.XAttributeContinuous import XAttributeContinuous
-from opyenxes.model.XAttributeLiteral import XAttributeLiteral
-from opyenxes.model.XAttributeDiscrete import XAttributeDiscrete
-
-from opyenxes.model.XAttributeContainer import XAttributeContainer
-from opyenxes.model.XAttributeList import XAttributeList
-from opyenxes.model.XAttributeMap import XAttributeMap
-
-from opyenxes.classification.XEventAndClassifier import XEventAndClassifier
-from opyenxes.extension.XExtension import XExtension
-
-from opyenxes.extension.XExtensionManager import XExtensionManager
-
-MANAGER = XExtensionManager()
-CONCEPT_EXT = MANAGER.get_by_name('Concept')
+from . import index as log_index
+from . import variants as log_variants
+from . import prefix as log_prefix
 
 
 # To me:
@@ -67,7 +46,7 @@ class LogTable:
     def __init__(self, trace_df=None, event_df=None, attributes=None,
                  global_trace_attributes=None, global_event_attributes=None,
                  classifiers=None, extensions=None, variant_sep=VARIANT_SEP,
-                 variant_id=VARIANT_ID):
+                 variant_id=VARIANT_ID, nested_df=None):
         """Container class of event data in dataframe format.
 
         :param trace_df: dataframe containing information of each trace in event log
@@ -81,7 +60,13 @@ class LogTable:
             Each extension consisting of (name, prefix, uri)
         :param variant_sep: separator of events for variant strings
         :param variant_id: variant id column name
+        :param nested_df: dataframe containing the list and container attributes of traces and events, one
+            row per nested attribute with its scope (trace or event), the index of its trace or event row, its
+            path, key, value as string and type
         """
+        # values derived from the event dataframe, e.g., log indexes
+        self.__cache = dict()
+
         self.trace_df = trace_df if trace_df is not None else pd.DataFrame()
         self.event_df = event_df if event_df is not None else pd.DataFrame()
         self.attributes = attributes if attributes is not None else dict()
@@ -95,12 +80,78 @@ class LogTable:
         self.variant_sep = variant_sep
         self.variant_id = variant_id
 
-    def get_event_identity_list(self, clf_name=None, sort=True):
-        """Get the unique event identities using given classifier
+        self.nested_df = nested_df if nested_df is not None else pd.DataFrame(columns=const.NESTED_COLUMNS)
+
+    @property
+    def event_df(self):
+        return self.__event_df
+
+    @event_df.setter
+    def event_df(self, event_df):
+        self.__event_df = event_df
+        self.invalidate_cache()
+
+    def invalidate_cache(self):
+        """Drop the values derived from the event dataframe. Replacing the event dataframe, or adding or removing
+        its rows or columns, is detected, but changing its values in place requires calling this.
+
+        """
+        self.__cache = dict()
+
+    def get_cached(self, key, build):
+        """Get a value derived from the event dataframe, building it on first use
+
+        :param key: cache key
+        :param build: function without arguments that builds the value
+        :return: cached value
+        """
+        event_df = self.__event_df
+        fingerprint = (id(event_df), event_df.shape, tuple(event_df.columns))
+        cached = self.__cache.get(key, None)
+
+        if cached is None or cached[0] != fingerprint:
+            cached = (fingerprint, build())
+            self.__cache[key] = cached
+
+        return cached[1]
+
+    def get_default_activity_key(self):
+        """Get the activity column, which is the activity column if there is one and concept:name otherwise
+
+        :return: column name or None if there is neither
+        """
+        for key in (const.ACTIVITY, const.CONCEPT_NAME):
+            if key in self.event_df.columns:
+                return key
+        return None
+
+    def get_log_index(self, activity_key=None, timestamp_key=const.TIME_TIMESTAMP):
+        """Get the integer encoding of the cases and activities with the events grouped by case, see
+        :class:`podspy.log.index.LogIndex`. The index is built once and cached until the event dataframe changes.
+
+        :param activity_key: activity column, see :meth:`get_default_activity_key` if None
+        :param timestamp_key: column to sort the events of a case by, None to keep the order of the event dataframe
+        :return: LogIndex
+        """
+        if activity_key is None:
+            activity_key = self.get_default_activity_key()
+
+        build = lambda: log_index.LogIndex(self.event_df, activity_key, timestamp_key)
+        return self.get_cached(('log_index', activity_key, timestamp_key), build)
+
+    @property
+    def trace_offsets(self):
+        """Offsets of the events of each case in the default log index, see :meth:`get_log_index`
+
+        """
+        return self.get_log_index().trace_offsets
+
+    def get_classifier_keys(self, clf_name=None):
+        """Get the event attribute keys of a classifier, the first classifier if the classifier is not
+        defined and concept:name if there are no classifiers
 
         :param clf_name: classifier name
-        :param sort: whether to sort the event identities
-        :return: a list of event identities
+        :return: list of event attribute keys
         """
         if clf_name is None or clf_name not in self.classifiers:
             keys = list(self.classifiers.keys())
@@ -111,19 +162,46 @@ class LogTable:
         # use concept:name if there's no classifier
         if len(self.classifiers) == 0:
             warnings.warn('No classifiers! Using concept:name as event classifier!')
-            clf = [const.CONCEPT_NAME]
-        else:
-            clf = self.classifiers[clf_name]
-        subset = self.event_df[clf].drop_duplicates()
+            return [const.CONCEPT_NAME]
+
+        return list(self.classifiers[clf_name])
+
+    def get_event_identity_column(self, clf_name=None):
+        """Get the event identity of each event using given classifier as a categorical column whose codes
+        number the identities in the order of their first event. The identity of a classifier with more than
+        one key joins the values of the keys with '&&'. The column is built once per classifier and cached
+        until the event dataframe changes.
+
+        :param clf_name: classifier name, see :meth:`get_classifier_keys`
+        :return: categorical series aligned with event_df, missing if one of the keys is missing
+        """
+        clf = self.get_classifier_keys(clf_name)
+        return self.get_cached(('event_identity', tuple(clf)), lambda: self.make_event_identity_column(clf))
+
+    def make_event_identity_column(self, clf):
+        codes, first_rows = log_index.encode_columns(self.event_df, clf)
+        subset = self.event_df[clf].iloc[first_rows]
 
         logger.debug('Event identity columns with unique rows: \n{}'.format(subset.head(5)))
         logger.debug('Event identity columns with unique rows dtypes: \n{}'.format(subset.dtypes))
 
         # concat the columns if it involves more than one column
         if len(clf) == 1:
-            id_list = its.chain(*subset.values.tolist())
+            identities = np.asarray(subset[clf[0]].values)
         else:
-            id_list = subset.apply(lambda row: '&&'.join(row), axis=1).tolist()
+            identities = ['&&'.join(map(str, row)) for row in subset.itertuples(index=False)]
+
+        identities = pd.Categorical.from_codes(codes, categories=identities)
+        return pd.Series(identities, index=self.event_df.index, name='&&'.join(clf))
+
+    def get_event_identity_list(self, clf_name=None, sort=True):
+        """Get the unique event identities using given classifier
+
+        :param clf_name: classifier name
+        :param sort: whether to sort the event identities
+        :return: a list of event identities
+        """
+        id_list = self.get_event_identity_column(clf_name).cat.categories.tolist()
 
         if sort:
             id_list = sorted(id_list)
@@ -134,6 +212,47 @@ class LogTable:
 
         return id_list
 
+    def get_variants(self, activity_key=None):
+        """Get the trace variants of the cases with the events of a case in the order of the event dataframe, see
+        :class:`podspy.log.index.TraceVariants`. The variants are computed once and cached until the event
+        dataframe changes.
+
+        :param activity_key: activity column, see :meth:`get_default_activity_key` if None
+        :return: TraceVariants
+        """
+        if activity_key is None:
+            activity_key = self.get_default_activity_key()
+
+        build = lambda: log_index.TraceVariants(self.get_log_index(activity_key, timestamp_key=None))
+        return self.get_cached(('variants', activity_key), build)
+
+    def get_variant_log(self, activity_key=None):
+        """Get the variant compressed view of the log table, see :class:`podspy.log.variants.VariantLog`. The
+        view is built once and cached until the event dataframe changes.
+
+        :param activity_key: activity column, see :meth:`get_default_activity_key` if None
+        :return: VariantLog
+        """
+        if activity_key is None:
+            activity_key = self.get_default_activity_key()
+
+        build = lambda: log_variants.VariantLog.build_from_logtable(self, activity_key)
+        return self.get_cached(('variant_log', activity_key), build)
+
+    def get_prefix_tree(self, activity_key=None, timestamp_key=const.TIME_TIMESTAMP):
+        """Get the prefix tree of the traces, see :class:`podspy.log.prefix.PrefixTree`. The tree is built once
+        and cached until the event dataframe changes.
+
+        :param activity_key: activity column, see :meth:`get_default_activity_key` if None
+        :param timestamp_key: column to sort the events of a case by, None to keep the order of the event df
+        :return: PrefixTree
+        """
+        if activity_key is None:
+            activity_key = self.get_default_activity_key()
+
+        build = lambda: log_prefix.PrefixTree.build_from_logtable(self, activity_key, timestamp_key)
+        return self.get_cached(('prefix_tree', activity_key, timestamp_key), build)
+
     def get_trace_variants(self):
         """Allocate case ids to trace variants by their activity column
 
@@ -144,27 +263,129 @@ class LogTable:
         if const.CASEID not in self.event_df.columns:
             raise ValueError('Caseid column not defined in event df!')
 
-        # concat events per caseid so a trace of events can be computed before using
-        # groupby per trace
+        variants = self.get_variants(const.ACTIVITY)
+        cases = self.get_log_index(const.ACTIVITY, timestamp_key=None).cases
 
-        # concat events per caseid to form event strings
-        traces = self.event_df.groupby(const.CASEID, as_index=False)
-        logger.debug('Traces: \n'.format(traces))
-        traces = traces.agg({const.ACTIVITY: lambda values: self.variant_sep.join(values)})
-        # rename activity column as variant
-        traces.rename({const.ACTIVITY: const.VARIANT}, axis=1, inplace=True)
+        # variant ids are numbered in the order of the first case by caseid
+        case_order = np.argsort(cases, kind='mergesort')
+        variant_ids, variant_order = pd.factorize(variants.case_variants[case_order])
+        # rows are grouped by variant id
+        row_order = np.argsort(variant_ids, kind='mergesort')
 
-        # create variant ids
-        variant_id = traces[[const.VARIANT]].drop_duplicates().reset_index(drop=True)
-        # to get index column for creating variant ids
-        variant_id = variant_id.reset_index()
+        variant_strs = list()
+        for variant in variant_order:
+            activities = variants.activities[variants.get_variant(variant)]
+            variant_strs.append(self.variant_sep.join(activities))
+        variant_strs = np.asarray(variant_strs, dtype=object)
+
+        variant_ids = variant_ids[row_order]
         make_variant_id = lambda val: '{} {}'.format(const.VARIANT, val)
-        variant_id[self.variant_id] = variant_id['index'].apply(make_variant_id)
-        variant_id = variant_id[[const.VARIANT, self.variant_id]]
+        variant_id_strs = np.asarray([make_variant_id(i) for i in range(len(variant_order))], dtype=object)
 
-        # merge with traces to assign the variant id to each caseid
-        variant_df = pd.merge(traces, variant_id, on=const.VARIANT)
-        variant_df = variant_df[[const.CASEID, self.variant_id, const.VARIANT]]
+        variant_df = pd.DataFrame({
+            const.CASEID: cases[case_order][row_order],
+            self.variant_id: variant_id_strs[variant_ids],
+            const.VARIANT: variant_strs[variant_ids]
+        }, columns=[const.CASEID, self.variant_id, const.VARIANT])
 
         return variant_df
 
+    def get_timestamp_index(self, timestamp_key=const.TIME_TIMESTAMP):
+        """Get the events sorted by timestamp, see :class:`podspy.log.index.TimestampIndex`. The index is built
+        once and cached until the event dataframe changes.
+
+        :param timestamp_key: timestamp column
+        :return: TimestampIndex
+        """
+        if timestamp_key not in self.event_df.columns:
+            raise ValueError('Timestamp column {} not defined in event df!'.format(timestamp_key))
+
+        build = lambda: log_index.TimestampIndex(self.event_df[timestamp_key])
+        return self.get_cached(('timestamp_index', timestamp_key), build)
+
+    def select_cases(self, case_attr):
+        """Select the caseids of the traces with given trace attribute values
+
+        :param case_attr: dict of trace attribute key to value or list of values
+        :return: array of caseids
+        """
+        selected = np.ones(self.trace_df.shape[0], dtype=np.bool_)
+
+        for key, values in case_attr.items():
+            if key not in self.trace_df.columns:
+                raise ValueError('Trace attribute {} not defined in trace df!'.format(key))
+            if isinstance(values, (list, tuple, set, frozenset)):
+                selected &= self.trace_df[key].isin(list(values)).values
+            else:
+                selected &= (self.trace_df[key] == values).values
+
+        return self.trace_df[const.CASEID].values[selected]
+
+    def filter(self, activity_in=None, time_between=None, case_attr=None, activity_key=None,
+               timestamp_key=const.TIME_TIMESTAMP):
+        """Filter the log table with the cached log indexes. Events are kept if their activity is one of the
+        given activities, their timestamp is within the time range and their trace has the given trace
+        attribute values. Traces without events left are dropped unless only trace attributes are filtered.
+
+        :param activity_in: activity or iterable of activities to keep, None to keep all
+        :param time_between: (start, end) of the time range with start and end included, either can be None
+        :param case_attr: dict of trace attribute key to value or list of values to keep, None to keep all
+        :param activity_key: activity column, see :meth:`get_default_activity_key` if None
+        :param timestamp_key: timestamp column
+        :return: filtered log table with the index labels of the kept rows
+        """
+        if activity_key is None:
+            activity_key = self.get_default_activity_key()
+
+        index = self.get_log_index(activity_key, timestamp_key=None)
+        positions = None
+
+        def intersect(positions, other):
+            return other if positions is None else np.intersect1d(positions, other, assume_unique=True)
+
+        if activity_in is not None:
+            if isinstance(activity_in, str):
+                activity_in = [activity_in]
+            positions = intersect(positions, index.get_activity_positions(activity_in))
+
+        if time_between is not None:
+            start, end = time_between
+            timestamp_index = self.get_timestamp_index(timestamp_key)
+            positions = intersect(positions, timestamp_index.get_positions(start, end))
+
+        caseids = None
+        if case_attr is not None:
+            caseids = self.select_cases(case_attr)
+            case_positions = index.get_case_positions(index.get_case_codes(caseids))
+            positions = intersect(positions, case_positions)
+
+        if positions is None:
+            positions = np.arange(self.event_df.shape[0])
+
+        event_df = self.event_df.iloc[positions]
+
+        # cases of the kept events, or of the selected traces if only trace attributes are filtered
+        if activity_in is not None or time_between is not None:
+            case_codes = np.unique(index.case_codes[positions])
+            caseids = index.cases[case_codes[case_codes >= 0]]
+
+        trace_df = self.trace_df
+        if caseids is not None and const.CASEID in trace_df.columns:
+            trace_df = trace_df[trace_df[const.CASEID].isin(caseids).values]
+
+        nested_df = self.nested_df
+        if nested_df.shape[0] > 0:
+            # rows refer to the index labels of the trace or event df, see podspy.log.data_io.TRACE and EVENT
+            scopes, rows = nested_df[const.SCOPE].values, nested_df[const.ROW].values
+            is_kept = ((scopes == 'trace') & np.isin(rows, trace_df.index.values)) | \
+                      ((scopes == 'event') & np.isin(rows, event_df.index.values))
+            nested_df = nested_df[is_kept]
+
+        lt = LogTable(trace_df=trace_df, event_df=event_df, attributes=dict(self.attributes),
+                      global_trace_attributes=dict(self.global_trace_attributes),
+                      global_event_attributes=dict(self.global_event_attributes),
+                      classifiers=dict(self.classifiers), extensions=dict(self.extensions),
+                      variant_sep=self.variant_sep, variant_id=self.variant_id, nested_df=nested_df)
+        lt.xes_attributes = dict(self.xes_attributes)
+
+        return lt
@@ -0,0 +1,207 @@
+#!/usr/bin/env python
+
+"""This is the tabular io module.
+
+This module reads event logs from tabular files, e.g., CSV and Parquet, with one event per row.
+"""
+
+
+__all__ = [
+    'import_log_table_csv',
+    'import_log_table_parquet'
+]
+
+
+import logging, time
+import numpy as np
+import pandas as pd
+
+from . import constants as const
+from . import table as tble
+from . import data_io
+from podspy.utils import conversion as cvrn
+
+
+logger = logging.getLogger(__file__)
+
+
+def get_column_mapping(caseid_col, activity_col, timestamp_col, column_mapping=None):
+    """Make the mapping of source columns to log table columns
+
+    :param caseid_col: source column of the caseids
+    :param activity_col: source column of the activities, None if there is none
+    :param timestamp_col: source column of the timestamps, None if there is none
+    :param column_mapping: mapping of other source columns to rename
+    :return: dict of source column to log table column
+    """
+    mapping = dict(column_mapping) if column_mapping is not None else dict()
+    mapping[caseid_col] = const.CASEID
+
+    if activity_col is not None:
+        mapping[activity_col] = const.CONCEPT_NAME
+    if timestamp_col is not None:
+        mapping[timestamp_col] = const.TIME_TIMESTAMP
+
+    return mapping
+
+
+def prepare_chunk(chunk, mapping, categorical=None):
+    """Rename the columns of a chunk of events and convert the timestamps and categorical columns
+
+    :param chunk: dataframe of events
+    :param mapping: dict of source column to log table column
+    :param categorical: log table columns to convert to categorical
+    :return: dataframe of events
+    """
+    chunk = chunk.rename(columns=mapping)
+
+    if const.CASEID not in chunk.columns:
+        raise ValueError('Caseid column is missing, columns are {}'.format(list(chunk.columns)))
+
+    if const.TIME_TIMESTAMP in chunk.columns:
+        timestamps = cvrn.parse_timestamps(chunk[const.TIME_TIMESTAMP])
+        chunk[const.TIME_TIMESTAMP] = pd.Series(timestamps, index=chunk.index)
+
+    if categorical is not None:
+        for col in categorical:
+            if col in chunk.columns:
+                chunk[col] = chunk[col].astype('category')
+
+    return chunk
+
+
+def build_log_table(chunks, mapping, case_columns=None, categorical=None, sort=True):
+    """Build a log table from chunks of events. Case level columns are moved to the trace dataframe, which
+    has a row per caseid in the order of the first event of each case. Events without caseid do not belong
+    to any case and are dropped with a warning.
+
+    Chunking only bounds the memory of the parser: the prepared chunks are held until all of them are read
+    and are then concatenated, so that the peak memory is about twice the size of the event dataframe.
+
+    :param chunks: iterable of dataframes of events
+    :param mapping: dict of source column to log table column
+    :param case_columns: log table columns with case level attributes
+    :param categorical: log table columns to convert to categorical
+    :param sort: whether to sort the events by case and timestamp
+    :return: LogTable
+    """
+    case_columns = list(case_columns) if case_columns is not None else list()
+    trace_dfs, event_dfs = list(), list()
+    n_events, n_dropped = 0, 0
+
+    for chunk in chunks:
+        chunk = prepare_chunk(chunk, mapping, categorical)
+
+        no_caseid = chunk[const.CASEID].isnull().values
+        if no_caseid.any():
+            n_dropped += int(no_caseid.sum())
+            chunk = chunk.loc[~no_caseid]
+            caseids = chunk[const.CASEID]
+            # integer caseids are read as floats when a chunk has missing values
+            if caseids.dtype.kind == 'f' and (caseids == np.round(caseids)).all():
+                chunk[const.CASEID] = caseids.astype(np.int64)
+
+        missing = [col for col in case_columns if col not in chunk.columns]
+        if missing:
+            raise ValueError('Case columns {} are missing, columns are {}'.format(missing, list(chunk.columns)))
+
+        # first row of each case within the chunk
+        trace_cols = [const.CASEID] + case_columns
+        trace_dfs.append(chunk[trace_cols].drop_duplicates(subset=const.CASEID))
+        event_dfs.append(chunk.drop(columns=case_columns))
+
+        n_events += chunk.shape[0]
+        logger.debug('Read {} events'.format(n_events))
+
+    if n_dropped > 0:
+        logger.warning('Dropped {} events without caseid'.format(n_dropped))
+
+    if not event_dfs:
+        return tble.LogTable()
+
+    event_df = data_io.concat_frames(event_dfs)
+    # cases that span several chunks
+    trace_df = data_io.concat_frames(trace_dfs).drop_duplicates(subset=const.CASEID).reset_index(drop=True)
+
+    if sort:
+        # order of cases is the order of their first event, events are ordered by time within a case
+        case_codes = pd.Categorical(event_df[const.CASEID], categories=trace_df[const.CASEID]).codes
+        keys = [case_codes]
+        if const.TIME_TIMESTAMP in event_df.columns:
+            # NaT goes last within a case
+            keys.insert(0, event_df[const.TIME_TIMESTAMP].values.astype(np.int64))
+            keys[0][event_df[const.TIME_TIMESTAMP].isnull().values] = np.iinfo(np.int64).max
+        # lexsort is stable and sorts by the last key first
+        order = np.lexsort(keys)
+        event_df = event_df.iloc[order].reset_index(drop=True)
+
+    return tble.LogTable(trace_df=trace_df, event_df=event_df)
+
+
+def import_log_table_csv(fp, caseid_col='case', activity_col='activity', timestamp_col='timestamp',
+                         case_columns=None, column_mapping=None, categorical=None, sort=True, chunksize=1 << 20,
+                         **read_csv_kwargs):
+    """Import a CSV file with one event per row as log table. The file is read chunksize rows at a time
+    and the dtypes of the columns are inferred per chunk, so that the parser does not hold the whole file.
+    The chunks are concatenated once they are all read, see :func:`build_log_table`. Columns are renamed
+    to the log table conventions, i.e., the caseid column to caseid, the activity column to concept:name
+    and the timestamp column to time:timestamp, which is parsed to UTC.
+
+    :param fp: file path to the CSV file, which can be compressed
+    :param caseid_col: column of the caseids
+    :param activity_col: column of the activities, None if there is none
+    :param timestamp_col: column of the timestamps, None if there is none
+    :param case_columns: case level columns, after renaming, that go to the trace dataframe instead of the
+    event dataframe, e.g., ['customer']
+    :param column_mapping: mapping of other columns to rename
+    :param categorical: columns, after renaming, to convert to categorical while reading, e.g., ['concept:name']
+    :param sort: whether to sort the events by case and timestamp
+    :param chunksize: number of rows to read at a time
+    :param read_csv_kwargs: keyword arguments of :func:`pandas.read_csv`, e.g., sep or dtype
+    :return: LogTable
+    """
+    start = time.time()
+
+    mapping = get_column_mapping(caseid_col, activity_col, timestamp_col, column_mapping)
+    chunks = pd.read_csv(fp, chunksize=chunksize, **read_csv_kwargs)
+    lt = build_log_table(chunks, mapping, case_columns, categorical, sort)
+
+    logger.info('Importing {} took {:.2f}s'.format(fp, time.time() - start))
+
+    return lt
+
+
+def import_log_table_parquet(fp, caseid_col='case', activity_col='activity', timestamp_col='timestamp',
+                             case_columns=None, column_mapping=None, categorical=None, sort=True,
+                             chunksize=1 << 20, columns=None):
+    """Import a Parquet file with one event per row as log table. The file is read in record batches of
+    chunksize rows, see :func:`import_log_table_csv` for the column conventions. Requires pyarrow.
+
+    :param fp: file path to the Parquet file
+    :param caseid_col: column of the caseids
+    :param activity_col: column of the activities, None if there is none
+    :param timestamp_col: column of the timestamps, None if there is none
+    :param case_columns: case level columns, after renaming, that go to the trace dataframe
+    :param column_mapping: mapping of other columns to rename
+    :param categorical: columns, after renaming, to convert to categorical while reading
+    :param sort: whether to sort the events by case and timestamp
+    :param chunksize: number of rows to read at a time
+    :param columns: source columns to read, None to read all
+    :return: LogTable
+    """
+    try:
+        import pyarrow.parquet as pq
+    except ImportError:
+        raise ImportError('requires pyarrow https://arrow.apache.org/docs/python')
+
+    start = time.time()
+
+    mapping = get_column_mapping(caseid_col, activity_col, timestamp_col, column_mapping)
+    parquet_file = pq.ParquetFile(fp)
+    batches = parquet_file.iter_batches(batch_size=chunksize, columns=columns)
+    chunks = (batch.to_pandas() for batch in batches)
+    lt = build_log_table(chunks, mapping, case_columns, categorical, sort)
+
+    logger.info('Importing {} took {:.2f}s'.format(fp, time.time() - start))
+
+    return lt
@@ -7,17 +7,17 @@ reading xes log files.
 """
 
 
-import os, gzip, shutil, tempfile
+import os, gzip, bz2, lzma, zipfile, shutil, tempfile
+import numpy as np
 import pandas as pd
 
-
-from opyenxes.data_in.XUniversalParser import XUniversalParser
-from opyenxes.factory.XFactory import XFactory
-
 from .constants import *
 
 
 def read_event_log_file(log_filepath):
+    # opyenxes is only loaded when it is used
+    from opyenxes.data_in.XUniversalParser import XUniversalParser
+
     if not os.path.isfile(log_filepath):
         raise ValueError('{} is not a log file!'.format(log_filepath))
 
@@ -33,8 +33,8 @@ def downcast_int_df_columns(df, inplace=True):
     if not inplace:
         downcasted = df.copy(deep=True)
 
-    for col in downcasted.select_dtypes(include=['int']).columns:
-        downcasted.loc[:,col] = downcasted[col].apply(pd.to_numeric, downcast='unsigned')
+    for col in downcasted.select_dtypes(include=['integer']).columns:
+        downcasted[col] = downcast_int_column(downcasted[col])
 
     if not inplace:
         return downcasted
@@ -45,8 +45,8 @@ def downcast_float_df_columns(df, inplace=True):
     if not inplace:
         downcasted = df.copy(deep=True)
 
-    for col in downcasted.select_dtypes(include=['float']).columns:
-        downcasted.loc[:,col] = downcasted[col].apply(pd.to_numeric, downcast='float')
+    for col in downcasted.select_dtypes(include=['floating']).columns:
+        downcasted[col] = pd.to_numeric(downcasted[col], downcast='float')
 
     if not inplace:
         return downcasted
@@ -58,25 +58,126 @@ def threshold_categorize_str_df_columns(df, threshold=0.5, inplace=True):
         downcasted = df.copy(deep=True)
 
     for col in downcasted.select_dtypes(include=['object']).columns:
-        nb_unique_vals = downcasted[col].unique().shape[0]
-        nb_total_vals = downcasted[col].shape[0]
-        if nb_unique_vals / nb_total_vals < threshold:
-            downcasted.loc[:,col] = downcasted[col].astype('category')
+        if is_low_cardinality(downcasted[col], threshold):
+            downcasted[col] = downcasted[col].astype('category')
+
+    if not inplace:
+        return downcasted
 
 
 def optimize_df_dtypes(df, threshold=0.5, inplace=True):
     downcasted = df
     if not inplace:
         downcasted = df.copy(deep=True)
-    downcast_int_df_columns(downcasted, inplace)
-    downcast_float_df_columns(downcasted, inplace)
-    threshold_categorize_str_df_columns(downcasted, threshold, inplace)
+    # the copy is downcasted in place
+    downcast_int_df_columns(downcasted)
+    downcast_float_df_columns(downcasted)
+    threshold_categorize_str_df_columns(downcasted, threshold)
 
     if not inplace:
         return downcasted
 
 
+def downcast_int_column(series):
+    """Downcast an integer column to the smallest integer dtype that holds its values, unsigned if it has
+    no negative values.
+
+    :param series: integer column
+    :return: downcasted column
+    """
+    if series.shape[0] == 0:
+        return series
+    downcast = 'unsigned' if series.min() >= 0 else 'integer'
+    return pd.to_numeric(series, downcast=downcast)
+
+
+def is_low_cardinality(series, threshold=0.5):
+    """Whether the number of distinct values of a column is below a fraction of its length
+
+    :param series: column
+    :param threshold: fraction of distinct values
+    :return: bool
+    """
+    n_values = series.shape[0]
+    return n_values > 0 and series.nunique(dropna=False) / n_values < threshold
+
+
+def optimize_column(series, threshold=0.5, timestamp_int=False):
+    """Convert a column to a dtype that takes less memory in whole-column operations. Integers are downcast
+    to the smallest integer dtype, floats to float32 if they hold the values exactly, string columns with
+    few distinct values become categorical, and object columns of timestamps become datetime columns.
+
+    :param series: column
+    :param threshold: categorize string columns whose fraction of distinct values is below it
+    :param timestamp_int: convert datetime columns to int64 nanoseconds since the epoch in UTC, with the
+    minimum int64 value for missing timestamps
+    :return: optimized column
+    """
+    dtype = series.dtype
+
+    if pd.api.types.is_bool_dtype(dtype) or isinstance(dtype, pd.api.types.CategoricalDtype):
+        return series
+
+    elif pd.api.types.is_integer_dtype(dtype):
+        return downcast_int_column(series)
+
+    elif pd.api.types.is_float_dtype(dtype):
+        downcasted = series.astype(np.float32)
+        is_exact = (downcasted.values == series.values) | np.isnan(series.values)
+        return downcasted if is_exact.all() else series
+
+    elif pd.api.types.is_datetime64_any_dtype(dtype):
+        if not timestamp_int:
+            return series
+        if getattr(dtype, 'tz', None) is not None:
+            series = series.dt.tz_convert('UTC').dt.tz_localize(None)
+        return pd.Series(series.values.view(np.int64), index=series.index, name=series.name)
+
+    elif dtype == object:
+        inferred = pd.api.types.infer_dtype(series, skipna=True)
+        if inferred == 'datetime':
+            converted = pd.to_datetime(series, utc=True)
+            return optimize_column(converted, threshold, timestamp_int)
+        elif inferred == 'string' and is_low_cardinality(series, threshold):
+            return series.astype('category')
+
+    return series
+
+
+def optimize_log_table(lt, threshold=0.5, timestamp_int=False, inplace=True):
+    """Reduce the memory of the trace and event dataframes of a log table column by column, see
+    :func:`optimize_column`.
+
+    :param lt: log table
+    :param threshold: categorize string columns whose fraction of distinct values is below it
+    :param timestamp_int: convert datetime columns to int64 nanoseconds since the epoch
+    :param inplace: replace the dataframes of the log table, otherwise only report the savings
+    :return: dataframe with the scope, column, dtype and memory in bytes before and after of every column
+    """
+    rows = list()
+
+    for scope in ('trace', 'event'):
+        df = getattr(lt, scope + '_df')
+        optimized = dict()
+
+        for col in df.columns:
+            before = df[col]
+            after = optimize_column(before, threshold, timestamp_int)
+
+            optimized[col] = after
+            rows.append((scope, col, str(before.dtype), str(after.dtype),
+                         before.memory_usage(index=False, deep=True), after.memory_usage(index=False, deep=True)))
+
+        if inplace:
+            setattr(lt, scope + '_df', pd.DataFrame(optimized, index=df.index, columns=df.columns))
+
+    columns = ['scope', 'column', 'dtype_before', 'dtype_after', 'bytes_before', 'bytes_after']
+    return pd.DataFrame(rows, columns=columns)
+
+
 def make_xattribute(attr_type, key, value, extension):
+    from opyenxes.factory.XFactory import XFactory
+
     mapping = {
         DISCRETE: XFactory.create_attribute_discrete,
         LITERAL: XFactory.create_attribute_literal,
@@ -93,15 +194,74 @@ def make_xattribute(attr_type, key, value, extension):
     return xattribute
 
 
+# magic bytes at the start of compressed files
+GZIP_MAGIC = b'\x1f\x8b'
+BZ2_MAGIC = b'BZh'
+XZ_MAGIC = b'\xfd7zXZ\x00'
+ZIP_MAGIC = b'PK\x03\x04'
+
+GZIP = 'gzip'
+BZ2 = 'bz2'
+XZ = 'xz'
+ZIP = 'zip'
+
+
+def sniff_compression(fpath):
+    """Find out the compression of a file by its magic bytes rather than its extension
+
+    :param fpath: file path
+    :return: one of gzip, bz2, xz, zip, or None if the file is not compressed
+    """
+    with open(fpath, 'rb') as f:
+        magic = f.read(6)
+
+    if magic.startswith(GZIP_MAGIC):
+        return GZIP
+    elif magic.startswith(BZ2_MAGIC):
+        return BZ2
+    elif magic.startswith(XZ_MAGIC):
+        return XZ
+    elif magic.startswith(ZIP_MAGIC):
+        return ZIP
+
+    return None
+
+
+def open_log_file(fpath):
+    """Open a log file for reading in binary mode. Compressed files are decompressed on the fly
+    as they are read. For zip archives, the first file of the archive is read.
+
+    :param fpath: file path
+    :return: file object
+    """
+    compression = sniff_compression(fpath)
+
+    if compression == GZIP:
+        return gzip.open(fpath, 'rb')
+    elif compression == BZ2:
+        return bz2.open(fpath, 'rb')
+    elif compression == XZ:
+        return lzma.open(fpath, 'rb')
+    elif compression == ZIP:
+        with zipfile.ZipFile(fpath) as archive:
+            names = [name for name in archive.namelist() if not name.endswith('/')]
+            if len(names) == 0:
+                raise ValueError('{} is an empty zip archive!'.format(fpath))
+            # the opened member keeps the archive file open until it is closed
+            return archive.open(names[0])
+
+    return open(fpath, 'rb')
+
+
 def temp_decompress(fpath):
 
     # create temporary file to hold the decompressed file
-    prefix = fpath.split('.')[-2]
+    prefix = os.path.basename(fpath).split('.')[0]
     # get a unique temporary filepath
     temp = tempfile.NamedTemporaryFile(prefix=prefix)
     temp.close()
 
-    with gzip.open(fpath, 'rb') as f_in:
+    with open_log_file(fpath) as f_in:
         with open(temp.name, 'wb') as f_out:
             shutil.copyfileobj(f_in, f_out)
 
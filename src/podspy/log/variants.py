@@ -0,0 +1,152 @@
+#!/usr/bin/env python
+
+"""This is the variants module.
+
+This module contains the VariantLog class, a view of a log table that keeps each distinct sequence of
+activities once together with the number of cases that follow it, so that algorithms that only look at
+the control flow do work in the number of variants instead of the number of events.
+"""
+
+
+__all__ = [
+    'VariantLog'
+]
+
+
+import logging
+import numpy as np
+import pandas as pd
+
+from . import constants as const
+from . import index as log_index
+
+
+logger = logging.getLogger(__file__)
+
+
+class VariantLog:
+    def __init__(self, activities, codes, offsets, frequencies, cases=None, case_variants=None):
+        """Variant compressed log. Variant i has the activity codes codes[offsets[i]:offsets[i + 1]] and
+        occurs frequencies[i] times.
+
+        :param activities: array of activity labels indexed by activity code
+        :param codes: activity codes of the variants concatenated
+        :param offsets: variant offsets in compressed sparse row form
+        :param frequencies: number of cases of each variant
+        :param cases: array of caseids, None if the cases are not known
+        :param case_variants: variant of each case in cases
+        """
+        self.activities = activities
+        self.codes = codes
+        self.offsets = offsets
+        self.frequencies = frequencies
+        self.cases = cases
+        self.case_variants = case_variants
+
+    def __repr__(self):
+        return '{}({} variants, {} cases, {} activities)'.format(
+            self.__class__.__name__, self.n_variants, self.n_cases, len(self.activities))
+
+    @staticmethod
+    def build_from_logtable(logtable, activity_key=None):
+        """Factory method to build a variant log from a log table, with the events of a case in the order
+        of the event dataframe. See :meth:`podspy.log.table.LogTable.get_variant_log` for the cached version.
+
+        :param logtable: log table
+        :param activity_key: activity column, see :meth:`podspy.log.table.LogTable.get_default_activity_key`
+        :return: built variant log
+        """
+        if activity_key is None:
+            activity_key = logtable.get_default_activity_key()
+
+        variants = logtable.get_variants(activity_key)
+        cases = logtable.get_log_index(activity_key, timestamp_key=None).cases
+
+        return VariantLog(variants.activities, variants.codes, variants.offsets, variants.frequencies,
+                          cases, variants.case_variants)
+
+    @staticmethod
+    def build_from_traces(traces, frequencies=None):
+        """Factory method to build a variant log from activity sequences
+
+        :param traces: list of distinct activity sequences
+        :param frequencies: number of cases of each sequence, None if each sequence occurs once
+        :return: built variant log
+        """
+        lengths = [len(trace) for trace in traces]
+        values = [activity for trace in traces for activity in trace]
+        codes, activities = log_index.encode_column(pd.Series(values, dtype=object))
+
+        offsets = np.zeros(len(traces) + 1, dtype=np.int64)
+        np.cumsum(lengths, out=offsets[1:])
+
+        if frequencies is None:
+            frequencies = np.ones(len(traces), dtype=np.int64)
+
+        return VariantLog(activities, codes, offsets, np.asarray(frequencies, dtype=np.int64))
+
+    @property
+    def n_variants(self):
+        return len(self.frequencies)
+
+    @property
+    def n_cases(self):
+        return int(self.frequencies.sum())
+
+    @property
+    def n_events(self):
+        return int((np.diff(self.offsets) * self.frequencies).sum())
+
+    def get_variant(self, variant):
+        """Get the activity codes of a variant
+
+        :param variant: variant number
+        :return: int32 array
+        """
+        return self.codes[self.offsets[variant]:self.offsets[variant + 1]]
+
+    def get_trace(self, variant):
+        """Get the activities of a variant
+
+        :param variant: variant number
+        :return: list of activities
+        """
+        return list(self.activities[self.get_variant(variant)])
+
+    def iter_traces(self):
+        """Iterate over the variants
+
+        :return: generator of (list of activities, frequency)
+        """
+        for variant in range(self.n_variants):
+            yield self.get_trace(variant), int(self.frequencies[variant])
+
+    def get_case_variants(self):
+        """Get the variant of each case
+
+        :return: series of variant numbers indexed by caseid
+        """
+        if self.cases is None:
+            raise ValueError('Variant log does not have cases')
+        return pd.Series(self.case_variants, index=pd.Index(self.cases, name=const.CASEID), name=const.VARIANT)
+
+    def get_directly_follows_counts(self):
+        """Count how often an activity directly follows another one within a case, over all cases
+
+        :return: square int64 array where entry (a, b) is the number of times b directly follows a
+        """
+        return log_index.count_directly_follows(self.codes, self.offsets, len(self.activities),
+                                                weights=self.frequencies)
+
+    def to_frame(self):
+        """Make the variants table with a row per variant with its number, frequency and activities
+
+        :return: dataframe with variant, frequency and trace columns
+        """
+        traces = [tuple(self.get_trace(variant)) for variant in range(self.n_variants)]
+
+        return pd.DataFrame({
+            const.VARIANT: np.arange(self.n_variants),
+            'frequency': self.frequencies,
+            'trace': traces
+        }, columns=[const.VARIANT, 'frequency', 'trace'])
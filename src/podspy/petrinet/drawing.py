@@ -3,7 +3,6 @@
 
 import logging
 import itertools as itrs
-import pygraphviz as pgv
 from podspy import graph, petrinet
 
 
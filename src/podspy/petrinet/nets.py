@@ -11,8 +11,6 @@ from podspy.graph import directed
 from podspy.petrinet.elements import *
 from podspy.petrinet.semantics import Marking
 from podspy.petrinet import factory as fty
-import pandas as pd
-import numpy as np
 import logging
 
 
@@ -287,6 +285,9 @@ class Petrinet(AbstractResetInhibitorNet):
         return Petrinet(self.label)
 
     def get_transition_relation_dfs(self):
+        import pandas as pd
+        import numpy as np
+
         nb_trans = len(self.transitions)
         nb_places = len(self.places)
 
@@ -6,8 +6,6 @@ This module contains classes that relate to the semantics of petri nets.
 """
 
 from abc import ABC, abstractmethod
-import pandas as pd
-import numpy as np
 import itertools as its
 
 from podspy.utils.multiset import SortedMultiSet
@@ -40,6 +38,9 @@ class Marking(SortedMultiSet):
         :return: the state as a series
         :rtype: pandas.Series
         '''
+        import pandas as pd
+        import numpy as np
+
         plabel_list = map(lambda p: p.label, places)
         ss = pd.Series(np.zeros(len(places)), index=plabel_list)
         tplaces, token_cnt = zip(*self.map.items())
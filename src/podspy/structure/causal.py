@@ -14,6 +14,7 @@ import numpy as np
 import pandas as pd
 import logging
 from podspy.log import constants as cnst
+from podspy.log.variants import VariantLog
 
 
 logger = logging.getLogger(__file__)
@@ -34,50 +35,34 @@ class CausalMatrix:
 
     @staticmethod
     def build_from_logtable(logtable, sort=True):
-        """Factory method to build a causal matrix from a log table.
+        """Factory method to build a causal matrix from a log table or a variant log. A variant log counts
+        each variant once weighted by its frequency, so that the work is in the number of variants.
 
-        :param logtable: log table
+        :param logtable: log table or :class:`podspy.log.variants.VariantLog`
         :param sorted: whether to sort the activities
         :return: built causal matrix
         """
-        activity_list = logtable.event_df[cnst.ACTIVITY].unique()
+        if isinstance(logtable, VariantLog):
+            activity_list = logtable.activities
+            source = logtable
+        else:
+            activity_list = logtable.event_df[cnst.ACTIVITY].unique()
+            # events of each case in the order of the event df
+            source = logtable.get_log_index(cnst.ACTIVITY, timestamp_key=None)
 
         if sort:
             activity_list = sorted(activity_list)
 
-        def get_causal_mat(df):
-            to_join = ([np.nan], df[cnst.ACTIVITY].values)
-            shifted_down = np.concatenate(to_join)
-            shifted_df = pd.DataFrame({'shifted_down': shifted_down})
-            # need to reset the index of df so that concatenation align
-            df = pd.concat([df.reset_index(drop=True), shifted_df], axis=1)
-            df = df[[cnst.CASEID, 'shifted_down', cnst.ACTIVITY]]
-            return df
-
-        grouped = logtable.event_df.groupby(cnst.CASEID, as_index=False)
-        grouped = grouped.apply(get_causal_mat)
-        # exclude any NaN rows
-        grouped = grouped.dropna(axis=0, subset=[cnst.ACTIVITY, 'shifted_down'])
-
-        grouped = grouped.groupby(['shifted_down', cnst.ACTIVITY], as_index=False)
-        counts = grouped.agg('count')
-        # give the counts column a good column name
-        counts = counts.rename(columns={cnst.CASEID: 'count'}, index=str)
-        counts = counts[['shifted_down', cnst.ACTIVITY, 'count']]
-
-        zeros = np.zeros((len(activity_list), len(activity_list)))
-        mat = pd.DataFrame(zeros, columns=activity_list, index=activity_list, dtype=np.int)
-
-        for activity in logtable.event_df[cnst.ACTIVITY].unique():
-            cols = counts.loc[counts['shifted_down'] == activity, cnst.ACTIVITY].values
-            vals = counts.loc[counts['shifted_down'] == activity, 'count'].values
-            logger.debug('Setting columns {} related to "{}" row with values {}'.format(cols, activity, vals))
-            mat.loc[activity, cols] = vals
-
-        logger.debug('\n{}'.format(counts))
-        logger.debug('\n{}'.format(mat))
+        # directly follows counts
+        counts = source.get_directly_follows_counts()
+
+        # position of the activities of the index in the activity list
+        positions = pd.Index(activity_list).get_indexer(source.activities)
 
-        mat.reset_index(drop=True, inplace=True)
-        mat.columns = list(range(len(activity_list)))
+        zeros = np.zeros((len(activity_list), len(activity_list)), dtype=np.int64)
+        zeros[np.ix_(positions, positions)] = counts
+        mat = pd.DataFrame(zeros, columns=list(range(len(activity_list))))
+
+        logger.debug('\n{}'.format(mat))
 
         return CausalMatrix(activity_list, mat)
@@ -36,6 +36,18 @@ class FootprintMatrix:
     def __str__(self):
         return '{}'.format(self.matrix)
 
+    @staticmethod
+    def build_from_logtable(logtable, sort=True):
+        """Factory method to build a footprint matrix from a log table or a variant log, see
+        :meth:`podspy.structure.causal.CausalMatrix.build_from_logtable`.
+
+        :param logtable: log table or :class:`podspy.log.variants.VariantLog`
+        :param sort: whether to sort the activities
+        :return: built footprint matrix
+        """
+        cmat = CausalMatrix.build_from_logtable(logtable, sort=sort)
+        return FootprintMatrix.build_from_causal_matrix(cmat)
+
     @staticmethod
     def build_from_causal_matrix(cmat):
         assert isinstance(cmat, CausalMatrix)
@@ -6,7 +6,10 @@ This module contains useful conversion methods
 """
 
 from datetime import datetime, timezone, timedelta
-import logging
+import logging, warnings
+import ciso8601
+import numpy as np
+import pandas as pd
 
 
 logger = logging.getLogger(__file__)
@@ -57,3 +60,128 @@ def parse_timestamp(timestamp):
     except ValueError as e:
         logger.error(e)
         return None
+
+
+# number of timestamps converted at a time by the vectorized parser, which bounds its temporary arrays
+PARSE_CHUNK_SIZE = 1 << 16
+
+
+def parse_iso_timestamps(timestamps):
+    """Vectorized parser of ISO 8601 timestamp strings with an optional Z or +HH:MM offset. The offsets are
+    cut off and applied to the naive timestamps, which numpy parses.
+
+    :param timestamps: sequence of ISO 8601 timestamp strings
+    :return: int64 array of nanoseconds since the epoch in UTC, None if not all timestamps are strings
+        of this form
+    """
+    strs = np.asarray(timestamps)
+
+    if strs.ndim != 1 or strs.dtype.kind != 'U' or strs.shape[0] == 0:
+        return None
+
+    n, width = strs.shape[0], strs.dtype.itemsize // 4
+    # code points of the characters, padded with zeros
+    chars = strs.view(np.uint32).reshape(n, width).copy()
+    lengths = np.count_nonzero(chars, axis=1)
+    rows = np.arange(n)
+
+    def char_at(offset):
+        # character at offset from the end of each timestamp
+        return chars[rows, np.maximum(lengths - offset, 0)]
+
+    def digit_at(offset):
+        return char_at(offset).astype(np.int64) - ord('0')
+
+    is_utc = (char_at(1) == ord('Z')) | (char_at(1) == ord('z'))
+    signs = char_at(6)
+    has_offset = ~is_utc & (char_at(3) == ord(':')) & ((signs == ord('+')) | (signs == ord('-')))
+
+    digits = np.stack([digit_at(offset) for offset in (5, 4, 2, 1)])
+    if ((digits[:, has_offset] < 0) | (digits[:, has_offset] > 9)).any():
+        return None
+
+    offset_minutes = (digits[0] * 10 + digits[1]) * 60 + digits[2] * 10 + digits[3]
+    offset_minutes = np.where(signs == ord('-'), -offset_minutes, offset_minutes)
+    offset_minutes[~has_offset] = 0
+
+    # cut off the offsets
+    core_lengths = lengths - np.where(is_utc, 1, np.where(has_offset, 6, 0))
+    chars[np.arange(width)[np.newaxis, :] >= core_lengths[:, np.newaxis]] = 0
+    cores = chars.view('<U{}'.format(width)).ravel()
+
+    with warnings.catch_warnings():
+        # numpy warns about offsets that are left in the timestamps
+        warnings.simplefilter('error')
+        try:
+            values = cores.astype('datetime64[ns]')
+        except (ValueError, TypeError, Warning):
+            return None
+
+    is_missing = np.isnat(values)
+    values = values.view(np.int64) - offset_minutes * 60 * 10 ** 9
+    values[is_missing] = np.iinfo(np.int64).min
+
+    return values
+
+
+def parse_timestamp_values(timestamps):
+    """Parse timestamps one at a time with ciso8601
+
+    :param timestamps: sequence of ISO 8601 timestamp strings or datetimes, missing values are allowed
+    :return: (datetime64[us] array in UTC, number of invalid timestamps)
+    """
+    parse = ciso8601.parse_datetime
+    utc_values = list()
+    n_invalid = 0
+
+    for timestamp in timestamps:
+        if isinstance(timestamp, str):
+            try:
+                timestamp = parse(timestamp)
+            except ValueError:
+                n_invalid += 1
+                timestamp = None
+        elif pd.isnull(timestamp):
+            timestamp = None
+        elif not isinstance(timestamp, datetime):
+            n_invalid += 1
+            timestamp = None
+
+        if timestamp is not None:
+            offset = timestamp.utcoffset()
+            if offset is not None:
+                timestamp = timestamp.replace(tzinfo=None) - offset
+
+        utc_values.append(timestamp)
+
+    return np.array(utc_values, dtype='datetime64[us]'), n_invalid
+
+
+def parse_timestamps(timestamps):
+    """Batched variant of :func:`parse_timestamp` that converts the timestamps to a datetime column.
+    Chunks of ISO 8601 strings are parsed with vectorized numpy operations, other chunks, e.g., with
+    missing values or datetimes, one timestamp at a time with ciso8601. Timezone offsets are normalized
+    to UTC and timestamps without offset are taken to be in UTC.
+
+    :param timestamps: sequence of ISO 8601 timestamp strings or datetimes, missing values are allowed
+    :return: DatetimeIndex in UTC with NaT for missing or invalid timestamps
+    """
+    timestamps = list(timestamps)
+    values = np.empty(len(timestamps), dtype=np.int64)
+    n_invalid = 0
+
+    for start in range(0, len(timestamps), PARSE_CHUNK_SIZE):
+        chunk = timestamps[start:start + PARSE_CHUNK_SIZE]
+        chunk_values = parse_iso_timestamps(chunk)
+
+        if chunk_values is None:
+            chunk_values, chunk_invalid = parse_timestamp_values(chunk)
+            chunk_values = chunk_values.astype('datetime64[ns]').view(np.int64)
+            n_invalid += chunk_invalid
+
+        values[start:start + len(chunk)] = chunk_values
+
+    if n_invalid > 0:
+        logger.error('Cannot convert {} timestamps'.format(n_invalid))
+
+    return pd.DatetimeIndex(values.view('datetime64[ns]')).tz_localize('UTC')
@@ -12,6 +12,7 @@ import numpy as np
 from podspy.discovery import alpha
 from podspy.petrinet.nets import *
 from podspy.structure import CausalMatrix
+from podspy.log.variants import VariantLog
 from podspy import petrinet
 
 
@@ -89,3 +90,16 @@ class TestAlphaMiner:
 
         assert (p_to_t_df.values == expected_p_to_t_vals).all()
         assert (t_to_p_df.values == expected_t_to_p_vals).all()
+
+    def test_alpha_variant_log(self):
+        traces = [['a', 'c', 'd'], ['b', 'c', 'd'], ['a', 'c', 'e'], ['b', 'c', 'e']]
+        variant_log = VariantLog.build_from_traces(traces, [45, 42, 38, 22])
+        apn = alpha.classic.apply(variant_log)
+
+        net, init_marking, final_markings = apn
+
+        places = {place.label for place in net.places}
+        trans = {tran.label for tran in net.transitions}
+
+        assert places == {'i', 'o', '({a, b}, {c})', '({c}, {d, e})'}
+        assert trans == {'a', 'b', 'c', 'd', 'e'}
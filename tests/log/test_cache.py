@@ -0,0 +1,93 @@
+#!/usr/bin/env python
+
+"""This is the test module for the cache module.
+
+"""
+
+
+import os, pytest
+import pandas as pd
+from pandas.testing import assert_frame_equal
+
+from podspy.log import data_io
+from podspy.log.cache import LogTableCache
+
+
+XES = ('<log xmlns="http://www.xes-standard.org/">'
+       '<string key="concept:name" value="log"/>'
+       '<trace>'
+           '<string key="concept:name" value="0"/>'
+           '<event><string key="concept:name" value="a"/></event>'
+           '<event><string key="concept:name" value="b"/></event>'
+       '</trace>'
+       '</log>')
+
+
+@pytest.fixture
+def log_fp(tmp_path):
+    fp = tmp_path / 'log.xes'
+    fp.write_text(XES)
+    return str(fp)
+
+
+def test_make_key_depends_on_options(log_fp):
+    key = LogTableCache.make_key(log_fp, 'concept:name', {'event': {'a', 'b'}})
+
+    assert key == LogTableCache.make_key(log_fp, 'concept:name', {'event': {'b', 'a'}})
+    assert key != LogTableCache.make_key(log_fp, 'concept:name', None)
+    assert key != LogTableCache.make_key(log_fp, 'org:resource', {'event': {'a', 'b'}})
+
+
+def test_make_key_depends_on_content(log_fp):
+    key = LogTableCache.make_key(log_fp, 'concept:name')
+
+    with open(log_fp, 'w') as f:
+        f.write(XES.replace('value="a"', 'value="c"'))
+
+    assert key != LogTableCache.make_key(log_fp, 'concept:name')
+
+
+def test_import_log_table_with_cache(log_fp, tmp_path):
+    cache_dir = str(tmp_path / 'cache')
+    expected = data_io.import_log_table(log_fp, import_mode=data_io.ImportMode.ALL, cache=cache_dir)
+
+    cache = LogTableCache(cache_dir)
+    assert len(cache.list_entries()) == 1
+
+    lt = data_io.import_log_table(log_fp, import_mode=data_io.ImportMode.ALL, cache=cache)
+
+    assert_frame_equal(lt.trace_df, expected.trace_df)
+    assert_frame_equal(lt.event_df, expected.event_df)
+    assert lt.attributes == expected.attributes == {'concept:name': 'log'}
+    assert len(cache.list_entries()) == 1
+
+
+def test_cache_evicts_least_recently_used(tmp_path):
+    cache = LogTableCache(str(tmp_path))
+    lt = data_io.tble.LogTable(event_df=pd.DataFrame({'a': range(100)}))
+
+    for i, key in enumerate(['k0', 'k1', 'k2']):
+        cache.put(key, lt)
+        # make sure the entries have distinct last used times
+        os.utime(cache.get_entry_path(key), (i, i))
+
+    # use k0 so that k1 becomes the least recently used
+    assert cache.get('k0') is not None
+
+    entry_size = os.path.getsize(cache.get_entry_path('k0'))
+    cache.max_bytes = 2 * entry_size
+    cache.evict()
+
+    assert cache.get('k1') is None
+    assert cache.get('k0') is not None
+    assert cache.get('k2') is not None
+
+
+def test_cache_removes_unreadable_entry(tmp_path):
+    cache = LogTableCache(str(tmp_path))
+
+    with open(cache.get_entry_path('bad'), 'wb') as f:
+        f.write(b'not a pickle')
+
+    assert cache.get('bad') is None
+    assert not os.path.exists(cache.get_entry_path('bad'))
@@ -0,0 +1,180 @@
+#!/usr/bin/env python
+
+"""This is the test module for the columnar module.
+
+"""
+
+
+import numpy as np
+import pandas as pd
+
+from podspy.log.columnar import ColumnarBuilder
+
+
+def test_builder_backfills_missing_values():
+    builder = ColumnarBuilder()
+    builder.add_row({'a': 'x'})
+    builder.add_row({'b': 'y'})
+    builder.add_row({'a': 'z', 'b': 'w'})
+
+    df = builder.to_frame()
+
+    assert len(builder) == 3
+    assert df.columns.tolist() == ['a', 'b']
+    assert df.to_dict(orient='list') == {
+        'a': ['x', np.nan, 'z'],
+        'b': [np.nan, 'y', 'w']
+    }
+
+
+def test_builder_typed_columns():
+    builder = ColumnarBuilder()
+
+    for i in range(3):
+        builder.set('int', i, 'int')
+        builder.set('float', float(i), 'float')
+        builder.set('bool', i % 2 == 0, 'boolean')
+        if i > 0:
+            builder.set('int_missing', i, 'int')
+        builder.end_row()
+
+    df = builder.to_frame()
+
+    assert df['int'].dtype == np.int64
+    assert df['float'].dtype == np.float64
+    assert df['bool'].dtype == np.bool_
+    # missing values turn integers to floats
+    assert df['int_missing'].dtype == np.float64
+    assert np.isnan(df['int_missing'].iloc[0])
+
+
+def test_builder_get_current_row():
+    builder = ColumnarBuilder()
+    builder.set('a', 1)
+
+    assert builder.get('a') == 1
+    assert builder.get('b') is None
+
+    builder.end_row()
+
+    assert builder.get('a') is None
+
+
+def test_builder_to_frame_with_index():
+    builder = ColumnarBuilder()
+    builder.add_row({'a': 1})
+    builder.add_row({'a': 2})
+
+    df = builder.to_frame(index=pd.RangeIndex(10, 12))
+
+    assert df.index.tolist() == [10, 11]
+    assert df['a'].tolist() == [1, 2]
+
+
+def test_builder_categorical_columns():
+    builder = ColumnarBuilder(categorical={'a'})
+    builder.add_row({'a': 'x'})
+    builder.add_row({'b': 1})
+    builder.add_row({'a': 'y'})
+    builder.add_row({'a': 'x'})
+
+    df = builder.to_frame()
+
+    assert df['a'].dtype == 'category'
+    assert df['a'].cat.categories.tolist() == ['x', 'y']
+    assert df['a'].isnull().tolist() == [False, True, False, False]
+    assert df['a'].tolist()[2:] == ['y', 'x']
+
+
+def test_builder_discard_row():
+    builder = ColumnarBuilder()
+    builder.add_row({'a': 'x'})
+    builder.set('a', 'y')
+    builder.set('b', 'z')
+    builder.discard_row()
+    builder.add_row({'a': 'w'})
+
+    df = builder.to_frame()
+
+    # column b only existed in the discarded row
+    assert df.to_dict(orient='list') == {'a': ['x', 'w']}
+
+
+def test_builder_discard_row_nested():
+    builder = ColumnarBuilder()
+    builder.add_nested('0', 'items', None, 'list')
+    builder.end_row()
+    builder.add_nested('0', 'other', None, 'list')
+    builder.discard_row()
+
+    assert builder.nested == [(0, '0', 'items', None, 'list')]
+
+
+def test_builder_dtypes():
+    dtypes = {'i': 'int32', 'f': 'float32', 'b': 'bool', 's': 'category', 'big': 'int8', 'g': 'float32'}
+    builder = ColumnarBuilder(dtypes=dtypes)
+    for i in range(3):
+        builder.set('i', i, 'int')
+        builder.set('f', 0.5 * i, 'float')
+        builder.set('b', i % 2 == 0, 'boolean')
+        builder.set('s', 'x' if i < 2 else 'y', 'string')
+        builder.set('big', 1000 * i, 'int')
+        builder.set('g', 0.1 * i, 'float')
+        builder.end_row()
+
+    df = builder.to_frame()
+
+    assert df['i'].dtype == np.int32
+    assert df['f'].dtype == np.float32
+    assert df['b'].dtype == np.bool_
+    assert df['s'].dtype == 'category'
+    # narrow dtypes are only used if they hold the values
+    assert df['big'].dtype == np.int64
+    assert df['g'].dtype == np.float64
+    assert df['g'].tolist() == [0., 0.1, 0.2]
+
+
+def test_builder_dtypes_missing():
+    builder = ColumnarBuilder(dtypes={'i': 'int32', 'b': 'bool', 's': 'int32'})
+    builder.set('i', 1, 'int')
+    builder.set('b', True, 'boolean')
+    builder.set('s', 'x', 'string')
+    builder.end_row()
+    builder.end_row()
+
+    df = builder.to_frame()
+
+    # integers and booleans with missing values are built by their attribute type
+    assert df['i'].dtype == np.float64
+    assert df['b'].dtype == object
+    assert df['s'].dtype == object
+
+
+def test_builder_mixed_type_columns():
+    builder = ColumnarBuilder()
+    builder.set('x', 1, 'int')
+    builder.set('flag', True, 'boolean')
+    builder.end_row()
+    builder.set('x', 'hello', 'string')
+    builder.set('flag', 'maybe', 'string')
+    builder.end_row()
+
+    df = builder.to_frame()
+
+    assert df['x'].dtype == object
+    assert df['x'].tolist() == [1, 'hello']
+    assert df['flag'].dtype == object
+    assert df['flag'].tolist() == [True, 'maybe']
+
+
+def test_builder_discard_row_categorical():
+    builder = ColumnarBuilder(categorical=['a'])
+    builder.add_row({'a': 'x'})
+    builder.set('a', 'y')
+    builder.discard_row()
+    builder.add_row({'a': 'x'})
+
+    df = builder.to_frame()
+
+    # value of the discarded row is not a category
+    assert df['a'].cat.categories.tolist() == ['x']
@@ -3,13 +3,17 @@
 """This is the test module for the factory module of the log package.
 
 """
-import pytest, os, sys, time
+import pytest, os, sys, time, subprocess
 from opyenxes.utils.XAttributeUtils import XAttributeType as atype
 from opyenxes.factory.XFactory import XFactory
 from opyenxes.data_in.XUniversalParser import XUniversalParser
 import datetime as dt
+import numpy as np
+import pandas as pd
+from opyenxes.classification.XEventAttributeClassifier import XEventAttributeClassifier
 
 from podspy.log import factory as fty
+from podspy.log import table as tble
 
 
 atype_factory_map = {
@@ -76,3 +80,119 @@ class TestXLog2LogTable:
         diff = time.time() - start
         print('Took {} secs to convert'.format(diff))
         print('Size of LogTable: {}b'.format(size))
+
+
+@pytest.fixture
+def small_xlog():
+    xlog = XFactory.create_log()
+    xlog.get_attributes()['concept:name'] = XFactory.create_attribute_literal('concept:name', 'small')
+    xlog.get_global_event_attributes().append(XFactory.create_attribute_literal('concept:name', '__INVALID__'))
+    xlog.get_classifiers().append(XEventAttributeClassifier('Activity', ['concept:name']))
+
+    for i, activities in enumerate([['a', 'b'], ['a', 'c', 'b']]):
+        trace = XFactory.create_trace()
+        trace.get_attributes()['concept:name'] = XFactory.create_attribute_literal('concept:name', 'case{}'.format(i))
+        trace.get_attributes()['priority'] = XFactory.create_attribute_discrete('priority', i)
+
+        items = XFactory.create_attribute_list('items')
+        for j in range(2):
+            item = XFactory.create_attribute_literal('item', 'item{}'.format(j))
+            items.add_to_collection(item)
+            items.get_attributes()['item'] = item
+        trace.get_attributes()['items'] = items
+
+        for j, activity in enumerate(activities):
+            event = XFactory.create_event()
+            event.get_attributes()['concept:name'] = XFactory.create_attribute_literal('concept:name', activity)
+            event.get_attributes()['cost'] = XFactory.create_attribute_continuous('cost', 1.5 * j)
+            event.get_attributes()['time:timestamp'] = XFactory.create_attribute_timestamp(
+                'time:timestamp', dt.datetime(2018, 1, 1, i, j, tzinfo=dt.timezone.utc))
+            trace.append(event)
+
+        xlog.append(trace)
+
+    return xlog
+
+
+class TestXLog2LogTableColumnar:
+    def test_xlog2table(self, small_xlog):
+        lt = fty.LogTableFactory.new_log_table(small_xlog)
+
+        assert lt.trace_df['caseid'].tolist() == ['case0', 'case1']
+        assert lt.trace_df['priority'].dtype == np.int64
+        assert lt.event_df['caseid'].tolist() == ['case0'] * 2 + ['case1'] * 3
+        assert lt.event_df['concept:name'].tolist() == ['a', 'b', 'a', 'c', 'b']
+        assert lt.event_df['cost'].dtype == np.float64
+        assert pd.api.types.is_datetime64_any_dtype(lt.event_df['time:timestamp'])
+
+        assert lt.attributes == {'concept:name': 'small'}
+        assert lt.global_event_attributes == {'concept:name': '__INVALID__'}
+        assert lt.classifiers == {'Activity': ['concept:name']}
+
+        nested = lt.nested_df
+        assert nested.shape[0] == 6
+        assert nested['row'].tolist() == [0, 0, 0, 1, 1, 1]
+        assert nested['path'].tolist() == ['0', '0/0', '0/1'] * 2
+        assert nested['value'].tolist() == [None, 'item0', 'item1'] * 2
+
+    def test_categorical(self, small_xlog):
+        categorical = {'event': ['concept:name']}
+        lt = fty.LogTableFactory.new_log_table(small_xlog, categorical=categorical)
+
+        assert lt.event_df['concept:name'].dtype.name == 'category'
+        assert lt.event_df['concept:name'].tolist() == ['a', 'b', 'a', 'c', 'b']
+
+
+class TestLogTable2XLog:
+    def test_round_trip(self, small_xlog):
+        lt = fty.LogTableFactory.new_log_table(small_xlog)
+        xlog = fty.LogTableFactory.new_xlog(lt)
+
+        assert len(xlog) == len(small_xlog)
+        assert xlog.get_attributes()['concept:name'].get_value() == 'small'
+        assert [clf.name() for clf in xlog.get_classifiers()] == ['Activity']
+        assert [attrib.get_key() for attrib in xlog.get_global_event_attributes()] == ['concept:name']
+
+        for trace, expected_trace in zip(xlog, small_xlog):
+            attribs = trace.get_attributes()
+            expected_attribs = expected_trace.get_attributes()
+            assert attribs['concept:name'].get_value() == expected_attribs['concept:name'].get_value()
+            assert attribs['priority'].get_value() == expected_attribs['priority'].get_value()
+            items = [item.get_value() for item in attribs['items'].get_collection()]
+            assert items == ['item0', 'item1']
+
+            assert len(trace) == len(expected_trace)
+            for event, expected_event in zip(trace, expected_trace):
+                for key in ('concept:name', 'cost', 'time:timestamp'):
+                    assert event.get_attributes()[key].get_value() == expected_event.get_attributes()[key].get_value()
+
+        converted = fty.LogTableFactory.new_log_table(xlog)
+        pd.testing.assert_frame_equal(converted.trace_df, lt.trace_df)
+        pd.testing.assert_frame_equal(converted.event_df, lt.event_df)
+        pd.testing.assert_frame_equal(converted.nested_df, lt.nested_df)
+
+    def test_shared_attributes(self, small_xlog):
+        lt = fty.LogTableFactory.new_log_table(small_xlog)
+        xlog = fty.LogTableFactory.new_xlog(lt)
+
+        # events with the same activity share the attribute object
+        first = xlog[0][0].get_attributes()['concept:name']
+        second = xlog[1][0].get_attributes()['concept:name']
+        assert first is second
+        assert first.get_extension() is not None
+
+    def test_caseid_without_trace_attributes(self):
+        event_df = pd.DataFrame({'caseid': [1, 1, 2], 'concept:name': ['a', 'b', 'a']})
+        lt = tble.LogTable(event_df=event_df)
+        xlog = fty.LogTableFactory.new_xlog(lt)
+
+        assert [trace.get_attributes()['concept:name'].get_value() for trace in xlog] == ['1', '2']
+        assert [len(trace) for trace in xlog] == [2, 1]
+
+
+def test_lazy_opyenxes_import():
+    # a fresh interpreter since opyenxes is already loaded by this module
+    script = 'import sys, podspy.log, podspy.petrinet; print(sorted(m for m in ("opyenxes", "pygraphviz") if m in sys.modules))'
+    env = dict(os.environ, PYTHONPATH=os.pathsep.join(sys.path))
+    output = subprocess.check_output([sys.executable, '-c', script], env=env, universal_newlines=True)
+    assert output.strip() == '[]'
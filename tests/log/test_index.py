@@ -0,0 +1,165 @@
+#!/usr/bin/env python
+
+"""This is the test module for the index module.
+
+"""
+
+
+import pytest
+from datetime import datetime, timedelta, timezone
+import numpy as np
+import pandas as pd
+
+from podspy.log import constants as const
+from podspy.log import index as log_index
+from podspy.log.index import LogIndex, TimestampIndex, TraceVariants
+
+
+@pytest.fixture
+def interleaved_event_df():
+    timestamps = pd.to_datetime([
+        '2018-01-01 00:02', '2018-01-01 00:00', '2018-01-01 00:01',
+        '2018-01-01 00:03', None, '2018-01-01 00:00', '2018-01-01 00:05'
+    ])
+    return pd.DataFrame({
+        const.CASEID: ['1', '0', '1', '0', '1', '1', None],
+        const.ACTIVITY: ['b', 'a', 'c', 'b', 'd', 'a', 'a'],
+        const.TIME_TIMESTAMP: timestamps
+    })
+
+
+def test_log_index_event_order(interleaved_event_df):
+    index = LogIndex(interleaved_event_df)
+
+    assert list(index.cases) == ['1', '0']
+    assert list(index.activities) == ['b', 'a', 'c', 'd']
+    assert index.n_cases == 2
+    # event without caseid is left out
+    assert index.n_events == 6
+    assert list(index.trace_offsets) == [0, 4, 6]
+    assert list(index.order) == [0, 2, 4, 5, 1, 3]
+    assert list(index.get_trace_lengths()) == [4, 2]
+
+
+def test_log_index_timestamp_order(interleaved_event_df):
+    index = LogIndex(interleaved_event_df, timestamp_key=const.TIME_TIMESTAMP)
+
+    # missing timestamp goes last
+    assert list(index.order) == [5, 2, 0, 4, 1, 3]
+    activities = index.activities[index.get_trace(0)]
+    assert list(activities) == ['a', 'c', 'b', 'd']
+    activities = index.activities[index.get_trace(1)]
+    assert list(activities) == ['a', 'b']
+
+
+def test_log_index_directly_follows_counts(interleaved_event_df):
+    index = LogIndex(interleaved_event_df, timestamp_key=const.TIME_TIMESTAMP)
+    counts = index.get_directly_follows_counts()
+
+    # activities are b, a, c, d and traces are <a, c, b, d> and <a, b>
+    expected = np.array([
+        [0, 0, 0, 1],
+        [1, 0, 1, 0],
+        [1, 0, 0, 0],
+        [0, 0, 0, 0]
+    ])
+
+    assert (counts == expected).all()
+
+
+def test_log_index_missing_columns_raises_value_error(interleaved_event_df):
+    with pytest.raises(ValueError):
+        LogIndex(interleaved_event_df.drop(columns=[const.CASEID]))
+
+    with pytest.raises(ValueError):
+        LogIndex(interleaved_event_df, activity_key='missing')
+
+
+@pytest.fixture
+def variant_event_df():
+    return pd.DataFrame({
+        const.CASEID: ['0', '0', '1', '1', '1', '2', '2', '3'],
+        const.ACTIVITY: ['a', 'b', 'a', 'b', 'c', 'a', 'b', 'c']
+    })
+
+
+def test_trace_variants(variant_event_df):
+    variants = TraceVariants(LogIndex(variant_event_df))
+
+    assert variants.n_variants == 3
+    assert variants.n_cases == 4
+    assert list(variants.case_variants) == [0, 1, 0, 2]
+    assert list(variants.frequencies) == [2, 1, 1]
+    assert list(variants.offsets) == [0, 2, 5, 6]
+    assert list(variants.activities[variants.get_variant(1)]) == ['a', 'b', 'c']
+
+    variant_df = variants.to_frame()
+    assert list(variant_df['frequency']) == [2, 1, 1]
+    assert list(variant_df['trace']) == [(0, 1), (0, 1, 2), (2,)]
+
+
+def test_trace_variants_hash_collision(variant_event_df, monkeypatch):
+    # all traces get the same hash
+    monkeypatch.setattr(log_index, 'hash_traces', lambda codes, offsets: np.zeros(len(offsets) - 1, dtype=np.uint64))
+    variants = TraceVariants(LogIndex(variant_event_df))
+
+    assert list(variants.case_variants) == [0, 1, 0, 2]
+    assert list(variants.frequencies) == [2, 1, 1]
+
+
+def test_hash_traces_is_order_sensitive():
+    codes = np.array([0, 1, 1, 0, 0, 1, 0], dtype=np.int32)
+    offsets = np.array([0, 2, 4, 6, 7])
+    hashes = log_index.hash_traces(codes, offsets)
+
+    assert hashes.dtype == np.uint64
+    assert hashes[0] != hashes[1]
+    assert hashes[0] == hashes[2]
+    assert len(set(hashes)) == 3
+
+
+def test_log_index_activity_positions(interleaved_event_df):
+    index = LogIndex(interleaved_event_df)
+
+    postings, offsets = index.get_activity_postings()
+    # activities are b, a, c, d
+    assert list(offsets) == [0, 2, 5, 6, 7]
+    assert list(postings[offsets[1]:offsets[2]]) == [1, 5, 6]
+
+    assert list(index.get_activity_positions(['a', 'c', 'x'])) == [1, 2, 5, 6]
+    assert list(index.get_case_positions(index.get_case_codes(['0', 'x']))) == [1, 3]
+    # repeated activities and cases select their events once
+    assert list(index.get_activity_positions(['a', 'a', 'c'])) == [1, 2, 5, 6]
+    assert list(index.get_case_positions(index.get_case_codes(['0', '0']))) == [1, 3]
+
+
+def test_timestamp_index(interleaved_event_df):
+    index = TimestampIndex(interleaved_event_df[const.TIME_TIMESTAMP])
+
+    assert list(index.get_positions()) == [0, 1, 2, 3, 5, 6]
+    assert list(index.get_positions('2018-01-01 00:01', '2018-01-01 00:03')) == [0, 2, 3]
+    assert list(index.get_positions(end='2018-01-01 00:00')) == [1, 5]
+    assert len(index.get_positions(start='2019-01-01')) == 0
+
+
+def test_indexes_with_object_timestamps():
+    # timestamps with different utc offsets and python datetimes stay an object column
+    timestamps = pd.Series([
+        pd.Timestamp('2018-01-01 10:00', tz='Europe/Amsterdam'),
+        pd.Timestamp('2018-01-01 08:30', tz='UTC'),
+        datetime(2018, 1, 1, 4, 0, tzinfo=timezone(timedelta(hours=-5))),
+        None
+    ], dtype=object)
+    event_df = pd.DataFrame({
+        const.CASEID: ['0', '0', '0', '0'],
+        const.ACTIVITY: ['a', 'b', 'c', 'd'],
+        const.TIME_TIMESTAMP: timestamps
+    })
+
+    index = LogIndex(event_df, timestamp_key=const.TIME_TIMESTAMP)
+    # 09:00, 08:30 and 09:00 UTC, missing timestamp goes last
+    assert list(index.order) == [1, 0, 2, 3]
+
+    index = TimestampIndex(event_df[const.TIME_TIMESTAMP])
+    assert list(index.get_positions()) == [0, 1, 2]
+    assert list(index.get_positions('2018-01-01 09:00Z', None)) == [0, 2]
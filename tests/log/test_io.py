@@ -10,9 +10,11 @@ import pytest, time, os, sys
 from datetime import datetime, timedelta, timezone
 from urllib.request import urlparse
 import numpy as np
+import pandas as pd
 from lxml import etree
+from pandas.testing import assert_frame_equal
 
-from podspy.log import constants, data_io
+from podspy.log import constants, data_io, sampling
 from podspy.log import table as tble
 
 
@@ -218,7 +220,7 @@ def test_parse_log_xml(xlog_xml):
     attribs = lt.attributes
 
     trace_df = lt.trace_df
-    trace_df_dict = trace_df.to_dict(orient='list')
+    trace_df_dict = trace_df.drop(columns=constants.CASEID).to_dict(orient='list')
 
     event_df = lt.event_df
     event_df_dict = event_df.to_dict(orient='list')
@@ -272,3 +274,733 @@ def test_time_parse_BPIC2018():
     log_file = os.path.join('.', 'tests', 'testdata', 'BPIC2018.xes.gz')
     lt = data_io.import_log_table(log_file)
     print('Log table is {}b'.format(sys.getsizeof(lt)))
+
+
+@pytest.fixture
+def xlog_fp(xlog_xml, tmp_path):
+    fp = tmp_path / 'log.xes'
+    fp.write_text(xlog_xml[0])
+    return str(fp)
+
+
+def test_import_log_table(xlog_fp, xlog_xml):
+    lt = data_io.import_log_table(xlog_fp, import_mode=data_io.ImportMode.ALL)
+
+    assert isinstance(lt, tble.LogTable)
+
+    expected_extensions = xlog_xml[1][1]
+    expected_attribs = xlog_xml[1][3]
+    expected_trace_df_dict = xlog_xml[1][6]
+    expected_event_df_dict = xlog_xml[1][7]
+
+    trace_df_dict = lt.trace_df.drop(columns=constants.CASEID).to_dict(orient='list')
+
+    assert lt.extensions == expected_extensions
+    assert lt.attributes == expected_attribs
+    assert trace_df_dict == expected_trace_df_dict
+    assert lt.event_df.to_dict(orient='list') == expected_event_df_dict
+
+
+def test_iter_log_table(xlog_fp, xlog_xml):
+    chunks = list(data_io.iter_log_table(xlog_fp, import_mode=data_io.ImportMode.ALL, chunk_traces=1))
+
+    assert len(chunks) == 2
+
+    for lt in chunks:
+        assert isinstance(lt, tble.LogTable)
+        assert lt.attributes == xlog_xml[1][3]
+        assert lt.trace_df.shape[0] == 1
+
+    assert chunks[0].event_df[constants.CASEID].unique().tolist() == ['173694']
+    assert chunks[1].event_df[constants.CASEID].unique().tolist() == ['173697']
+
+    # chunks are indexed by their position in the whole log
+    assert chunks[1].trace_df.index.tolist() == [1]
+    assert chunks[1].event_df.index.tolist() == [3, 4]
+
+
+def test_iter_log_table_invalid_chunk_size(xlog_fp):
+    with pytest.raises(ValueError):
+        list(data_io.iter_log_table(xlog_fp, chunk_traces=0))
+
+
+def test_import_log_table_typed_columns(tmp_path):
+    xml = ('<log xmlns="http://www.xes-standard.org/">'
+           '<trace>'
+               '<string key="concept:name" value="0"/>'
+               '<event>'
+                   '<string key="concept:name" value="a"/>'
+                   '<date key="time:timestamp" value="2011-10-01T08:10:30.287+02:00"/>'
+                   '<int key="count" value="1"/>'
+                   '<float key="cost" value="1.5"/>'
+                   '<boolean key="done" value="true"/>'
+               '</event>'
+               '<event>'
+                   '<string key="concept:name" value="b"/>'
+                   '<int key="count" value="2"/>'
+                   '<float key="cost" value="2.5"/>'
+                   '<boolean key="done" value="false"/>'
+               '</event>'
+           '</trace>'
+           '</log>')
+    fp = tmp_path / 'typed.xes'
+    fp.write_text(xml)
+
+    lt = data_io.import_log_table(str(fp), import_mode=data_io.ImportMode.ALL)
+    event_df = lt.event_df
+
+    assert event_df['count'].dtype == np.int64
+    assert event_df['cost'].dtype == np.float64
+    assert event_df['done'].dtype == np.bool_
+    assert str(event_df['time:timestamp'].dtype) == 'datetime64[ns, UTC]'
+    assert event_df['time:timestamp'].notnull().tolist() == [True, False]
+    assert event_df[constants.CASEID].tolist() == ['0', '0']
+
+
+def test_scan_trace_offsets(xlog_fp, xlog_xml):
+    offsets, end = data_io.scan_trace_offsets(xlog_fp)
+    content = xlog_xml[0].encode()
+
+    assert len(offsets) == 2
+    assert all(content[offset:offset + 7] == b'<trace>' for offset in offsets)
+    assert content[end:] == b'</log>'
+
+
+def test_partition_trace_offsets():
+    offsets = [10, 20, 30, 40, 50]
+    ranges = data_io.partition_trace_offsets(offsets, 60, 2)
+
+    assert ranges == [(0, 10, 40), (3, 40, 60)]
+
+    # cannot have more partitions than traces
+    assert len(data_io.partition_trace_offsets(offsets, 60, 10)) == 5
+
+
+def test_import_log_table_parallel(xlog_fp):
+    expected = data_io.import_log_table(xlog_fp, import_mode=data_io.ImportMode.ALL)
+    lt = data_io.import_log_table(xlog_fp, import_mode=data_io.ImportMode.ALL, workers=2)
+
+    assert_frame_equal(lt.trace_df, expected.trace_df)
+    assert_frame_equal(lt.event_df, expected.event_df)
+    assert lt.attributes == expected.attributes
+    assert lt.classifiers == expected.classifiers
+    assert lt.global_event_attributes == expected.global_event_attributes
+
+
+@pytest.mark.parametrize('compression', ['gzip', 'bz2', 'xz', 'zip'])
+def test_import_compressed_log_table(xlog_fp, compression, tmp_path):
+    import gzip, bz2, lzma, zipfile
+
+    with open(xlog_fp, 'rb') as f:
+        content = f.read()
+
+    # no telling extension so that the compression has to be sniffed
+    fp = str(tmp_path / 'log.compressed')
+
+    if compression == 'zip':
+        with zipfile.ZipFile(fp, 'w', compression=zipfile.ZIP_DEFLATED) as archive:
+            archive.writestr('log.xes', content)
+    else:
+        opener = { 'gzip': gzip.open, 'bz2': bz2.open, 'xz': lzma.open }[compression]
+        with opener(fp, 'wb') as f:
+            f.write(content)
+
+    expected = data_io.import_log_table(xlog_fp, import_mode=data_io.ImportMode.ALL)
+    lt = data_io.import_log_table(fp, import_mode=data_io.ImportMode.ALL)
+
+    assert_frame_equal(lt.trace_df, expected.trace_df)
+    assert_frame_equal(lt.event_df, expected.event_df)
+    assert lt.attributes == expected.attributes
+
+
+def test_import_log_table_categorical(xlog_fp, xlog_xml):
+    categorical = {'event': {'concept:name', 'lifecycle:transition'}, 'trace': {'concept:name'}}
+    lt = data_io.import_log_table(xlog_fp, import_mode=data_io.ImportMode.ALL, categorical=categorical)
+
+    event_df = lt.event_df
+
+    assert event_df['concept:name'].dtype == 'category'
+    assert event_df['lifecycle:transition'].dtype == 'category'
+    assert lt.trace_df['concept:name'].dtype == 'category'
+    # caseids are decoded from the categorical trace column
+    assert event_df[constants.CASEID].tolist() == xlog_xml[1][7][constants.CASEID]
+    assert event_df['concept:name'].tolist() == xlog_xml[1][7]['concept:name']
+    assert event_df['lifecycle:transition'].isnull().tolist() == [False, True, True, False, True]
+
+
+def test_import_log_table_parallel_categorical(xlog_fp):
+    categorical = {'event': {'concept:name', 'lifecycle:transition'}}
+    expected = data_io.import_log_table(xlog_fp, categorical=categorical)
+    lt = data_io.import_log_table(xlog_fp, categorical=categorical, workers=2)
+
+    assert lt.event_df['concept:name'].dtype == 'category'
+    assert lt.event_df['concept:name'].tolist() == expected.event_df['concept:name'].tolist()
+
+
+def large_amount_requested(attribs):
+    return int(attribs.get('AMOUNT_REQ', 0)) > 10000
+
+
+def is_complete(attribs):
+    return attribs.get('lifecycle:transition', None) == 'COMPLETE'
+
+
+def test_import_log_table_trace_filter(xlog_fp):
+    # AMOUNT_REQ is not imported in basic mode but can still be filtered on
+    lt = data_io.import_log_table(xlog_fp, trace_filter=large_amount_requested)
+
+    assert lt.trace_df[constants.CASEID].tolist() == ['173697']
+    assert lt.trace_df.index.tolist() == [0]
+    assert 'AMOUNT_REQ' not in lt.trace_df.columns
+    assert lt.event_df[constants.CASEID].tolist() == ['173697', '173697']
+    assert lt.event_df.index.tolist() == [0, 1]
+
+
+def test_import_log_table_event_filter(xlog_fp):
+    lt = data_io.import_log_table(xlog_fp, event_filter=is_complete)
+
+    assert lt.trace_df.shape[0] == 2
+    assert lt.event_df[constants.CASEID].tolist() == ['173694', '173697']
+    assert lt.event_df['concept:name'].tolist() == ['A_SUBMITTED', 'A_SUBMITTED']
+
+
+def test_import_log_table_parallel_filters(xlog_fp):
+    expected = data_io.import_log_table(xlog_fp, trace_filter=large_amount_requested, event_filter=is_complete)
+    lt = data_io.import_log_table(xlog_fp, trace_filter=large_amount_requested, event_filter=is_complete,
+                                  workers=2)
+
+    assert_frame_equal(lt.trace_df, expected.trace_df)
+    assert_frame_equal(lt.event_df, expected.event_df)
+
+
+@pytest.fixture
+def sample_log_fp(tmp_path):
+    traces = list()
+    for i in range(10):
+        # only the last trace has the priority attribute
+        priority = '<int key="priority" value="1"/>' if i == 9 else ''
+        traces.append('<trace>'
+                          '<string key="concept:name" value="{0}"/>{1}'
+                          '<event><string key="concept:name" value="a{0}"/></event>'
+                          '<event><string key="concept:name" value="b{0}"/></event>'
+                      '</trace>'.format(i, priority))
+    xml = '<log xmlns="http://www.xes-standard.org/">{}</log>'.format(''.join(traces))
+
+    fp = tmp_path / 'sample.xes'
+    fp.write_text(xml)
+    return str(fp)
+
+
+def test_import_log_table_head_sample(sample_log_fp):
+    lt = data_io.import_log_table(sample_log_fp, sampler=sampling.HeadSampler(3))
+
+    assert lt.trace_df[constants.CASEID].tolist() == ['0', '1', '2']
+    assert lt.event_df['concept:name'].tolist() == ['a0', 'b0', 'a1', 'b1', 'a2', 'b2']
+    assert lt.event_df.index.tolist() == list(range(6))
+
+
+def test_import_log_table_stride_sample(sample_log_fp):
+    lt = data_io.import_log_table(sample_log_fp, import_mode=data_io.ImportMode.ALL,
+                                  sampler=sampling.StrideSampler(4, start=1))
+
+    assert lt.trace_df[constants.CASEID].tolist() == ['1', '5', '9']
+    assert lt.event_df[constants.CASEID].tolist() == ['1', '1', '5', '5', '9', '9']
+    assert lt.trace_df['priority'].isnull().tolist() == [True, True, False]
+
+
+def test_import_log_table_reservoir_sample(sample_log_fp):
+    lt = data_io.import_log_table(sample_log_fp, import_mode=data_io.ImportMode.ALL,
+                                  sampler=sampling.ReservoirSampler(4, seed=1))
+    caseids = lt.trace_df[constants.CASEID].tolist()
+
+    assert len(caseids) == 4
+    # selected traces keep the order of the log
+    assert caseids == sorted(caseids, key=int)
+    assert lt.event_df[constants.CASEID].tolist() == [caseid for caseid in caseids for _ in range(2)]
+    # columns of traces that are not selected are not created
+    assert ('priority' in lt.trace_df.columns) == ('9' in caseids)
+
+    # same seed gives the same sample
+    again = data_io.import_log_table(sample_log_fp, import_mode=data_io.ImportMode.ALL,
+                                     sampler=sampling.ReservoirSampler(4, seed=1))
+    assert again.trace_df[constants.CASEID].tolist() == caseids
+
+
+def test_iter_log_table_reservoir_sample(sample_log_fp):
+    chunks = list(data_io.iter_log_table(sample_log_fp, chunk_traces=3,
+                                         sampler=sampling.ReservoirSampler(5)))
+
+    assert [lt.trace_df.shape[0] for lt in chunks] == [3, 2]
+    assert chunks[1].trace_df.index.tolist() == [3, 4]
+
+
+def test_import_log_table_hash_sample(sample_log_fp):
+    sampler = sampling.HashSampler(0.5, seed=3)
+    lt = data_io.import_log_table(sample_log_fp, sampler=sampler)
+    expected = [str(i) for i in range(10) if sampler.select(i, str(i))]
+
+    assert lt.trace_df[constants.CASEID].tolist() == expected
+
+    parallel = data_io.import_log_table(sample_log_fp, sampler=sampler, workers=2)
+
+    assert_frame_equal(parallel.trace_df, lt.trace_df)
+    assert_frame_equal(parallel.event_df, lt.event_df)
+
+
+@pytest.mark.parametrize('compress', [None, 'gzip'])
+def test_export_log_table_round_trip(xlog_fp, compress, tmp_path):
+    lt = data_io.import_log_table(xlog_fp, import_mode=data_io.ImportMode.ALL)
+
+    fp = str(tmp_path / 'exported.xes')
+    data_io.export_log_table(lt, fp, compress=compress)
+    exported = data_io.import_log_table(fp, import_mode=data_io.ImportMode.ALL)
+
+    assert_frame_equal(exported.trace_df, lt.trace_df)
+    assert_frame_equal(exported.event_df, lt.event_df)
+    assert exported.attributes == lt.attributes
+    assert exported.extensions == lt.extensions
+    assert exported.classifiers == lt.classifiers
+    assert exported.global_trace_attributes == lt.global_trace_attributes
+    assert exported.global_event_attributes == lt.global_event_attributes
+    assert exported.xes_attributes == lt.xes_attributes
+
+
+def test_export_log_table_types(tmp_path):
+    trace_df = pd.DataFrame({constants.CASEID: ['1', '0']})
+    event_df = pd.DataFrame({
+        constants.CASEID: ['0', '1', '0'],
+        'concept:name': pd.Categorical(['a', 'b', 'c']),
+        'count': [1, 2, 3],
+        'cost': [1.5, np.nan, 2.],
+        'done': [True, False, True],
+        'time:timestamp': pd.to_datetime(['2011-10-01T08:10:30.287+02:00', None,
+                                          '2011-10-01T09:00:00.000+02:00'], utc=True)
+    })
+    lt = tble.LogTable(trace_df=trace_df, event_df=event_df)
+
+    fp = str(tmp_path / 'exported.xes')
+    data_io.export_log_table(lt, fp)
+
+    root = etree.parse(fp).getroot()
+    traces = root.findall('{*}trace')
+    # caseid is written as concept:name and events follow the trace order
+    assert [trace.find('{*}string').get('value') for trace in traces] == ['1', '0']
+    assert [len(trace.findall('{*}event')) for trace in traces] == [1, 2]
+
+    event = traces[1].find('{*}event')
+    assert [(etree.QName(child).localname, child.get('key'), child.get('value')) for child in event] == [
+        ('string', 'concept:name', 'a'),
+        ('int', 'count', '1'),
+        ('float', 'cost', '1.5'),
+        ('boolean', 'done', 'true'),
+        ('date', 'time:timestamp', '2011-10-01T06:10:30.287+00:00')
+    ]
+    # missing values are not written
+    assert len(traces[0].find('{*}event')) == 3
+
+
+def test_export_log_table_nullable_types(tmp_path):
+    event_df = pd.DataFrame({
+        constants.CASEID: ['0', '0', '0'],
+        'count': pd.array([1, None, 3], dtype='Int64'),
+        'done': pd.array([True, None, False], dtype='boolean'),
+        'cost': pd.array([None, 2.5, 1.], dtype='Float64')
+    })
+    lt = tble.LogTable(trace_df=pd.DataFrame({constants.CASEID: ['0']}), event_df=event_df)
+
+    fp = str(tmp_path / 'exported.xes')
+    data_io.export_log_table(lt, fp)
+
+    events = etree.parse(fp).getroot().find('{*}trace').findall('{*}event')
+    attributes = [[(etree.QName(child).localname, child.get('key'), child.get('value')) for child in event]
+                  for event in events]
+    # missing values are not written
+    assert attributes == [
+        [('int', 'count', '1'), ('boolean', 'done', 'true')],
+        [('float', 'cost', '2.5')],
+        [('int', 'count', '3'), ('boolean', 'done', 'false'), ('float', 'cost', '1.0')]
+    ]
+
+
+def test_export_log_table_invalid_compression(tmp_path):
+    with pytest.raises(ValueError):
+        data_io.export_log_table(tble.LogTable(), str(tmp_path / 'exported.xes'), compress='rar')
+
+
+@pytest.mark.parametrize('import_mode', [data_io.ImportMode.ALL, data_io.ImportMode.BASIC])
+def test_import_log_table_target_engine(xlog_fp, import_mode):
+    expected = data_io.import_log_table(xlog_fp, import_mode=import_mode)
+    lt = data_io.import_log_table(xlog_fp, import_mode=import_mode, engine='target')
+
+    assert_frame_equal(lt.trace_df, expected.trace_df)
+    assert_frame_equal(lt.event_df, expected.event_df)
+    assert lt.attributes == expected.attributes
+    assert lt.classifiers == expected.classifiers
+    assert lt.extensions == expected.extensions
+    assert lt.global_trace_attributes == expected.global_trace_attributes
+    assert lt.global_event_attributes == expected.global_event_attributes
+    assert lt.xes_attributes == expected.xes_attributes
+
+
+def test_import_log_table_target_engine_caseid_after_events(tmp_path):
+    xml = ('<log xmlns="http://www.xes-standard.org/">'
+           '<trace>'
+               '<event><string key="concept:name" value="a"/></event>'
+               '<list key="nested"><string key="concept:name" value="ignored"/></list>'
+               '<string key="concept:name" value="late">'
+                   '<string key="meta" value="ignored"/>'
+               '</string>'
+           '</trace>'
+           '<trace><event><string key="concept:name" value="b"/></event></trace>'
+           '<string key="after" value="traces"/>'
+           '</log>')
+    fp = tmp_path / 'late.xes'
+    fp.write_text(xml)
+
+    categorical = {'event': {constants.CASEID}}
+    expected = data_io.import_log_table(str(fp), import_mode=data_io.ImportMode.ALL, categorical=categorical)
+    lt = data_io.import_log_table(str(fp), import_mode=data_io.ImportMode.ALL, categorical=categorical,
+                                  engine='target')
+
+    assert_frame_equal(lt.trace_df, expected.trace_df)
+    assert_frame_equal(lt.event_df, expected.event_df)
+    assert lt.event_df[constants.CASEID].tolist() == ['late', 1]
+    assert lt.attributes == {'after': 'traces'}
+
+
+def test_import_log_table_target_engine_invalid_options(xlog_fp):
+    with pytest.raises(ValueError):
+        data_io.import_log_table(xlog_fp, engine='sax')
+
+    with pytest.raises(ValueError):
+        data_io.import_log_table(xlog_fp, engine='target', workers=2)
+
+
+def test_parse_classifier_keys():
+    assert data_io.parse_classifier_keys('concept:name lifecycle:transition', []) == [
+        'concept:name', 'lifecycle:transition']
+    assert data_io.parse_classifier_keys('org:resource', []) == ['org:resource']
+    assert data_io.parse_classifier_keys('', []) == []
+    # keys with spaces are recognized from the known keys or quotes
+    assert data_io.parse_classifier_keys('a b c', ['a b']) == ['a b', 'c']
+    assert data_io.parse_classifier_keys("'a b' c", []) == ['a b', 'c']
+
+
+@pytest.fixture
+def nested_log_fp(tmp_path):
+    xml = ('<log xmlns="http://www.xes-standard.org/">'
+           '<list key="log_list"/>'
+           '<trace>'
+               '<string key="concept:name" value="0"/>'
+               '<container key="customer"><string key="name" value="ann"/><int key="age" value="30"/></container>'
+               '<event>'
+                   '<string key="concept:name" value="a"/>'
+                   '<list key="items">'
+                       '<values>'
+                           '<string key="item" value="x"/>'
+                           '<list key="item"><values><int key="n" value="1"/></values></list>'
+                       '</values>'
+                   '</list>'
+               '</event>'
+               '<event><string key="concept:name" value="b"/></event>'
+           '</trace>'
+           '<trace>'
+               '<string key="concept:name" value="1"/>'
+               '<event>'
+                   '<string key="concept:name" value="c"/>'
+                   '<list key="items"><string key="item" value="y"/></list>'
+               '</event>'
+           '</trace>'
+           '</log>')
+    fp = tmp_path / 'nested.xes'
+    fp.write_text(xml)
+    return str(fp)
+
+
+@pytest.mark.parametrize('engine', ['iterparse', 'target'])
+def test_import_log_table_nested(nested_log_fp, engine):
+    lt = data_io.import_log_table(nested_log_fp, import_mode=data_io.ImportMode.ALL, engine=engine)
+    nested_df = lt.nested_df
+
+    assert nested_df.columns.tolist() == constants.NESTED_COLUMNS
+    assert nested_df.drop(columns=constants.SCOPE).values.tolist() == [
+        [0, '0', 'customer', None, 'container'],
+        [0, '0/0', 'name', 'ann', 'string'],
+        [0, '0/1', 'age', '30', 'int'],
+        [0, '0', 'items', None, 'list'],
+        [0, '0/0', 'item', 'x', 'string'],
+        [0, '0/1', 'item', None, 'list'],
+        [0, '0/1/0', 'n', '1', 'int'],
+        [2, '0', 'items', None, 'list'],
+        [2, '0/0', 'item', 'y', 'string']
+    ]
+    assert nested_df[constants.SCOPE].tolist() == ['trace'] * 3 + ['event'] * 6
+    # nested attributes are not columns of the main tables
+    assert 'items' not in lt.event_df.columns
+    assert 'customer' not in lt.trace_df.columns
+
+
+@pytest.mark.parametrize('engine', ['iterparse', 'target'])
+def test_import_log_table_mixed_type_attributes(tmp_path, engine):
+    xml = ('<log xmlns="http://www.xes-standard.org/">'
+           '<trace>'
+               '<string key="concept:name" value="0"/>'
+               '<event><int key="x" value="1"/><boolean key="flag" value="true"/></event>'
+               '<event><string key="x" value="hello"/><string key="flag" value="maybe"/></event>'
+           '</trace>'
+           '</log>')
+    fp = tmp_path / 'mixed.xes'
+    fp.write_text(xml)
+
+    lt = data_io.import_log_table(str(fp), import_mode=data_io.ImportMode.ALL, engine=engine)
+
+    assert lt.event_df['x'].tolist() == [1, 'hello']
+    assert lt.event_df['flag'].tolist() == [True, 'maybe']
+
+
+def starts_with_c(attribs):
+    return attribs['concept:name'] == 'c'
+
+
+def test_import_log_table_filtered_categories(nested_log_fp):
+    categorical = {'trace': {constants.CONCEPT_NAME}, 'event': {constants.CONCEPT_NAME}}
+    lt = data_io.import_log_table(nested_log_fp, categorical=categorical, event_filter=starts_with_c,
+                                  trace_filter=lambda attribs: attribs['concept:name'] == '1')
+
+    # values of the rejected traces and events are not categories
+    assert lt.event_df[constants.CONCEPT_NAME].cat.categories.tolist() == ['c']
+    assert lt.trace_df[constants.CONCEPT_NAME].cat.categories.tolist() == ['1']
+
+
+def test_import_log_table_nested_filtered(nested_log_fp):
+    lt = data_io.import_log_table(nested_log_fp, import_mode=data_io.ImportMode.ALL, event_filter=starts_with_c)
+    nested_df = lt.nested_df[lt.nested_df[constants.SCOPE] == 'event']
+
+    assert nested_df[constants.ROW].tolist() == [0, 0]
+    assert nested_df[constants.VALUE].tolist() == [None, 'y']
+
+    head = data_io.import_log_table(nested_log_fp, import_mode=data_io.ImportMode.ALL,
+                                    sampler=sampling.StrideSampler(2, start=1))
+
+    assert head.nested_df[constants.ROW].tolist() == [0, 0]
+
+
+def test_import_log_table_nested_parallel(nested_log_fp):
+    expected = data_io.import_log_table(nested_log_fp, import_mode=data_io.ImportMode.ALL)
+    lt = data_io.import_log_table(nested_log_fp, import_mode=data_io.ImportMode.ALL, workers=2)
+
+    assert_frame_equal(lt.nested_df, expected.nested_df)
+
+
+def test_export_log_table_nested(nested_log_fp, tmp_path):
+    lt = data_io.import_log_table(nested_log_fp, import_mode=data_io.ImportMode.ALL)
+
+    fp = str(tmp_path / 'exported.xes')
+    data_io.export_log_table(lt, fp)
+    exported = data_io.import_log_table(fp, import_mode=data_io.ImportMode.ALL)
+
+    assert_frame_equal(exported.event_df, lt.event_df)
+    assert_frame_equal(exported.nested_df, lt.nested_df)
+
+
+@pytest.fixture
+def log_dir(xlog_xml, tmp_path):
+    log_dir = tmp_path / 'logs'
+    log_dir.mkdir()
+    (log_dir / 'a.xes').write_text(xlog_xml[0])
+    (log_dir / 'b.xes').write_text(xlog_xml[0])
+    (log_dir / 'c.xes').write_text('<log><trace>')
+    (log_dir / 'notes.txt').write_text('not a log')
+    return str(log_dir)
+
+
+@pytest.mark.parametrize('workers', [None, 2])
+def test_import_log_tables(log_dir, workers):
+    lts, report = data_io.import_log_tables(log_dir, workers=workers, import_mode=data_io.ImportMode.ALL)
+
+    assert [os.path.basename(fp) for fp in report['path']] == ['a.xes', 'b.xes', 'c.xes']
+    assert report['traces'].tolist() == [2, 2, 0]
+    assert report['events'].tolist() == [5, 5, 0]
+    assert report['error'].isnull().tolist() == [True, True, False]
+    assert (report['seconds'] >= 0).all()
+
+    assert lts[2] is None
+    assert_frame_equal(lts[0].event_df, lts[1].event_df)
+
+
+@pytest.mark.parametrize('workers', [None, 2])
+def test_iter_log_tables(log_dir, workers):
+    results = data_io.iter_log_tables(log_dir, workers=workers)
+
+    lt, report = next(results)
+    assert os.path.basename(report['path']) == 'a.xes'
+    assert lt.trace_df.shape[0] == report['traces'] == 2
+
+    rest = list(results)
+    assert [os.path.basename(report['path']) for _, report in rest] == ['b.xes', 'c.xes']
+    assert rest[1][0] is None
+    assert rest[1][1]['error'] is not None
+
+
+def test_import_log_tables_merge(log_dir):
+    lt, report = data_io.import_log_tables(log_dir, merge=True)
+    paths = report['path'].tolist()
+
+    assert lt.trace_df[constants.CASEID].tolist() == ['0:173694', '0:173697', '1:173694', '1:173697']
+    assert lt.trace_df[data_io.SOURCE].tolist() == [paths[0]] * 2 + [paths[1]] * 2
+    assert lt.event_df[constants.CASEID].nunique() == 4
+    assert lt.event_df.index.tolist() == list(range(10))
+
+
+def test_import_log_tables_merge_with_failed_file(log_dir):
+    paths = [os.path.join(log_dir, name) for name in ('c.xes', 'a.xes', 'b.xes')]
+    lt, report = data_io.import_log_tables(paths, merge=True)
+
+    assert report['error'].notnull().tolist() == [True, False, False]
+    # caseids are prefixed with the position of their file in the batch
+    assert lt.trace_df[constants.CASEID].tolist() == ['1:173694', '1:173697', '2:173694', '2:173697']
+    assert lt.trace_df[data_io.SOURCE].tolist() == [paths[1]] * 2 + [paths[2]] * 2
+
+
+def test_import_log_table_tail(tmp_path):
+    def make_trace(i):
+        return ('<trace><string key="concept:name" value="{0}"/>'
+                '<event><string key="concept:name" value="a{0}"/></event>'
+                '<event><string key="concept:name" value="b{0}"/></event></trace>\n').format(i)
+
+    def write_log(n_traces):
+        traces = ''.join(make_trace(i) for i in range(n_traces))
+        fp.write_text('<log xmlns="http://www.xes-standard.org/">\n'
+                      '<classifier name="Activity" keys="concept:name"/>\n{}</log>'.format(traces))
+
+    fp = tmp_path / 'growing.xes'
+    write_log(2)
+    categorical = {'event': {'concept:name'}}
+    lt, state = data_io.import_log_table_tail(str(fp), categorical=categorical)
+
+    assert state.n_traces == 2
+    assert lt.trace_df.shape[0] == 2
+
+    # nothing appended
+    same_lt, same_state = data_io.import_log_table_tail(str(fp), lt, state, categorical=categorical)
+    assert same_lt is lt and same_state is state
+
+    write_log(5)
+    lt, state = data_io.import_log_table_tail(str(fp), lt, state, categorical=categorical)
+    expected = data_io.import_log_table(str(fp), categorical=categorical)
+
+    assert state.n_traces == 5
+    assert_frame_equal(lt.trace_df, expected.trace_df)
+    assert_frame_equal(lt.event_df, expected.event_df)
+    assert lt.classifiers == expected.classifiers
+
+    # rewriting the imported part is detected
+    fp.write_text(fp.read_text().replace('a0', 'z0'))
+    with pytest.raises(ValueError):
+        data_io.import_log_table_tail(str(fp), lt, state)
+
+
+def test_import_log_table_tail_append_during_import(tmp_path, monkeypatch):
+    def make_log(n_traces):
+        traces = ''.join('<trace><string key="concept:name" value="{0}"/>'
+                         '<event><string key="concept:name" value="a{0}"/></event></trace>\n'.format(i)
+                         for i in range(n_traces))
+        return '<log xmlns="http://www.xes-standard.org/">\n{}</log>'.format(traces)
+
+    fp = tmp_path / 'growing.xes'
+    fp.write_text(make_log(2))
+    scan_trace_offsets = data_io.scan_trace_offsets
+
+    def scan_and_append(path, start=0):
+        scanned = scan_trace_offsets(path, start)
+        # a trace is appended after the scan of the first import
+        if start == 0:
+            fp.write_text(make_log(3))
+        return scanned
+
+    monkeypatch.setattr(data_io, 'scan_trace_offsets', scan_and_append)
+    lt, state = data_io.import_log_table_tail(str(fp))
+    assert state.n_traces == 2
+    assert lt.trace_df[constants.CASEID].tolist() == ['0', '1']
+
+    monkeypatch.setattr(data_io, 'scan_trace_offsets', scan_trace_offsets)
+    lt, state = data_io.import_log_table_tail(str(fp), lt, state)
+    assert state.n_traces == 3
+    assert lt.trace_df[constants.CASEID].tolist() == ['0', '1', '2']
+    assert lt.event_df[constants.CONCEPT_NAME].tolist() == ['a0', 'a1', 'a2']
+
+
+@pytest.fixture
+def globals_log_fp(tmp_path):
+    events = list()
+    for i in range(4):
+        events.append('<event>'
+                          '<string key="concept:name" value="{}"/>'
+                          '<int key="step" value="{}"/>'
+                          '<float key="cost" value="{}"/>'
+                          '<boolean key="automatic" value="{}"/>'
+                          '<int key="big" value="{}"/>'
+                      '</event>'.format('ab'[i % 2], i, 0.5 * i, 'true' if i % 2 else 'false', i << 40))
+    xml = ('<log xmlns="http://www.xes-standard.org/">'
+               '<global scope="trace"><string key="concept:name" value="UNKNOWN"/></global>'
+               '<global scope="event">'
+                   '<string key="concept:name" value="UNKNOWN"/>'
+                   '<int key="step" value="0"/>'
+                   '<float key="cost" value="0.0"/>'
+                   '<boolean key="automatic" value="false"/>'
+                   '<int key="big" value="0"/>'
+               '</global>'
+               '<trace><string key="concept:name" value="0"/>{}</trace>'
+               '<trace><string key="concept:name" value="1"/>{}</trace>'
+           '</log>').format(''.join(events[:2]), ''.join(events[2:]))
+
+    fp = tmp_path / 'globals.xes'
+    fp.write_text(xml)
+    return str(fp)
+
+
+def test_import_log_table_global_schema(globals_log_fp):
+    expected = data_io.import_log_table(globals_log_fp, import_mode=data_io.ImportMode.ALL)
+    lt = data_io.import_log_table(globals_log_fp, import_mode=data_io.ImportMode.ALL, schema=data_io.GLOBAL_SCHEMA)
+
+    event_df = lt.event_df
+    assert event_df['concept:name'].dtype == 'category'
+    assert event_df['step'].dtype == np.int32
+    assert event_df['cost'].dtype == np.float32
+    assert event_df['automatic'].dtype == np.bool_
+    # does not fit int32
+    assert event_df['big'].dtype == np.int64
+    # caseids are not interned
+    assert lt.trace_df['concept:name'].dtype == object
+
+    pd.testing.assert_frame_equal(event_df, expected.event_df, check_dtype=False, check_categorical=False)
+
+
+def test_import_log_table_user_schema(globals_log_fp):
+    schema = {data_io.EVENT: {'cost': 'float64', 'step': 'int16'}, data_io.TRACE: {'concept:name': 'category'}}
+    lt = data_io.import_log_table(globals_log_fp, import_mode=data_io.ImportMode.ALL, schema=schema)
+
+    assert lt.event_df['cost'].dtype == np.float64
+    assert lt.event_df['step'].dtype == np.int16
+    assert lt.event_df['concept:name'].dtype == 'category'
+    assert lt.trace_df['concept:name'].dtype == 'category'
+
+
+def test_import_log_table_schema_chunks(globals_log_fp):
+    chunks = list(data_io.iter_log_table(globals_log_fp, import_mode=data_io.ImportMode.ALL, chunk_traces=1,
+                                         schema=data_io.GLOBAL_SCHEMA))
+
+    assert len(chunks) == 2
+    assert all(chunk.event_df['step'].dtype == np.int32 for chunk in chunks)
+
+
+def test_import_log_table_schema_target_engine(globals_log_fp):
+    with pytest.raises(ValueError):
+        data_io.import_log_table(globals_log_fp, engine=data_io.TARGET_ENGINE, schema=data_io.GLOBAL_SCHEMA)
+
+
+def test_import_log_table_optimize(globals_log_fp):
+    lt = data_io.import_log_table(globals_log_fp, import_mode=data_io.ImportMode.ALL, optimize=True)
+
+    assert lt.event_df['step'].dtype == np.uint8
+    assert lt.event_df['cost'].dtype == np.float32
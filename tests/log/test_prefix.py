@@ -0,0 +1,99 @@
+#!/usr/bin/env python
+
+"""This is the test module for the prefix module.
+
+"""
+
+
+import pytest
+import numpy as np
+import pandas as pd
+
+from podspy.log import constants as const
+from podspy.log.table import LogTable
+from podspy.log.prefix import PrefixTree
+
+
+@pytest.fixture
+def a_prefix_log_table():
+    # traces <a, b>, <a, b, c>, <a, b>, <c>, <a, d>
+    log_table = LogTable()
+    log_table.event_df[const.CASEID] = ['0', '0', '1', '1', '1', '2', '2', '3', '4', '4']
+    log_table.event_df[const.ACTIVITY] = ['a', 'b', 'a', 'b', 'c', 'a', 'b', 'c', 'a', 'd']
+    return log_table
+
+
+def test_prefix_tree_counts(a_prefix_log_table):
+    tree = a_prefix_log_table.get_prefix_tree()
+
+    # root, a, ab, abc, ad, c
+    assert tree.n_nodes == 6
+    assert tree.n_cases == 5
+    assert tree.count([]) == 5
+    assert tree.count(['a']) == 4
+    assert tree.count(['a', 'b']) == 3
+    assert tree.count(['a', 'b', 'c']) == 1
+    assert tree.count(['b']) == 0
+    assert tree.count(['x']) == 0
+    assert tree.get_prefix(tree.find(['a', 'd'])) == ['a', 'd']
+
+
+def test_prefix_tree_cases(a_prefix_log_table):
+    tree = a_prefix_log_table.get_prefix_tree()
+
+    assert sorted(tree.get_cases(['a', 'b'])) == ['0', '1', '2']
+    assert list(tree.get_cases(['c'])) == ['3']
+    assert len(tree.get_cases(['a', 'c'])) == 0
+
+
+def test_prefix_tree_next_activities(a_prefix_log_table):
+    tree = a_prefix_log_table.get_prefix_tree()
+
+    next_activities = tree.get_next_activities(['a', 'b'])
+    assert next_activities.to_dict() == {'c': 1, None: 2}
+
+    next_activities = tree.get_next_activities(['a'])
+    assert next_activities.to_dict() == {'b': 3, 'd': 1}
+
+
+def test_prefix_tree_timestamp_order():
+    log_table = LogTable()
+    log_table.event_df[const.CASEID] = ['0', '0', '1']
+    log_table.event_df[const.ACTIVITY] = ['b', 'a', 'a']
+    log_table.event_df[const.TIME_TIMESTAMP] = pd.to_datetime(['2018-01-02', '2018-01-01', '2018-01-01'])
+
+    tree = log_table.get_prefix_tree()
+    assert tree.count(['a']) == 2
+    assert tree.count(['a', 'b']) == 1
+
+    tree = log_table.get_prefix_tree(timestamp_key=None)
+    assert tree.count(['b', 'a']) == 1
+
+
+def test_prefix_tree_compact_form(a_prefix_log_table, tmpdir):
+    tree = a_prefix_log_table.get_prefix_tree()
+
+    fp = str(tmpdir.join('tree.npz'))
+    np.savez(fp, **tree.to_dict())
+    # string labels are stored without pickle
+    with np.load(fp, allow_pickle=False) as arrays:
+        loaded = PrefixTree.from_dict(arrays)
+
+    assert loaded.n_nodes == tree.n_nodes
+    assert (loaded.counts == tree.counts).all()
+    assert loaded.activities.dtype == object
+    assert sorted(loaded.get_cases(['a', 'b'])) == ['0', '1', '2']
+    assert loaded.get_next_activities(['a']).to_dict() == tree.get_next_activities(['a']).to_dict()
+
+
+def test_prefix_tree_compact_form_int_caseids(a_prefix_log_table, tmpdir):
+    event_df = a_prefix_log_table.event_df.copy()
+    event_df[const.CASEID] = event_df[const.CASEID].astype(int)
+    tree = PrefixTree.build_from_logtable(LogTable(event_df=event_df), const.ACTIVITY)
+
+    fp = str(tmpdir.join('tree.npz'))
+    np.savez(fp, **tree.to_dict())
+    with np.load(fp, allow_pickle=False) as arrays:
+        loaded = PrefixTree.from_dict(arrays)
+
+    assert sorted(loaded.get_cases(['a', 'b'])) == [0, 1, 2]
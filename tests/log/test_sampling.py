@@ -0,0 +1,77 @@
+#!/usr/bin/env python
+
+"""This is the test module for the sampling module.
+
+"""
+
+
+import pytest
+
+from podspy.log import sampling
+
+
+def test_head_sampler():
+    sampler = sampling.HeadSampler(2)
+
+    assert [sampler.select(i, str(i)) for i in range(4)] == [True, True, False, False]
+    assert sampler.is_done()
+
+    sampler.reset()
+
+    assert not sampler.is_done()
+
+
+def test_stride_sampler():
+    sampler = sampling.StrideSampler(3, start=1)
+
+    assert [i for i in range(10) if sampler.select(i, str(i))] == [1, 4, 7]
+
+
+def test_reservoir_sampler():
+    sampler = sampling.ReservoirSampler(3, seed=2)
+
+    for i in range(100):
+        sampler.offer(i, str(i))
+
+    selected = sampler.get_selected()
+
+    assert len(selected) == 3
+    assert [index for index, _ in selected] == sorted(index for index, _ in selected)
+
+    # sampling again after a reset gives the same sample
+    sampler.reset()
+    for i in range(100):
+        sampler.offer(i, str(i))
+
+    assert sampler.get_selected() == selected
+
+    # the selection is only known at the end of the log
+    with pytest.raises(ValueError):
+        sampler.select(0, '0')
+
+    # samplers have to implement select
+    with pytest.raises(TypeError):
+        sampling.TraceSampler()
+
+
+def test_hash_sampler():
+    caseids = [str(i) for i in range(1000)]
+    sampler = sampling.HashSampler(0.2, seed=1)
+    selected = [caseid for caseid in caseids if sampler.select(None, caseid)]
+
+    assert 100 < len(selected) < 300
+    # selection does not depend on the position of the trace
+    assert all(sampler.select(0, caseid) for caseid in selected)
+    assert not any(sampling.HashSampler(0).select(0, caseid) for caseid in caseids)
+    assert all(sampling.HashSampler(1).select(0, caseid) for caseid in caseids)
+
+
+@pytest.mark.parametrize('sampler_class, arg', [
+    (sampling.HeadSampler, -1),
+    (sampling.StrideSampler, 0),
+    (sampling.ReservoirSampler, -1),
+    (sampling.HashSampler, 1.5)
+])
+def test_invalid_sampler(sampler_class, arg):
+    with pytest.raises(ValueError):
+        sampler_class(arg)
@@ -76,3 +76,159 @@ def test_get_trace_variants_two_cases_two_variants():
     expected = expected[[const.CASEID, LogTable.VARIANT_ID, const.VARIANT]]
 
     assert_frame_equal(variant_df, expected)
+
+
+def test_get_log_index_is_cached():
+    log_table = LogTable()
+    log_table.event_df[const.ACTIVITY] = ['a', 'b', 'a']
+    log_table.event_df[const.CASEID] = ['0', '0', '1']
+
+    index = log_table.get_log_index()
+    assert log_table.get_log_index() is index
+    assert list(log_table.trace_offsets) == [0, 2, 3]
+
+    # adding events rebuilds the index
+    new_event_df = pd.DataFrame({const.ACTIVITY: ['c'], const.CASEID: ['2']})
+    log_table.event_df = pd.concat([log_table.event_df, new_event_df], ignore_index=True)
+    assert log_table.get_log_index() is not index
+    assert list(log_table.trace_offsets) == [0, 2, 3, 4]
+
+    # changing values in place requires invalidating the cache
+    index = log_table.get_log_index()
+    log_table.event_df[const.CASEID] = ['0', '0', '0', '0']
+    assert log_table.get_log_index() is index
+    log_table.invalidate_cache()
+    assert list(log_table.trace_offsets) == [0, 4]
+
+
+def test_get_variants_is_cached():
+    log_table = LogTable()
+    log_table.event_df[const.ACTIVITY] = ['a', 'b', 'a', 'b', 'c']
+    log_table.event_df[const.CASEID] = ['1', '1', '0', '0', '0']
+
+    variants = log_table.get_variants()
+    assert log_table.get_variants() is variants
+    assert list(variants.frequencies) == [1, 1]
+
+    log_table.event_df = log_table.event_df.iloc[:4]
+    assert list(log_table.get_variants().frequencies) == [2]
+
+
+def test_get_variants_default_activity_key():
+    # imported logs have concept:name but no activity column
+    log_table = LogTable()
+    log_table.event_df[const.CONCEPT_NAME] = ['a', 'b', 'a', 'b', 'c']
+    log_table.event_df[const.CASEID] = ['1', '1', '0', '0', '0']
+
+    variants = log_table.get_variants()
+    assert variants is log_table.get_variants(const.CONCEPT_NAME)
+    assert [list(variants.activities[variants.get_variant(i)]) for i in range(variants.n_variants)] == \
+        [['a', 'b'], ['a', 'b', 'c']]
+
+
+def test_get_trace_variants_grouped_by_variant():
+    log_table = LogTable()
+    log_table.event_df[const.ACTIVITY] = ['a', 'b', 'a', 'b', 'a', 'a']
+    log_table.event_df[const.CASEID] = ['2', '2', '0', '0', '1', '1']
+    variant_df = log_table.get_trace_variants()
+
+    variant0 = 'a{}b'.format(LogTable.VARIANT_SEP)
+    variant1 = 'a{}a'.format(LogTable.VARIANT_SEP)
+    expected = pd.DataFrame({const.CASEID: ['0', '2', '1'],
+                             LogTable.VARIANT_ID: ['variant 0', 'variant 0', 'variant 1'],
+                             const.VARIANT: [variant0, variant0, variant1]})
+    expected = expected[[const.CASEID, LogTable.VARIANT_ID, const.VARIANT]]
+
+    assert_frame_equal(variant_df, expected)
+
+
+def test_get_event_identity_column():
+    log_table = LogTable(classifiers={'activity': [const.CONCEPT_NAME],
+                                      'activity and lifecycle': [const.CONCEPT_NAME, 'lifecycle:transition']})
+    log_table.event_df[const.CONCEPT_NAME] = ['b', 'a', 'b', 'a', None]
+    log_table.event_df['lifecycle:transition'] = ['start', 'start', 'complete', 'start', 'start']
+
+    column = log_table.get_event_identity_column('activity and lifecycle')
+    assert list(column.cat.categories) == ['b&&start', 'a&&start', 'b&&complete']
+    assert list(column.cat.codes) == [0, 1, 2, 1, -1]
+    assert log_table.get_event_identity_column('activity and lifecycle') is column
+
+    column = log_table.get_event_identity_column('activity')
+    assert list(column.cat.categories) == ['b', 'a']
+    assert log_table.get_event_identity_list('activity', sort=False) == ['b', 'a']
+    assert log_table.get_event_identity_list('activity') == ['a', 'b']
+
+
+@pytest.fixture
+def a_filter_log_table():
+    trace_df = pd.DataFrame({const.CASEID: ['0', '1', '2'], 'customer': ['x', 'y', 'x']})
+    event_df = pd.DataFrame({
+        const.CASEID: ['0', '0', '1', '1', '2'],
+        const.CONCEPT_NAME: ['a', 'b', 'a', 'c', 'b'],
+        const.TIME_TIMESTAMP: pd.to_datetime(['2018-01-01', '2018-01-02', '2018-01-03',
+                                              '2018-01-04', '2018-01-05'])
+    })
+    nested_df = pd.DataFrame({
+        const.SCOPE: ['trace', 'event', 'event'],
+        const.ROW: [1, 1, 4],
+        const.PATH: ['', '', ''],
+        const.KEY: ['k', 'k', 'k'],
+        const.VALUE: ['v', 'v', 'v'],
+        const.TYPE: ['list', 'list', 'list']
+    }, columns=const.NESTED_COLUMNS)
+
+    return LogTable(trace_df=trace_df, event_df=event_df, nested_df=nested_df,
+                    classifiers={'activity': [const.CONCEPT_NAME]})
+
+
+def test_filter_activity_and_time(a_filter_log_table):
+    filtered = a_filter_log_table.filter(activity_in=['b', 'c'], time_between=('2018-01-02', '2018-01-04'))
+
+    assert list(filtered.event_df.index) == [1, 3]
+    assert list(filtered.trace_df[const.CASEID]) == ['0', '1']
+    # nested attributes of dropped events are dropped
+    assert list(filtered.nested_df[const.ROW]) == [1, 1]
+    assert filtered.classifiers == a_filter_log_table.classifiers
+
+    filtered = a_filter_log_table.filter(time_between=('2018-01-04', None))
+    assert list(filtered.event_df.index) == [3, 4]
+
+
+def test_filter_repeated_and_single_activity(a_filter_log_table):
+    filtered = a_filter_log_table.filter(activity_in=['a', 'a'], time_between=('2018-01-01', None))
+    assert list(filtered.event_df.index) == [0, 2]
+
+    # a single activity is not split into characters
+    filtered = a_filter_log_table.filter(activity_in='ab')
+    assert filtered.event_df.shape[0] == 0
+    filtered = a_filter_log_table.filter(activity_in='b')
+    assert list(filtered.event_df.index) == [1, 4]
+
+
+def test_filter_time_with_mixed_offsets(a_filter_log_table):
+    event_df = a_filter_log_table.event_df.copy()
+    # timestamps with different utc offsets are an object column
+    event_df[const.TIME_TIMESTAMP] = pd.Series([ts.tz_localize('UTC').tz_convert(tz) for ts, tz in zip(
+        event_df[const.TIME_TIMESTAMP], ['UTC', 'Europe/Amsterdam', 'UTC', 'Asia/Tokyo', 'UTC'])], dtype=object)
+    lt = LogTable(trace_df=a_filter_log_table.trace_df, event_df=event_df)
+
+    filtered = lt.filter(time_between=('2018-01-02T00:00Z', '2018-01-04T00:00Z'))
+    assert list(filtered.event_df.index) == [1, 2, 3]
+
+    assert list(lt.trace_offsets) == [0, 2, 4, 5]
+    assert lt.get_prefix_tree(const.CONCEPT_NAME).count(['a']) == 2
+
+
+def test_filter_case_attr(a_filter_log_table):
+    filtered = a_filter_log_table.filter(case_attr={'customer': 'x'})
+
+    assert list(filtered.event_df.index) == [0, 1, 4]
+    assert list(filtered.trace_df[const.CASEID]) == ['0', '2']
+    # only the nested attribute of trace 1 is dropped
+    assert list(filtered.nested_df[const.SCOPE]) == ['event', 'event']
+
+    filtered = a_filter_log_table.filter(case_attr={'customer': ['x', 'y']}, activity_in=['b'])
+    assert list(filtered.event_df.index) == [1, 4]
+
+    with pytest.raises(ValueError):
+        a_filter_log_table.filter(case_attr={'missing': 'x'})
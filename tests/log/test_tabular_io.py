@@ -0,0 +1,101 @@
+#!/usr/bin/env python
+
+"""This is the test module for the tabular io module.
+
+"""
+
+
+import pytest
+import numpy as np
+import pandas as pd
+from pandas.testing import assert_frame_equal
+
+from podspy.log import constants, tabular_io
+
+
+CSV = ('case_id,task,ts,customer,cost\n'
+       '2,a,2018-01-01T10:00:00+01:00,bob,1.5\n'
+       '1,b,2018-01-01T09:30:00Z,ann,2.0\n'
+       '1,a,2018-01-01T09:00:00Z,ann,\n'
+       '2,c,2018-01-01T11:00:00+01:00,bob,3.0\n'
+       '1,c,,ann,1.0\n')
+
+
+@pytest.fixture
+def csv_fp(tmp_path):
+    fp = tmp_path / 'log.csv'
+    fp.write_text(CSV)
+    return str(fp)
+
+
+@pytest.mark.parametrize('chunksize', [2, 100])
+def test_import_log_table_csv(csv_fp, chunksize):
+    lt = tabular_io.import_log_table_csv(csv_fp, caseid_col='case_id', activity_col='task', timestamp_col='ts',
+                                         case_columns=['customer'], chunksize=chunksize)
+    trace_df, event_df = lt.trace_df, lt.event_df
+
+    # cases in the order of their first event, events sorted by time within a case
+    assert trace_df.to_dict(orient='list') == {constants.CASEID: [2, 1], 'customer': ['bob', 'ann']}
+    assert event_df[constants.CASEID].tolist() == [2, 2, 1, 1, 1]
+    assert event_df[constants.CONCEPT_NAME].tolist() == ['a', 'c', 'a', 'b', 'c']
+    assert event_df.index.tolist() == list(range(5))
+    assert 'customer' not in event_df.columns
+
+    timestamps = event_df[constants.TIME_TIMESTAMP]
+    assert str(timestamps.dtype) == 'datetime64[ns, UTC]'
+    assert timestamps.iloc[0] == pd.Timestamp('2018-01-01T09:00:00Z')
+    assert timestamps.isnull().tolist() == [False, False, False, False, True]
+    assert event_df['cost'].dtype == np.float64
+
+
+def test_import_log_table_csv_categorical(csv_fp):
+    expected = tabular_io.import_log_table_csv(csv_fp, caseid_col='case_id', activity_col='task', timestamp_col='ts')
+    lt = tabular_io.import_log_table_csv(csv_fp, caseid_col='case_id', activity_col='task', timestamp_col='ts',
+                                         categorical=[constants.CONCEPT_NAME], column_mapping={'cost': 'cost:amount'},
+                                         chunksize=2)
+
+    assert lt.event_df[constants.CONCEPT_NAME].dtype == 'category'
+    assert lt.event_df[constants.CONCEPT_NAME].tolist() == expected.event_df[constants.CONCEPT_NAME].tolist()
+    assert 'cost:amount' in lt.event_df.columns
+
+
+@pytest.mark.parametrize('chunksize', [2, 100])
+def test_import_log_table_csv_missing_caseids(tmp_path, chunksize):
+    fp = tmp_path / 'log.csv'
+    fp.write_text('case_id,task,ts\n'
+                  '1,a,2018-01-01T09:00:00Z\n'
+                  ',b,2018-01-01T09:30:00Z\n'
+                  '2,a,2018-01-01T10:00:00Z\n'
+                  '1,b,2018-01-01T11:00:00Z\n'
+                  ',c,2018-01-01T12:00:00Z\n')
+
+    lt = tabular_io.import_log_table_csv(str(fp), caseid_col='case_id', activity_col='task', timestamp_col='ts',
+                                         chunksize=chunksize)
+
+    assert lt.trace_df[constants.CASEID].tolist() == [1, 2]
+    assert lt.event_df[constants.CASEID].dtype == np.int64
+    assert lt.event_df[constants.CASEID].tolist() == [1, 1, 2]
+    assert lt.event_df[constants.CONCEPT_NAME].tolist() == ['a', 'b', 'a']
+
+
+def test_import_log_table_csv_missing_columns(csv_fp):
+    with pytest.raises(ValueError):
+        tabular_io.import_log_table_csv(csv_fp, caseid_col='case')
+
+    with pytest.raises(ValueError):
+        tabular_io.import_log_table_csv(csv_fp, caseid_col='case_id', case_columns=['region'])
+
+
+def test_import_log_table_parquet(csv_fp, tmp_path):
+    pytest.importorskip('pyarrow')
+
+    fp = str(tmp_path / 'log.parquet')
+    pd.read_csv(csv_fp).to_parquet(fp)
+
+    expected = tabular_io.import_log_table_csv(csv_fp, caseid_col='case_id', activity_col='task', timestamp_col='ts',
+                                               case_columns=['customer'])
+    lt = tabular_io.import_log_table_parquet(fp, caseid_col='case_id', activity_col='task', timestamp_col='ts',
+                                             case_columns=['customer'], chunksize=2)
+
+    assert_frame_equal(lt.trace_df, expected.trace_df)
+    assert_frame_equal(lt.event_df, expected.event_df)
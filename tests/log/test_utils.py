@@ -0,0 +1,71 @@
+#!/usr/bin/env python
+
+"""This is the test module for the utils module of the log package.
+
+"""
+
+
+import datetime as dt
+import numpy as np
+import pandas as pd
+
+from podspy.log import utils as log_utils
+from podspy.log import table as tble
+
+
+def test_optimize_df_dtypes():
+    df = pd.DataFrame({
+        'small': np.arange(10, dtype=np.int64),
+        'negative': np.arange(-5, 5, dtype=np.int64),
+        'half': np.arange(10, dtype=np.float64) / 2,
+        'activity': ['a', 'b'] * 5,
+        'caseid': [str(i) for i in range(10)]
+    })
+
+    optimized = log_utils.optimize_df_dtypes(df, inplace=False)
+
+    assert optimized['small'].dtype == np.uint8
+    assert optimized['negative'].dtype == np.int8
+    assert optimized['half'].dtype == np.float32
+    assert optimized['activity'].dtype == 'category'
+    assert optimized['caseid'].dtype == object
+    # the original is left as is
+    assert df['small'].dtype == np.int64
+
+
+def test_optimize_column():
+    exact = pd.Series([0.5, np.nan, 2.])
+    inexact = pd.Series([0.1, 0.2])
+    timestamps = pd.Series([dt.datetime(2018, 1, 1, tzinfo=dt.timezone.utc), None], dtype=object)
+
+    assert log_utils.optimize_column(exact).dtype == np.float32
+    assert log_utils.optimize_column(inexact).dtype == np.float64
+    assert pd.api.types.is_datetime64_any_dtype(log_utils.optimize_column(timestamps))
+
+    as_int = log_utils.optimize_column(timestamps, timestamp_int=True)
+    assert as_int.dtype == np.int64
+    assert as_int[0] == pd.Timestamp('2018-01-01', tz='UTC').value
+
+
+def test_optimize_log_table():
+    trace_df = pd.DataFrame({'caseid': ['0', '1'], 'amount': [100, 200]})
+    event_df = pd.DataFrame({'caseid': ['0', '0', '0', '1', '1', '1'], 'concept:name': ['a', 'b', 'a'] * 2})
+    lt = tble.LogTable(trace_df=trace_df, event_df=event_df)
+
+    report = log_utils.optimize_log_table(lt)
+
+    assert report['column'].tolist() == ['caseid', 'amount', 'caseid', 'concept:name']
+    assert report['dtype_after'].tolist() == ['object', 'uint8', 'category', 'category']
+    assert (report['bytes_after'] <= report['bytes_before']).all()
+    assert lt.trace_df['amount'].dtype == np.uint8
+    assert lt.event_df['concept:name'].tolist() == ['a', 'b', 'a'] * 2
+
+
+def test_optimize_log_table_report_only():
+    event_df = pd.DataFrame({'caseid': ['0'] * 4, 'concept:name': ['a'] * 4})
+    lt = tble.LogTable(event_df=event_df)
+
+    report = log_utils.optimize_log_table(lt, inplace=False)
+
+    assert report['dtype_after'].tolist() == ['category', 'category']
+    assert lt.event_df['concept:name'].dtype == object
@@ -0,0 +1,76 @@
+#!/usr/bin/env python
+
+"""This is the test module for the variants module.
+
+"""
+
+
+import pytest
+import numpy as np
+import pandas as pd
+
+from podspy.log import constants as const
+from podspy.log.table import LogTable
+from podspy.log.variants import VariantLog
+
+
+@pytest.fixture
+def a_variant_log_table():
+    log_table = LogTable()
+    log_table.event_df[const.CASEID] = ['0', '0', '1', '1', '1', '2', '2', '3']
+    log_table.event_df[const.ACTIVITY] = ['a', 'b', 'a', 'b', 'c', 'a', 'b', 'c']
+    return log_table
+
+
+def test_build_from_logtable(a_variant_log_table):
+    variant_log = VariantLog.build_from_logtable(a_variant_log_table)
+
+    assert variant_log.n_variants == 3
+    assert variant_log.n_cases == 4
+    assert variant_log.n_events == 8
+    assert list(variant_log.iter_traces()) == [(['a', 'b'], 2), (['a', 'b', 'c'], 1), (['c'], 1)]
+
+    case_variants = variant_log.get_case_variants()
+    assert list(case_variants.index) == ['0', '1', '2', '3']
+    assert list(case_variants) == [0, 1, 0, 2]
+
+
+def test_get_variant_log_is_cached(a_variant_log_table):
+    variant_log = a_variant_log_table.get_variant_log()
+    assert a_variant_log_table.get_variant_log() is variant_log
+
+
+def test_get_variant_log_default_activity_key():
+    # imported logs have concept:name but no activity column
+    log_table = LogTable()
+    log_table.event_df[const.CASEID] = ['0', '0', '1']
+    log_table.event_df[const.CONCEPT_NAME] = ['a', 'b', 'c']
+
+    variant_log = log_table.get_variant_log()
+    assert variant_log is log_table.get_variant_log(const.CONCEPT_NAME)
+    assert list(variant_log.iter_traces()) == [(['a', 'b'], 1), (['c'], 1)]
+    assert list(VariantLog.build_from_logtable(log_table).iter_traces()) == [(['a', 'b'], 1), (['c'], 1)]
+
+
+def test_build_from_traces():
+    variant_log = VariantLog.build_from_traces([['a', 'b'], ['b']], [3, 1])
+
+    assert variant_log.n_cases == 4
+    assert variant_log.get_trace(1) == ['b']
+
+    with pytest.raises(ValueError):
+        variant_log.get_case_variants()
+
+    variant_df = variant_log.to_frame()
+    assert list(variant_df[const.VARIANT]) == [0, 1]
+    assert list(variant_df['trace']) == [('a', 'b'), ('b',)]
+
+
+def test_get_directly_follows_counts(a_variant_log_table):
+    variant_log = a_variant_log_table.get_variant_log()
+    counts = variant_log.get_directly_follows_counts()
+    expected = a_variant_log_table.get_log_index(timestamp_key=None).get_directly_follows_counts()
+
+    assert counts.dtype == np.int64
+    assert (counts == np.array([[0, 3, 0], [0, 0, 1], [0, 0, 0]])).all()
+    assert (counts == expected).all()
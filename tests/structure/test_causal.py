@@ -9,6 +9,7 @@ import pandas as pd
 import numpy as np
 
 from podspy.structure import CausalMatrix
+from podspy.log.variants import VariantLog
 
 
 class TestCausalMatrix:
@@ -83,3 +84,31 @@ class TestCausalMatrix:
 
         assert isinstance(cmat.matrix, pd.DataFrame)
         assert (cmat.matrix.values == mat).all()
+
+    def test_build_from_variant_log(self, two_loop_log_table):
+        expected = CausalMatrix.build_from_logtable(two_loop_log_table, sort=True)
+        variant_log = two_loop_log_table.get_variant_log()
+
+        assert variant_log.n_variants == 4
+
+        cmat = CausalMatrix.build_from_logtable(variant_log, sort=True)
+
+        assert cmat.activity_list == expected.activity_list
+        pd.testing.assert_frame_equal(cmat.matrix, expected.matrix)
+
+    def test_build_from_variant_log_traces(self):
+        variant_log = VariantLog.build_from_traces([['a', 'c', 'd'], ['b', 'c', 'e']], [3, 2])
+        cmat = CausalMatrix.build_from_logtable(variant_log, sort=True)
+
+        assert cmat.activity_list == ['a', 'b', 'c', 'd', 'e']
+
+        mat = [
+            (0, 0, 3, 0, 0),
+            (0, 0, 2, 0, 0),
+            (0, 0, 0, 3, 2),
+            (0, 0, 0, 0, 0),
+            (0, 0, 0, 0, 0)
+        ]
+        mat = np.array(mat)
+
+        assert (cmat.matrix.values == mat).all()
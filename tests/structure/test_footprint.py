@@ -89,3 +89,12 @@ class TestFootprintMatrix:
         expected = np.asarray(expected)
 
         assert (footprint.matrix.values == expected).all()
+
+    def test_build_from_variant_log(self, two_loop_log_table):
+        cmat = CausalMatrix.build_from_logtable(two_loop_log_table)
+        expected = FootprintMatrix.build_from_causal_matrix(cmat)
+
+        footprint = FootprintMatrix.build_from_logtable(two_loop_log_table.get_variant_log())
+
+        assert footprint.activity_list == expected.activity_list
+        assert (footprint.matrix.values == expected.matrix.values).all()
@@ -0,0 +1,58 @@
+#!/usr/bin/env python
+
+"""This is the test module for the conversion module.
+
+"""
+
+
+import numpy as np
+import pandas as pd
+from datetime import datetime, timezone, timedelta
+
+from podspy.utils import conversion
+from podspy.utils.conversion import parse_timestamp, parse_timestamps
+
+
+def test_parse_timestamps_matches_parse_timestamp():
+    timestamps = [
+        '2011-10-01T08:10:30.287+02:00',
+        '2011-10-01T08:10:30-03:00',
+        '2011-10-01T08:10:30.287z'
+    ]
+
+    parsed = parse_timestamps(timestamps)
+
+    assert str(parsed.dtype) == 'datetime64[ns, UTC]'
+
+    for value, timestamp in zip(parsed, timestamps):
+        assert value == pd.Timestamp(parse_timestamp(timestamp))
+
+
+def test_parse_timestamps_missing_and_invalid():
+    parsed = parse_timestamps(['2011-10-01T08:10:30.287+02:00', np.nan, 'not a timestamp'])
+
+    assert parsed.isnull().tolist() == [False, True, True]
+
+
+def test_parse_timestamps_chunks_and_fallback(monkeypatch):
+    monkeypatch.setattr(conversion, 'PARSE_CHUNK_SIZE', 2)
+    timestamps = [
+        '2011-10-01T08:10:30.287+02:00',
+        '2011-10-01T08:10:30Z',
+        # chunk with a datetime is parsed value by value
+        datetime(2011, 10, 1, 8, 10, 30, tzinfo=timezone(timedelta(hours=-5))),
+        '2011-10-01T08:10:30',
+        '2011-10-01T08:10:30.5-05:30'
+    ]
+
+    parsed = parse_timestamps(timestamps)
+
+    expected = [pd.Timestamp(timestamp).tz_convert('UTC') if pd.Timestamp(timestamp).tz is not None
+                else pd.Timestamp(timestamp).tz_localize('UTC') for timestamp in timestamps]
+    assert parsed.tolist() == expected
+
+
+def test_parse_iso_timestamps_rejects_other_forms():
+    assert conversion.parse_iso_timestamps(['2011-10-01T08:10:30+0200']) is None
+    assert conversion.parse_iso_timestamps(['2011-10-01T08:10:30', None]) is None
+    assert conversion.parse_iso_timestamps([]) is None